@@ -0,0 +1,15 @@
+"""
+Benchmarks package for StudyBuddy Telegram Bot.
+
+Standalone scripts that measure database and service performance.
+Run them as modules from the project root, e.g.
+``python -m benchmarks.bench_pragma_profiles``.
+"""
+
+import os
+
+# Benchmarks never talk to Telegram, so a placeholder token is enough
+# to satisfy config validation.
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK-TOKEN")
+
+__all__ = []
@@ -0,0 +1,133 @@
+"""
+Benchmark integer epoch-day due dates against the old ISO text storage.
+
+Loads the same tasks into two temporary databases, one with ISO text due
+dates and one with integer day numbers, then compares due-date range scans
+over the reminder index, per-user range reads, turning the fetched values
+into ``date`` objects, and the size of the database file.
+
+Usage:
+    python -m benchmarks.bench_epoch_days [--rows 1000000] [--users 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from database.db import Database
+from database.records import from_epoch_day, to_epoch_day
+
+
+async def load_rows(database: Database, rows: int, users: int, as_text: bool):
+    """Insert ``rows`` tasks spread over ``users`` users and two years."""
+    await database.execute_many(
+        "INSERT INTO users (user_id, first_name) VALUES (?, 'Bench')",
+        [(user_id,) for user_id in range(users)],
+    )
+    today = date.today()
+    days = [today + timedelta(days=offset) for offset in range(730)]
+    if as_text:
+        values = [day.isoformat() for day in days]
+    else:
+        values = [to_epoch_day(day) for day in days]
+
+    batch = 100_000
+    for start in range(0, rows, batch):
+        await database.execute_many(
+            "INSERT INTO tasks (user_id, task_type, title, due_date) "
+            "VALUES (?, 'assignment', ?, ?)",
+            [
+                (i % users, f"Task {i}", values[i * 7919 % len(values)])
+                for i in range(start, min(start + batch, rows))
+            ],
+        )
+
+
+async def measure(name: str, database: Database, start, end, parse, users: int):
+    """Time index range counts, a fetch, per-user reads and date conversion."""
+    started = time.perf_counter()
+    for _ in range(20):
+        await database.fetch_one(
+            "SELECT COUNT(*) FROM tasks WHERE reminded = 0 "
+            "AND due_date >= ? AND due_date < ?",
+            (start, end),
+        )
+    count_time = (time.perf_counter() - started) / 20
+
+    started = time.perf_counter()
+    rows = await database.fetch_all(
+        "SELECT due_date FROM tasks WHERE reminded = 0 "
+        "AND due_date >= ? AND due_date < ? ORDER BY due_date",
+        (start, end),
+    )
+    fetch_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for user_id in range(0, users, max(users // 100, 1)):
+        await database.fetch_all(
+            "SELECT due_date FROM tasks WHERE user_id = ? "
+            "AND due_date >= ? AND due_date < ?",
+            (user_id, start, end),
+        )
+    user_time = time.perf_counter() - started
+
+    values = [row[0] for row in rows]
+    started = time.perf_counter()
+    [parse(value) for value in values]
+    parse_time = time.perf_counter() - started
+
+    size = (await database.file_stats())["size_bytes"]
+    print(
+        f"{name:>8}: range count {count_time * 1000:6.1f} ms | "
+        f"fetch {fetch_time * 1000:6.1f} ms ({len(rows)} rows) | "
+        f"100 user reads {user_time * 1000:6.1f} ms | "
+        f"to date {parse_time * 1000:5.1f} ms | "
+        f"file {size / 1024 / 1024:6.1f} MiB"
+    )
+
+
+async def main():
+    """Parse arguments and compare both storage formats."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    start = date.today() + timedelta(days=30)
+    end = start + timedelta(days=90)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        text_db = Database(os.path.join(tmp_dir, "text.db"))
+        int_db = Database(os.path.join(tmp_dir, "int.db"))
+        for database, as_text in ((text_db, True), (int_db, False)):
+            await database.initialize()
+            await load_rows(database, args.rows, args.users, as_text)
+
+        print(f"{args.rows} rows, {args.users} users")
+        for _ in range(2):  # second round runs with a warm page cache
+            await measure(
+                "iso text",
+                text_db,
+                start.isoformat(),
+                end.isoformat(),
+                date.fromisoformat,
+                args.users,
+            )
+            await measure(
+                "int day",
+                int_db,
+                to_epoch_day(start),
+                to_epoch_day(end),
+                from_epoch_day,
+                args.users,
+            )
+
+        await text_db.disconnect()
+        await int_db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""
+Benchmark commit throughput of Task.create for each PRAGMA profile.
+
+Spawns concurrent writer coroutines that each create tasks through
+``Task.create`` against a fresh database file per profile, and reports
+commits per second.
+
+Usage:
+    python -m benchmarks.bench_pragma_profiles [--writers 8] [--tasks 200]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+import database.models as models
+from database.db import PRAGMA_PROFILES, Database
+from database.models import Task
+
+
+async def run_profile(profile: str, writers: int, tasks_per_writer: int) -> float:
+    """
+    Run the concurrent write workload for one PRAGMA profile.
+
+    Args:
+        profile: PRAGMA profile name.
+        writers: Number of concurrent writer coroutines.
+        tasks_per_writer: Tasks created by each writer.
+
+    Returns:
+        Commits per second.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = Database(os.path.join(tmp_dir, "bench.db"), pragma_profile=profile)
+        await database.initialize()
+        models.db = database
+
+        due = date.today() + timedelta(days=7)
+
+        async def writer(user_id: int):
+            for i in range(tasks_per_writer):
+                await Task.create(user_id, "assignment", f"Task {i}", due)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(writer(user_id) for user_id in range(writers)))
+        elapsed = time.perf_counter() - started
+
+        await database.disconnect()
+
+    return writers * tasks_per_writer / elapsed
+
+
+async def main():
+    """Parse arguments and benchmark every profile."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--tasks", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers x {args.tasks} tasks each")
+    for profile in PRAGMA_PROFILES:
+        rate = await run_profile(profile, args.writers, args.tasks)
+        print(f"{profile:>12}: {rate:10.1f} commits/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+Benchmark single-statement Task writes against the old check-then-write path.
+
+The old path read the task with ``get_by_id`` and then ran a second write
+statement; the new path uses one ``DELETE``/``UPDATE`` with ``RETURNING`` or
+a rowcount check, and ``User.create_or_update`` uses one UPSERT. Reports the
+mean per-operation latency of each.
+
+Usage:
+    python -m benchmarks.bench_single_statement_crud [--ops 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+import database.models as models
+from database.activity import ActivityBuffer
+from database.cache import TaskCache
+from database.db import Database
+from database.models import Task, User
+from database.records import to_epoch_day
+
+
+async def old_update(database: Database, task_id: int, title: str) -> bool:
+    """Old Task.update: existence check, then UPDATE."""
+    if await Task.get_by_id(task_id) is None:
+        return False
+    await database.execute("UPDATE tasks SET title = ? WHERE id = ?", (title, task_id))
+    return True
+
+
+async def old_delete_user_task(database: Database, user_id: int, task_id: int) -> bool:
+    """Old Task.delete_user_task: ownership check, then DELETE."""
+    task = await Task.get_by_id(task_id)
+    if not task or task.user_id != user_id:
+        return False
+    await database.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+    return True
+
+
+async def old_create_or_update(database: Database, user_id: int):
+    """Old User.create_or_update first sighting: SELECT, then INSERT or UPDATE."""
+    existing = await database.fetch_one(
+        "SELECT user_id FROM users WHERE user_id = ?", (user_id,)
+    )
+    if existing:
+        await database.execute(
+            "UPDATE users SET last_active = CURRENT_TIMESTAMP WHERE user_id = ?",
+            (user_id,),
+        )
+    else:
+        await database.execute(
+            "INSERT INTO users (user_id, first_name) VALUES (?, 'Bench')", (user_id,)
+        )
+
+
+async def timed(name: str, operations) -> None:
+    """Run awaitables one at a time and print the mean latency."""
+    started = time.perf_counter()
+    for operation in operations:
+        await operation
+    elapsed = time.perf_counter() - started
+    print(f"{name:>30}: {elapsed / len(operations) * 1e6:8.1f} us/op")
+
+
+async def create_tasks(database: Database, count: int) -> list:
+    """Insert ``count`` tasks for user 1 and return their IDs."""
+    due = to_epoch_day(date.today() + timedelta(days=7))
+    await database.execute_many(
+        "INSERT INTO tasks (user_id, task_type, title, due_date) "
+        "VALUES (1, 'exam', 'Bench', ?)",
+        [(due,)] * count,
+    )
+    rows = await database.fetch_all(
+        "SELECT id FROM tasks ORDER BY id DESC LIMIT ?", (count,)
+    )
+    return [row["id"] for row in rows]
+
+
+async def main():
+    """Parse arguments and compare both write paths."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+    ops = args.ops
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = Database(os.path.join(tmp_dir, "bench.db"))
+        await database.initialize()
+        models.db = database
+        models.task_cache = TaskCache(ttl_seconds=0)
+        await database.execute("INSERT INTO users (user_id) VALUES (1)")
+
+        task_ids = await create_tasks(database, ops)
+        await timed(
+            "update (old)",
+            [old_update(database, task_id, "Old") for task_id in task_ids],
+        )
+        await timed(
+            "update (new)",
+            [Task.update(task_id, title="New") for task_id in task_ids],
+        )
+
+        await timed(
+            "delete_user_task (old)",
+            [old_delete_user_task(database, 1, task_id) for task_id in task_ids],
+        )
+        task_ids = await create_tasks(database, ops)
+        await timed(
+            "delete_user_task (new)",
+            [Task.delete_user_task(1, task_id) for task_id in task_ids],
+        )
+
+        # Each user is a first sighting for the new path: fresh activity buffer
+        old_users = range(1000, 1000 + ops)
+        new_users = range(1000 + ops, 1000 + 2 * ops)
+        for case in ("insert", "touch"):
+            await timed(
+                f"create_or_update {case} (old)",
+                [old_create_or_update(database, user_id) for user_id in old_users],
+            )
+            models.activity_buffer = ActivityBuffer(flush_interval=3600)
+            await timed(
+                f"create_or_update {case} (new)",
+                [User.create_or_update(user_id) for user_id in new_users],
+            )
+
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
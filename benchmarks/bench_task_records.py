@@ -0,0 +1,94 @@
+"""
+Benchmark slotted TaskRecord reads against the old dict(row) path.
+
+Loads 100k tasks into a temporary database, then compares the two read
+paths on fetch latency, formatting latency and peak memory of the result.
+
+Usage:
+    python -m benchmarks.bench_task_records [--rows 100000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+from database.db import Database
+from database.records import TASK_COLUMNS, TaskRecord, from_epoch_day, to_epoch_day
+from utils.formatters import format_task_summary
+
+
+async def load_rows(database: Database, rows: int):
+    """Insert ``rows`` tasks for a single user."""
+    await database.execute(
+        "INSERT INTO users (user_id, first_name) VALUES (1, 'Bench')"
+    )
+    first_day = to_epoch_day(date.today())
+    await database.execute_many(
+        "INSERT INTO tasks (user_id, task_type, title, due_date) VALUES (?, ?, ?, ?)",
+        [(1, "assignment", f"Task {i}", first_day + i % 700) for i in range(rows)],
+    )
+
+
+async def dict_path(database: Database) -> list:
+    """Old path: SELECT * and one dict per row."""
+    rows = await database.fetch_all("SELECT * FROM tasks WHERE user_id = 1")
+    tasks = [dict(row) for row in rows]
+    for task in tasks:
+        task["due_date"] = from_epoch_day(task["due_date"])
+    return tasks
+
+
+async def record_path(database: Database) -> list:
+    """New path: selected columns built straight into TaskRecord."""
+    return await database.fetch_all(
+        f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = 1",
+        row_factory=TaskRecord.row_factory,
+    )
+
+
+async def measure(name: str, database: Database, read):
+    """Time a read path, its formatting, and the memory it holds."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    tasks = await read(database)
+    fetch_time = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for task in tasks:
+        format_task_summary(task)
+    format_time = time.perf_counter() - started
+
+    print(
+        f"{name:>8}: fetch {fetch_time * 1000:8.1f} ms | "
+        f"format {format_time * 1000:8.1f} ms | "
+        f"peak memory {peak / 1024 / 1024:7.1f} MiB"
+    )
+
+
+async def main():
+    """Parse arguments and compare both read paths."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = Database(os.path.join(tmp_dir, "bench.db"))
+        await database.initialize()
+        await load_rows(database, args.rows)
+
+        print(f"{args.rows} rows")
+        for _ in range(2):  # second round runs with a warm page cache
+            await measure("dict", database, dict_path)
+            await measure("record", database, record_path)
+
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -7,6 +7,7 @@ a central configuration object for the application.
 
 import logging
 import os
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from dotenv import load_dotenv
 
@@ -23,21 +24,106 @@ class Config:
     # Database Configuration
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///studybuddy.db")
 
+    # Number of read-only connections in the pool (0 = single connection)
+    DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "0"))
+
+    # Seconds to wait for a pooled connection before giving up
+    DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "5"))
+
+    # SQLite PRAGMA profile: "throughput", "durable" or "legacy"
+    DB_PRAGMA_PROFILE = os.getenv("DB_PRAGMA_PROFILE", "throughput").lower()
+
+    # Number of SQLite shards user data is spread across (1 = no sharding)
+    DB_SHARD_COUNT = int(os.getenv("DB_SHARD_COUNT", "1"))
+
+    # Group commit: batch concurrent writes into one transaction
+    DB_GROUP_COMMIT = os.getenv("DB_GROUP_COMMIT", "false").lower() == "true"
+    DB_GROUP_COMMIT_WINDOW_MS = float(os.getenv("DB_GROUP_COMMIT_WINDOW_MS", "5"))
+    DB_GROUP_COMMIT_MAX_BATCH = int(os.getenv("DB_GROUP_COMMIT_MAX_BATCH", "64"))
+
+    # Log statements slower than this with their query plan (0 = off)
+    DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+
     # Logging Configuration
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
-    # Reminder Configuration
+    # Reminder Configuration (reminders fire on time; this is how often the
+    # in-memory reminder queue is reconciled with the database)
     REMINDER_INTERVAL_MINUTES = int(os.getenv("REMINDER_INTERVAL_MINUTES", "60"))
 
-    # Timezone Configuration
+    # Send each user one digest of all their due tasks instead of one per task
+    REMINDER_DIGEST = os.getenv("REMINDER_DIGEST", "true").lower() == "true"
+
+    # Reminders sent concurrently, within Telegram's limits of about 30
+    # messages per second overall and one per second to a single chat
+    REMINDER_SEND_CONCURRENCY = int(os.getenv("REMINDER_SEND_CONCURRENCY", "10"))
+    REMINDER_GLOBAL_RATE = float(os.getenv("REMINDER_GLOBAL_RATE", "30"))
+    REMINDER_CHAT_RATE = float(os.getenv("REMINDER_CHAT_RATE", "1"))
+
+    # Reminder messages go through a durable outbox: due rows are sent in
+    # batches, failed ones retried with exponential backoff (base doubling
+    # up to the max) and dead-lettered after the last attempt
+    REMINDER_OUTBOX_BATCH_SIZE = int(os.getenv("REMINDER_OUTBOX_BATCH_SIZE", "200"))
+    REMINDER_MAX_ATTEMPTS = int(os.getenv("REMINDER_MAX_ATTEMPTS", "5"))
+    REMINDER_RETRY_BASE_SECONDS = float(os.getenv("REMINDER_RETRY_BASE_SECONDS", "30"))
+    REMINDER_RETRY_MAX_SECONDS = float(os.getenv("REMINDER_RETRY_MAX_SECONDS", "3600"))
+
+    # Delivered outbox rows are removed in batches: every N seconds or N rows
+    REMINDER_ACK_FLUSH_SECONDS = float(os.getenv("REMINDER_ACK_FLUSH_SECONDS", "1"))
+    REMINDER_ACK_BATCH_SIZE = int(os.getenv("REMINDER_ACK_BATCH_SIZE", "100"))
+
+    # Several bot instances may share the database: the one holding the
+    # reminder lease (renewed every third of its length) scans and sends, and
+    # each outbox row is claimed for a while before it is sent
+    REMINDER_LEASE_SECONDS = float(os.getenv("REMINDER_LEASE_SECONDS", "30"))
+    REMINDER_CLAIM_SECONDS = float(os.getenv("REMINDER_CLAIM_SECONDS", "300"))
+
+    # Seconds between batched writes of users' last_active timestamps
+    ACTIVITY_FLUSH_INTERVAL_SECONDS = float(
+        os.getenv("ACTIVITY_FLUSH_INTERVAL_SECONDS", "30")
+    )
+
+    # Number of buffered users that triggers an early last_active flush
+    ACTIVITY_FLUSH_MAX_USERS = int(os.getenv("ACTIVITY_FLUSH_MAX_USERS", "100"))
+
+    # Per-user upcoming task cache (TTL 0 disables it)
+    TASK_CACHE_TTL_SECONDS = float(os.getenv("TASK_CACHE_TTL_SECONDS", "300"))
+    TASK_CACHE_MAX_TASKS = int(os.getenv("TASK_CACHE_MAX_TASKS", "50000"))
+    TASK_CACHE_MAX_TASKS_PER_USER = int(
+        os.getenv("TASK_CACHE_MAX_TASKS_PER_USER", "500")
+    )
+
+    # Archive Configuration: move tasks this many days past due out of the
+    # live table, in batches, every ARCHIVE_INTERVAL_HOURS
+    ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "30"))
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+    ARCHIVE_INTERVAL_HOURS = float(os.getenv("ARCHIVE_INTERVAL_HOURS", "24"))
+
+    # Backup Configuration: online copies via the SQLite backup API
+    # (interval 0 disables scheduled backups)
+    BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+    BACKUP_INTERVAL_HOURS = float(os.getenv("BACKUP_INTERVAL_HOURS", "24"))
+    BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "7"))
+    BACKUP_COMPRESS = os.getenv("BACKUP_COMPRESS", "true").lower() == "true"
+    BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "256"))
+    BACKUP_STEP_PAUSE_MS = float(os.getenv("BACKUP_STEP_PAUSE_MS", "10"))
+
+    # Timezone Configuration: default for users who have not set their own
     TIMEZONE = os.getenv("TIMEZONE", "UTC")
 
+    # Local hour (0-23) on the eve of a due date when its reminder is sent,
+    # for users who have not chosen their own
+    REMINDER_HOUR = int(os.getenv("REMINDER_HOUR", "23"))
+
     # Conversation timeout (in seconds)
     CONVERSATION_TIMEOUT = 120  # 2 minutes
 
     # Maximum task title length
     MAX_TASK_TITLE_LENGTH = 200
 
+    # Maximum lines accepted by a single bulk /add
+    MAX_BULK_TASKS = 100
+
     # Maximum tasks to display per page
     MAX_TASKS_PER_PAGE = 50
 
@@ -55,8 +141,107 @@ class Config:
                 "Telegram bot token. See .env.example for reference."
             )
 
-        if cls.REMINDER_INTERVAL_MINUTES < 1:
-            raise ValueError("REMINDER_INTERVAL_MINUTES must be at least 1 minute.")
+        if not 1 <= cls.REMINDER_INTERVAL_MINUTES <= 1440:
+            raise ValueError(
+                "REMINDER_INTERVAL_MINUTES must be between 1 and 1440 minutes."
+            )
+
+        if cls.REMINDER_SEND_CONCURRENCY < 1:
+            raise ValueError("REMINDER_SEND_CONCURRENCY must be at least 1.")
+
+        if cls.REMINDER_GLOBAL_RATE <= 0 or cls.REMINDER_CHAT_RATE <= 0:
+            raise ValueError(
+                "REMINDER_GLOBAL_RATE and REMINDER_CHAT_RATE must be greater than 0."
+            )
+
+        if cls.REMINDER_ACK_FLUSH_SECONDS <= 0 or cls.REMINDER_ACK_BATCH_SIZE < 1:
+            raise ValueError(
+                "REMINDER_ACK_FLUSH_SECONDS must be greater than 0 and "
+                "REMINDER_ACK_BATCH_SIZE at least 1."
+            )
+
+        if cls.REMINDER_OUTBOX_BATCH_SIZE < 1 or cls.REMINDER_MAX_ATTEMPTS < 1:
+            raise ValueError(
+                "REMINDER_OUTBOX_BATCH_SIZE and REMINDER_MAX_ATTEMPTS must be at "
+                "least 1."
+            )
+
+        if not 0 < cls.REMINDER_RETRY_BASE_SECONDS <= cls.REMINDER_RETRY_MAX_SECONDS:
+            raise ValueError(
+                "REMINDER_RETRY_BASE_SECONDS must be greater than 0 and at most "
+                "REMINDER_RETRY_MAX_SECONDS."
+            )
+
+        if cls.REMINDER_LEASE_SECONDS <= 0:
+            raise ValueError("REMINDER_LEASE_SECONDS must be greater than 0.")
+
+        # A claim must outlive the send and its batched acknowledgement
+        if cls.REMINDER_CLAIM_SECONDS <= cls.REMINDER_ACK_FLUSH_SECONDS:
+            raise ValueError(
+                "REMINDER_CLAIM_SECONDS must be greater than "
+                "REMINDER_ACK_FLUSH_SECONDS."
+            )
+
+        try:
+            ZoneInfo(cls.TIMEZONE)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(
+                f"TIMEZONE must be an IANA timezone name, got {cls.TIMEZONE!r}."
+            )
+
+        if not 0 <= cls.REMINDER_HOUR <= 23:
+            raise ValueError("REMINDER_HOUR must be between 0 and 23.")
+
+        if cls.DB_READ_POOL_SIZE < 0:
+            raise ValueError("DB_READ_POOL_SIZE must be 0 or greater.")
+
+        if cls.DB_POOL_ACQUIRE_TIMEOUT <= 0:
+            raise ValueError("DB_POOL_ACQUIRE_TIMEOUT must be greater than 0.")
+
+        if cls.DB_SHARD_COUNT < 1:
+            raise ValueError("DB_SHARD_COUNT must be at least 1.")
+
+        if cls.DB_GROUP_COMMIT_WINDOW_MS < 0:
+            raise ValueError("DB_GROUP_COMMIT_WINDOW_MS must be 0 or greater.")
+
+        if cls.DB_GROUP_COMMIT_MAX_BATCH < 1:
+            raise ValueError("DB_GROUP_COMMIT_MAX_BATCH must be at least 1.")
+
+        if cls.DB_SLOW_QUERY_MS < 0:
+            raise ValueError("DB_SLOW_QUERY_MS must be 0 or greater.")
+
+        if cls.ACTIVITY_FLUSH_INTERVAL_SECONDS <= 0:
+            raise ValueError("ACTIVITY_FLUSH_INTERVAL_SECONDS must be greater than 0.")
+
+        if cls.ACTIVITY_FLUSH_MAX_USERS < 1:
+            raise ValueError("ACTIVITY_FLUSH_MAX_USERS must be at least 1.")
+
+        if cls.TASK_CACHE_TTL_SECONDS < 0:
+            raise ValueError("TASK_CACHE_TTL_SECONDS must be 0 or greater.")
+
+        if cls.ARCHIVE_RETENTION_DAYS < 0:
+            raise ValueError("ARCHIVE_RETENTION_DAYS must be 0 or greater.")
+
+        if cls.ARCHIVE_BATCH_SIZE < 1:
+            raise ValueError("ARCHIVE_BATCH_SIZE must be at least 1.")
+
+        if cls.BACKUP_INTERVAL_HOURS < 0:
+            raise ValueError("BACKUP_INTERVAL_HOURS must be 0 or greater.")
+
+        if cls.BACKUP_KEEP < 1:
+            raise ValueError("BACKUP_KEEP must be at least 1.")
+
+        if cls.BACKUP_PAGES_PER_STEP < 1:
+            raise ValueError("BACKUP_PAGES_PER_STEP must be at least 1.")
+
+        if cls.BACKUP_STEP_PAUSE_MS < 0:
+            raise ValueError("BACKUP_STEP_PAUSE_MS must be 0 or greater.")
+
+        valid_pragma_profiles = ["throughput", "durable", "legacy"]
+        if cls.DB_PRAGMA_PROFILE not in valid_pragma_profiles:
+            raise ValueError(
+                f"DB_PRAGMA_PROFILE must be one of: {', '.join(valid_pragma_profiles)}"
+            )
 
         # Validate log level
         valid_log_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
@@ -4,7 +4,24 @@ Database package for StudyBuddy Telegram Bot.
 This package provides database connectivity and models for the application.
 """
 
+from database.activity import ActivityBuffer, activity_buffer
+from database.cache import TaskCache, task_cache
 from database.db import Database, db
 from database.models import Task, User
+from database.records import TaskRecord, UserRecord
+from database.sharding import ShardRouter, shard_router
 
-__all__ = ["Database", "db", "User", "Task"]
+__all__ = [
+    "Database",
+    "db",
+    "User",
+    "Task",
+    "ActivityBuffer",
+    "activity_buffer",
+    "TaskCache",
+    "task_cache",
+    "TaskRecord",
+    "UserRecord",
+    "ShardRouter",
+    "shard_router",
+]
@@ -0,0 +1,160 @@
+"""
+Write-behind buffer for user activity timestamps.
+
+Handlers touch ``users.last_active`` on nearly every message. Instead of an
+UPDATE and commit per message, the latest activity time per user is kept in
+memory and written out in one batched statement on a timer, when enough
+users have accumulated, or on shutdown.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import Config
+from database.db import Database, db
+from database.sharding import shard_router
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityBuffer:
+    """In-memory coalescing buffer for ``users.last_active`` updates."""
+
+    def __init__(self, flush_interval: float = 30.0, max_users: int = 100):
+        """
+        Initialize activity buffer.
+
+        Args:
+            flush_interval: Seconds between periodic flushes.
+            max_users: Number of buffered users that triggers an early flush.
+        """
+        self.flush_interval = flush_interval
+        self.max_users = max_users
+        self._pending: Dict[int, str] = {}
+        self._known_users: Set[int] = set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.flushed_total = 0
+
+    def is_known(self, user_id: int) -> bool:
+        """
+        Check whether a user row is already known to exist.
+
+        Args:
+            user_id: Telegram user ID.
+
+        Returns:
+            True if the user has been seen by this process.
+        """
+        return user_id in self._known_users
+
+    def mark_known(self, user_id: int):
+        """
+        Remember that a user row exists in the database.
+
+        Args:
+            user_id: Telegram user ID.
+        """
+        self._known_users.add(user_id)
+
+    def forget(self, user_id: int):
+        """
+        Drop a user from the known set and any pending update.
+
+        Args:
+            user_id: Telegram user ID.
+        """
+        self._known_users.discard(user_id)
+        self._pending.pop(user_id, None)
+
+    async def record(self, user_id: int):
+        """
+        Record activity for a user, flushing if the buffer is full.
+
+        Args:
+            user_id: Telegram user ID.
+        """
+        # Same format as SQLite's CURRENT_TIMESTAMP (UTC)
+        self._pending[user_id] = datetime.now(timezone.utc).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+        if len(self._pending) >= self.max_users:
+            await self.flush()
+
+    @property
+    def pending_count(self) -> int:
+        """Number of users with unflushed activity."""
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """
+        Write all buffered activity timestamps in one batch.
+
+        Returns:
+            Number of users written.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            # One batched UPDATE per database (per shard, when sharded)
+            updates: Dict[Database, List[Tuple[str, int]]] = {}
+            for user_id, timestamp in batch.items():
+                database = shard_router.for_user(user_id) if shard_router else db
+                updates.setdefault(database, []).append((timestamp, user_id))
+
+            try:
+                for database, rows in updates.items():
+                    await database.execute_many(
+                        "UPDATE users SET last_active = ? WHERE user_id = ?", rows
+                    )
+            except Exception:
+                # Put the batch back without clobbering newer activity
+                for user_id, timestamp in batch.items():
+                    self._pending.setdefault(user_id, timestamp)
+                raise
+
+            self.flushed_total += len(batch)
+            logger.debug(f"Flushed last_active for {len(batch)} user(s)")
+            return len(batch)
+
+    async def _flush_periodically(self):
+        """Flush the buffer every ``flush_interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush user activity: {e}", exc_info=True)
+
+    def start(self):
+        """Start the periodic flush task."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+            logger.info(
+                f"Activity buffer started. Flushing every {self.flush_interval}s "
+                f"or {self.max_users} user(s)"
+            )
+
+    async def stop(self):
+        """Stop the periodic flush task and write any remaining activity."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        flushed = await self.flush()
+        logger.info(f"Activity buffer stopped. Flushed {flushed} pending user(s)")
+
+
+# Global activity buffer instance
+activity_buffer = ActivityBuffer(
+    flush_interval=Config.ACTIVITY_FLUSH_INTERVAL_SECONDS,
+    max_users=Config.ACTIVITY_FLUSH_MAX_USERS,
+)
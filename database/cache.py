@@ -0,0 +1,214 @@
+"""
+In-process cache of each user's upcoming tasks.
+
+``/list``, ``/delete`` and their follow-up steps re-read the same user's
+upcoming tasks over and over. This module keeps those lists in memory with
+LRU and TTL eviction under a bounded budget of cached task rows. The Task
+model invalidates entries on every write.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from database.records import TaskRecord
+
+logger = logging.getLogger(__name__)
+
+
+class TaskCache:
+    """LRU + TTL cache of upcoming task lists keyed by user ID."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        max_tasks: int = 50000,
+        max_tasks_per_user: int = 500,
+    ):
+        """
+        Initialize task cache.
+
+        Args:
+            ttl_seconds: Seconds an entry stays valid (0 disables the cache).
+            max_tasks: Total cached task rows across all users (memory budget).
+            max_tasks_per_user: Lists longer than this are not cached.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_tasks = max_tasks
+        self.max_tasks_per_user = max_tasks_per_user
+
+        # user_id -> (expires_at, tasks); tasks is None for oversized lists
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._task_owner: Dict[int, int] = {}
+        self._generations: Dict[int, int] = {}
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all."""
+        return self.ttl_seconds > 0 and self.max_tasks > 0
+
+    def generation(self, user_id: int) -> int:
+        """
+        Get the write generation of a user's tasks.
+
+        Read it before querying the database and pass it to ``put`` so a
+        list fetched before a concurrent write is never cached.
+
+        Args:
+            user_id: Telegram user ID.
+
+        Returns:
+            Current generation counter.
+        """
+        return self._generations.get(user_id, 0)
+
+    def get(self, user_id: int) -> Optional[List[TaskRecord]]:
+        """
+        Get a user's cached upcoming tasks.
+
+        Records are shared with the cache and must be treated as read-only.
+
+        Args:
+            user_id: Telegram user ID.
+
+        Returns:
+            New list of the cached task records, or None on a miss.
+        """
+        entry = self._entries.get(user_id)
+        if entry is None or entry[1] is None:
+            self.misses += 1
+            return None
+
+        expires_at, tasks = entry
+        if expires_at <= time.monotonic():
+            self._remove(user_id)
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return list(tasks)
+
+    def is_oversized(self, user_id: int) -> bool:
+        """
+        Check whether a user's list is known to be too long to cache.
+
+        Args:
+            user_id: Telegram user ID.
+
+        Returns:
+            True if callers should go straight to the database.
+        """
+        entry = self._entries.get(user_id)
+        return entry is not None and entry[1] is None and entry[0] > time.monotonic()
+
+    def put(self, user_id: int, tasks: List[TaskRecord], generation: int):
+        """
+        Cache a user's complete upcoming task list.
+
+        Lists longer than ``max_tasks_per_user`` are not stored; the user is
+        remembered as oversized until the entry expires or is invalidated.
+
+        Args:
+            user_id: Telegram user ID.
+            tasks: Complete list of the user's upcoming tasks.
+            generation: Value of ``generation(user_id)`` before the query.
+        """
+        if not self.enabled:
+            return
+        if generation != self.generation(user_id):
+            return  # A write landed while the list was being read
+
+        self._remove(user_id)
+        expires_at = time.monotonic() + self.ttl_seconds
+        if len(tasks) > self.max_tasks_per_user:
+            self._entries[user_id] = (expires_at, None)
+            return
+
+        stored = list(tasks)
+        self._entries[user_id] = (expires_at, stored)
+        for task in stored:
+            self._task_owner[task.id] = user_id
+        self._size += len(stored)
+
+        while self._size > self.max_tasks and self._entries:
+            oldest_user = next(iter(self._entries))
+            self._remove(oldest_user)
+            self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        """
+        Drop a user's cached tasks after a write.
+
+        Args:
+            user_id: Telegram user ID.
+        """
+        self._generations[user_id] = self.generation(user_id) + 1
+        if user_id in self._entries:
+            self._remove(user_id)
+            self.invalidations += 1
+
+    def invalidate_task(self, task_id: int):
+        """
+        Drop the cached list that contains a task, if any.
+
+        Args:
+            task_id: Task ID.
+        """
+        user_id = self._task_owner.get(task_id)
+        if user_id is not None:
+            self.invalidate_user(user_id)
+
+    def clear(self):
+        """Drop every cached entry."""
+        for user_id in list(self._entries):
+            self.invalidate_user(user_id)
+
+    def _remove(self, user_id: int):
+        """Remove an entry and its bookkeeping."""
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        _, tasks = entry
+        if tasks is None:
+            return
+        for task in tasks:
+            self._task_owner.pop(task.id, None)
+        self._size -= len(tasks)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters for sizing.
+
+        Returns:
+            Dictionary with hit/miss/eviction counts and current size.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "users": len(self._entries),
+            "tasks": self._size,
+            "max_tasks": self.max_tasks,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Global task cache instance
+task_cache = TaskCache(
+    ttl_seconds=Config.TASK_CACHE_TTL_SECONDS,
+    max_tasks=Config.TASK_CACHE_MAX_TASKS,
+    max_tasks_per_user=Config.TASK_CACHE_MAX_TASKS_PER_USER,
+)
@@ -4,99 +4,742 @@ Database initialization and connection module for StudyBuddy.
 This module handles database connection, schema creation, and database lifecycle management.
 """
 
+import asyncio
 import logging
 import sqlite3
-from typing import Optional
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 import aiosqlite
 
 from config import Config
+from database.migrations import migrate
+from database.query_stats import QueryStats, query_template
 
 logger = logging.getLogger(__name__)
 
+# PRAGMA settings applied to every new connection, selected by name.
+# "legacy" keeps SQLite's rollback journal and is mainly kept for benchmarks.
+PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+    "legacy": {
+        "busy_timeout": 5000,
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+    },
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 268435456,  # 256 MiB
+        "cache_size": -65536,  # 64 MiB (negative = KiB)
+        "temp_store": "MEMORY",
+    },
+}
+
+
+class _Transaction:
+    """State of an open ``Database.transaction()`` block."""
+
+    __slots__ = ("conn", "owner", "depth", "callbacks")
+
+    def __init__(self, conn: aiosqlite.Connection):
+        self.conn = conn
+        # Child tasks inherit the context variable but not the transaction
+        self.owner = asyncio.current_task()
+        self.depth = 0
+        self.callbacks: List[Tuple[Callable[..., Any], tuple]] = []
+
 
 class Database:
     """Database manager for StudyBuddy bot."""
 
-    def __init__(self, db_path: str = "studybuddy.db"):
+    def __init__(
+        self,
+        db_path: str = "studybuddy.db",
+        read_pool_size: int = 0,
+        acquire_timeout: float = 5.0,
+        pragma_profile: str = "throughput",
+        group_commit: bool = False,
+        group_commit_window: float = 0.005,
+        group_commit_max_batch: int = 64,
+        slow_query_threshold: float = 0.2,
+    ):
         """
         Initialize database manager.
 
+        With ``read_pool_size`` of 0 every statement goes through a single
+        connection. A positive value enables pool mode: reads are served by
+        that many read-only connections while writes go through one
+        dedicated writer connection.
+
+        With ``group_commit`` enabled, concurrent ``execute`` calls are queued
+        and applied together in one transaction, so a burst of handler
+        writes costs a single commit.
+
+        Every statement is timed into ``query_stats`` by template, and
+        statements slower than ``slow_query_threshold`` are logged with their
+        query plan.
+
         Args:
             db_path: Path to SQLite database file.
+            read_pool_size: Number of read-only connections (0 disables pooling).
+            acquire_timeout: Seconds to wait for a pooled connection.
+            pragma_profile: Name of the PRAGMA profile from ``PRAGMA_PROFILES``.
+            group_commit: Batch concurrent ``execute`` calls into shared commits.
+            group_commit_window: Seconds to wait for more writes to join a batch.
+            group_commit_max_batch: Maximum number of writes per commit.
+            slow_query_threshold: Seconds (including commit) above which a
+                statement is logged as slow; 0 disables the slow-query log.
+
+        Raises:
+            ValueError: If the PRAGMA profile is unknown.
         """
+        if pragma_profile not in PRAGMA_PROFILES:
+            raise ValueError(
+                f"Unknown PRAGMA profile '{pragma_profile}'. "
+                f"Expected one of: {', '.join(PRAGMA_PROFILES)}"
+            )
+
         self.db_path = db_path
+        self.pragma_profile = pragma_profile
+        self.read_pool_size = read_pool_size
+        self.acquire_timeout = acquire_timeout
+        self.group_commit = group_commit
+        self.group_commit_window = group_commit_window
+        self.group_commit_max_batch = group_commit_max_batch
+        self.slow_query_threshold = slow_query_threshold
+        self.query_stats = QueryStats()
+
+        if read_pool_size > 0 and db_path == ":memory:":
+            logger.warning("Read pool is not supported for in-memory databases")
+            self.read_pool_size = 0
+
+        # The writer connection (the only connection when pooling is off)
         self._connection: Optional[aiosqlite.Connection] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._reader_queue: Optional[asyncio.Queue] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        # Serializes connect() so concurrent first callers share one connection
+        self._connect_lock = asyncio.Lock()
+        self._pool_metrics = self._empty_pool_metrics()
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._committer_task: Optional[asyncio.Task] = None
+        self._group_commit_metrics = self._empty_group_commit_metrics()
+        # The transaction open in the current task, if any; read it through
+        # _current_transaction(), which ignores ones inherited by child tasks
+        self._transaction: ContextVar[Optional[_Transaction]] = ContextVar(
+            f"transaction_{id(self)}", default=None
+        )
+        self._transaction_metrics = self._empty_transaction_metrics()
         logger.info(f"Database manager initialized with path: {db_path}")
 
+    @property
+    def pool_enabled(self) -> bool:
+        """Whether reads are served by a separate read-only pool."""
+        return self.read_pool_size > 0
+
     async def connect(self) -> aiosqlite.Connection:
         """
         Establish database connection.
 
+        In pool mode this also opens the read-only connections, after the
+        writer has created the database file. Concurrent callers wait for the
+        first one, and the writer is published only once everything is open.
+
         Returns:
-            aiosqlite.Connection: Active database connection.
+            aiosqlite.Connection: Active (writer) database connection.
         """
-        if self._connection is None:
-            self._connection = await aiosqlite.connect(self.db_path)
-            self._connection.row_factory = aiosqlite.Row
+        if self._connection is not None:
+            return self._connection
+
+        async with self._connect_lock:
+            if self._connection is not None:
+                return self._connection
+
+            connection = await self._open_connection()
+            self._write_lock = asyncio.Lock()
             logger.info("Database connection established")
+
+            if self.pool_enabled:
+                self._reader_queue = asyncio.Queue()
+                for _ in range(self.read_pool_size):
+                    reader = await self._open_connection(read_only=True)
+                    self._readers.append(reader)
+                    self._reader_queue.put_nowait(reader)
+                logger.info(
+                    f"Read pool established with {self.read_pool_size} connection(s)"
+                )
+
+            if self.group_commit:
+                self._write_queue = asyncio.Queue()
+                self._committer_task = asyncio.create_task(self._run_committer())
+                logger.info(
+                    f"Group commit enabled (window {self.group_commit_window}s, "
+                    f"max batch {self.group_commit_max_batch})"
+                )
+
+            self._connection = connection
         return self._connection
 
+    async def _open_connection(self, read_only: bool = False) -> aiosqlite.Connection:
+        """
+        Open and configure a new SQLite connection.
+
+        Args:
+            read_only: Open the database in read-only mode.
+
+        Returns:
+            aiosqlite.Connection: Newly opened connection.
+        """
+        if read_only:
+            conn = await aiosqlite.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        else:
+            conn = await aiosqlite.connect(self.db_path)
+        conn.row_factory = aiosqlite.Row
+        await self._apply_pragmas(conn, read_only=read_only)
+        return conn
+
+    async def _apply_pragmas(self, conn: aiosqlite.Connection, read_only: bool = False):
+        """
+        Apply the configured PRAGMA profile to a connection.
+
+        The journal mode is persistent and can only be changed by a writer,
+        so it is skipped for read-only connections.
+
+        Args:
+            conn: Connection to configure.
+            read_only: Whether the connection is read-only.
+        """
+        for name, value in PRAGMA_PROFILES[self.pragma_profile].items():
+            if read_only and name == "journal_mode":
+                continue
+            await conn.execute(f"PRAGMA {name} = {value}")
+
     async def disconnect(self):
-        """Close database connection."""
+        """Close database connection, draining any queued group-commit writes."""
+        if self._committer_task is not None:
+            await self._write_queue.join()
+            self._committer_task.cancel()
+            try:
+                await self._committer_task
+            except asyncio.CancelledError:
+                pass
+            self._committer_task = None
+            self._write_queue = None
+
+        for reader in self._readers:
+            await reader.close()
+        self._readers = []
+        self._reader_queue = None
+
         if self._connection:
             await self._connection.close()
             self._connection = None
             logger.info("Database connection closed")
 
-    async def initialize(self):
+    @staticmethod
+    def _empty_pool_metrics() -> Dict[str, Any]:
+        """Build a zeroed pool metrics dictionary."""
+        return {
+            "read_acquires": 0,
+            "read_wait_total": 0.0,
+            "read_wait_max": 0.0,
+            "read_timeouts": 0,
+            "write_acquires": 0,
+            "write_wait_total": 0.0,
+            "write_wait_max": 0.0,
+        }
+
+    def _record_wait(self, kind: str, waited: float):
+        """Record how long a caller waited for a connection."""
+        metrics = self._pool_metrics
+        metrics[f"{kind}_acquires"] += 1
+        metrics[f"{kind}_wait_total"] += waited
+        metrics[f"{kind}_wait_max"] = max(metrics[f"{kind}_wait_max"], waited)
+
+    def pool_stats(self) -> Dict[str, Any]:
         """
-        Initialize database schema.
+        Get connection pool metrics.
+
+        Returns:
+            Dictionary with pool sizes, idle readers and wait-time counters.
+        """
+        stats = dict(self._pool_metrics)
+        stats["pool_enabled"] = self.pool_enabled
+        stats["read_pool_size"] = self.read_pool_size
+        stats["readers_idle"] = (
+            self._reader_queue.qsize() if self._reader_queue is not None else 0
+        )
+        for kind in ("read", "write"):
+            acquires = stats[f"{kind}_acquires"]
+            stats[f"{kind}_wait_avg"] = (
+                stats[f"{kind}_wait_total"] / acquires if acquires else 0.0
+            )
+        return stats
+
+    @staticmethod
+    def _empty_group_commit_metrics() -> Dict[str, Any]:
+        """Build a zeroed group-commit metrics dictionary."""
+        return {
+            "batches": 0,
+            "writes": 0,
+            "batch_size_max": 0,
+            "commit_time_total": 0.0,
+            "commit_time_max": 0.0,
+        }
+
+    def group_commit_stats(self) -> Dict[str, Any]:
+        """
+        Get group-commit metrics.
+
+        Returns:
+            Dictionary with batch-size and commit-latency counters.
+        """
+        stats = dict(self._group_commit_metrics)
+        stats["group_commit_enabled"] = self.group_commit
+        stats["queued"] = self._write_queue.qsize() if self._write_queue else 0
+        batches = stats["batches"]
+        stats["batch_size_avg"] = stats["writes"] / batches if batches else 0.0
+        stats["commit_time_avg"] = (
+            stats["commit_time_total"] / batches if batches else 0.0
+        )
+        return stats
+
+    @staticmethod
+    def _empty_transaction_metrics() -> Dict[str, Any]:
+        """Build a zeroed transaction metrics dictionary."""
+        return {
+            "transactions": 0,
+            "commits": 0,
+            "rollbacks": 0,
+            "savepoints": 0,
+            "duration_total": 0.0,
+            "duration_max": 0.0,
+            "lock_wait_total": 0.0,
+            "lock_wait_max": 0.0,
+        }
+
+    def transaction_stats(self) -> Dict[str, Any]:
+        """
+        Get unit-of-work transaction metrics.
+
+        Returns:
+            Dictionary with commit/rollback counts, duration and lock wait.
+        """
+        stats = dict(self._transaction_metrics)
+        count = stats["transactions"]
+        stats["duration_avg"] = stats["duration_total"] / count if count else 0.0
+        stats["lock_wait_avg"] = stats["lock_wait_total"] / count if count else 0.0
+        return stats
+
+    def stats(self, top_n: int = 10) -> Dict[str, Any]:
+        """
+        Get a snapshot of per-statement query statistics.
+
+        Args:
+            top_n: Number of statement templates to include, costliest first.
 
-        Creates all necessary tables and indexes if they don't exist.
+        Returns:
+            Dictionary with totals and the top templates by total time, each
+            with call and error counts, latency totals and histogram, rows
+            and commit time.
+        """
+        return self.query_stats.snapshot(top_n)
+
+    def log_stats(self, top_n: int = 10):
         """
-        conn = await self.connect()
+        Log the costliest statement templates.
 
-        # Create users table
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY,
-                username TEXT,
-                first_name TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        Args:
+            top_n: Number of templates to log.
+        """
+        snapshot = self.stats(top_n)
+        logger.info(
+            f"Query stats for {self.db_path}: {snapshot['statements']} statement(s), "
+            f"{snapshot['total_time']:.3f}s executing, "
+            f"{snapshot['commit_time']:.3f}s committing, "
+            f"{snapshot['slow_queries']} slow"
+        )
+        for entry in snapshot["top"]:
+            logger.info(
+                f"  {entry['total_time'] + entry['commit_time']:8.3f}s "
+                f"x{entry['count']} (avg {entry['avg_time'] * 1000:.2f} ms, "
+                f"max {entry['max_time'] * 1000:.2f} ms, {entry['rows']} rows): "
+                f"{entry['query']}"
             )
-        """)
-
-        # Create tasks table
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                task_type TEXT NOT NULL,
-                title TEXT NOT NULL,
-                due_date DATE NOT NULL,
-                reminded BOOLEAN DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+
+    async def _timed_execute(
+        self, conn: aiosqlite.Connection, query: str, parameters, many: bool = False
+    ) -> Tuple[aiosqlite.Cursor, float]:
+        """
+        Execute a statement and measure it, counting failures in ``query_stats``.
+
+        Args:
+            conn: Connection to run on.
+            query: SQL query to execute.
+            parameters: Query parameters (a list of tuples when ``many``).
+            many: Use ``executemany``.
+
+        Returns:
+            Tuple of (cursor, seconds elapsed).
+        """
+        started = time.perf_counter()
+        try:
+            if many:
+                cursor = await conn.executemany(query, parameters)
+            else:
+                cursor = await conn.execute(query, parameters)
+        except Exception:
+            self.query_stats.record(query, time.perf_counter() - started, error=True)
+            raise
+        return cursor, time.perf_counter() - started
+
+    @staticmethod
+    async def _timed_commit(conn: aiosqlite.Connection) -> float:
+        """Commit and return the seconds it took."""
+        started = time.perf_counter()
+        await conn.commit()
+        return time.perf_counter() - started
+
+    async def _record_query(
+        self,
+        conn: aiosqlite.Connection,
+        query: str,
+        parameters,
+        elapsed: float,
+        rows: int,
+        commit_time: float = 0.0,
+    ):
+        """
+        Record a finished statement and log it with its plan if it was slow.
+
+        Args:
+            conn: Connection the statement ran on (used for EXPLAIN).
+            query: SQL query.
+            parameters: Parameters the statement ran with.
+            elapsed: Seconds spent executing and fetching.
+            rows: Rows returned or affected.
+            commit_time: Seconds spent committing it.
+        """
+        rows = max(rows, 0)
+        self.query_stats.record(query, elapsed, rows, commit_time)
+
+        total = elapsed + commit_time
+        if self.slow_query_threshold <= 0 or total < self.slow_query_threshold:
+            return
+
+        self.query_stats.slow_queries += 1
+        plan = await self._explain(conn, query, parameters)
+        logger.warning(
+            f"Slow query ({total * 1000:.1f} ms, {rows} row(s)): "
+            f"{query_template(query)} | plan: {plan}"
+        )
+
+    @staticmethod
+    async def _explain(conn: aiosqlite.Connection, query: str, parameters) -> str:
+        """Get a one-line EXPLAIN QUERY PLAN for a statement."""
+        template = query_template(query)
+        if not template.upper().startswith(
+            ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+        ):
+            return "n/a"
+        try:
+            cursor = await conn.execute(f"EXPLAIN QUERY PLAN {query}", parameters)
+            steps = await cursor.fetchall()
+        except sqlite3.Error as e:
+            return f"unavailable ({e})"
+        return "; ".join(step[3] for step in steps)
+
+    async def _run_committer(self):
+        """Collect queued writes into batches and commit each batch once."""
+        while True:
+            batch = [await self._write_queue.get()]
+            if self.group_commit_window > 0:
+                await asyncio.sleep(self.group_commit_window)
+            while (
+                len(batch) < self.group_commit_max_batch
+                and not self._write_queue.empty()
+            ):
+                batch.append(self._write_queue.get_nowait())
+
+            try:
+                await self._commit_batch(batch)
+            except Exception as e:
+                logger.error(f"Group commit failed: {e}", exc_info=True)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
+    async def _commit_batch(self, batch: List[tuple]):
+        """
+        Apply a batch of queued writes in a single transaction.
+
+        Each statement runs inside its own savepoint, so one failing write
+        only fails its own caller and does not roll back the rest.
+
+        Args:
+            batch: List of (query, parameters, future) tuples.
+        """
+        results = []
+        async with self._writer() as conn:
+            await conn.execute("BEGIN")
+            try:
+                for query, parameters, future in batch:
+                    await conn.execute("SAVEPOINT group_write")
+                    try:
+                        cursor, elapsed = await self._timed_execute(
+                            conn, query, parameters
+                        )
+                    except Exception as e:
+                        await conn.execute("ROLLBACK TO group_write")
+                        results.append((future, None, e, 0.0))
+                    else:
+                        results.append((future, cursor, None, elapsed))
+                    await conn.execute("RELEASE group_write")
+
+                commit_time = await self._timed_commit(conn)
+            except Exception:
+                await conn.rollback()
+                raise
+
+            # The shared commit is split evenly across the batch
+            commit_share = commit_time / len(batch)
+            for (query, parameters, _), (_, cursor, error, elapsed) in zip(
+                batch, results
+            ):
+                if error is None:
+                    await self._record_query(
+                        conn, query, parameters, elapsed, cursor.rowcount, commit_share
+                    )
+
+        metrics = self._group_commit_metrics
+        metrics["batches"] += 1
+        metrics["writes"] += len(batch)
+        metrics["batch_size_max"] = max(metrics["batch_size_max"], len(batch))
+        metrics["commit_time_total"] += commit_time
+        metrics["commit_time_max"] = max(metrics["commit_time_max"], commit_time)
+
+        for future, cursor, error, _ in results:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(cursor)
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Borrow a connection for a read.
+
+        Falls back to the writer connection when pooling is disabled.
+
+        Raises:
+            TimeoutError: If no reader becomes free within ``acquire_timeout``.
+        """
+        transaction = self._current_transaction()
+        if transaction is not None:
+            # Reads inside a transaction must see its uncommitted writes
+            yield transaction.conn
+            return
+
+        conn = await self.get_connection()
+        if not self.pool_enabled:
+            yield conn
+            return
+
+        started = time.perf_counter()
+        try:
+            reader = await asyncio.wait_for(
+                self._reader_queue.get(), timeout=self.acquire_timeout
             )
-        """)
+        except asyncio.TimeoutError:
+            self._pool_metrics["read_timeouts"] += 1
+            raise TimeoutError(
+                f"Timed out after {self.acquire_timeout}s waiting for a read connection"
+            )
+        self._record_wait("read", time.perf_counter() - started)
 
-        # Create indexes for performance
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_tasks_user_id ON tasks(user_id)
-        """)
+        try:
+            yield reader
+        finally:
+            self._reader_queue.put_nowait(reader)
 
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date)
-        """)
+    @asynccontextmanager
+    async def _writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Borrow the writer connection for a write and its commit.
 
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_tasks_reminded ON tasks(reminded)
-        """)
+        The writer is locked even without a read pool, so a statement and its
+        commit never interleave with a group-commit batch.
 
-        await conn.commit()
-        logger.info("Database schema initialized successfully")
+        Raises:
+            TimeoutError: If the writer is not free within ``acquire_timeout``.
+            RuntimeError: If this task already holds the writer in a transaction.
+        """
+        if self._current_transaction() is not None:
+            raise RuntimeError("This operation cannot run inside a transaction")
+
+        conn = await self.get_connection()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                self._write_lock.acquire(), timeout=self.acquire_timeout
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"Timed out after {self.acquire_timeout}s waiting for the writer"
+            )
+        self._record_wait("write", time.perf_counter() - started)
+
+        try:
+            yield conn
+        finally:
+            self._write_lock.release()
+
+    @asynccontextmanager
+    async def _write_connection(
+        self,
+    ) -> AsyncIterator[Tuple[aiosqlite.Connection, bool]]:
+        """
+        Borrow the connection a write should run on.
+
+        Yields:
+            Tuple of (connection, autocommit). Inside a transaction this is
+            the transaction's connection and autocommit is False; otherwise
+            it is the locked writer and the caller commits.
+        """
+        transaction = self._current_transaction()
+        if transaction is not None:
+            yield transaction.conn, False
+            return
+
+        async with self._writer() as conn:
+            yield conn, True
+
+    @property
+    def in_transaction(self) -> bool:
+        """Whether the current task has a ``transaction()`` block open."""
+        return self._current_transaction() is not None
+
+    def _current_transaction(self) -> Optional[_Transaction]:
+        """Get the transaction opened by the current task, if any."""
+        transaction = self._transaction.get()
+        if transaction is None or transaction.owner is not asyncio.current_task():
+            return None
+        return transaction
+
+    def after_transaction(self, callback: Callable[..., Any], *args) -> bool:
+        """
+        Run a callback when the current task's transaction ends.
+
+        The callback runs after both commit and rollback. Outside a
+        transaction there is nothing to wait for and nothing is scheduled.
+
+        Args:
+            callback: Function to call.
+            *args: Arguments for the callback.
+
+        Returns:
+            True if the callback was scheduled.
+        """
+        transaction = self._current_transaction()
+        if transaction is None:
+            return False
+        transaction.callbacks.append((callback, args))
+        return True
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Group several statements into one unit of work with a single commit.
+
+        Every ``execute``/``fetch`` call made by the same task inside the
+        block runs on the transaction's connection and skips its own commit,
+        so model methods can be combined freely. Nested blocks become
+        savepoints: an error inside one rolls back only that block. The
+        outermost block commits on success and rolls back on any error.
+
+        Tasks started inside the block (``asyncio.gather``, ``create_task``)
+        do not join it: their writes wait for the writer until the block
+        ends, so awaiting such writes inside the block times out. Their reads
+        use the read pool and see only committed data, but without a pool
+        they share the writer connection and can see the block's
+        uncommitted writes.
+
+        Yields:
+            The writer connection the transaction runs on.
+        """
+        current = self._current_transaction()
+        if current is not None:
+            current.depth += 1
+            savepoint = f"unit_of_work_{current.depth}"
+            self._transaction_metrics["savepoints"] += 1
+            await current.conn.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield current.conn
+            except BaseException:
+                await current.conn.execute(f"ROLLBACK TO {savepoint}")
+                raise
+            finally:
+                await current.conn.execute(f"RELEASE {savepoint}")
+                current.depth -= 1
+            return
+
+        requested = time.perf_counter()
+        async with self._writer() as conn:
+            started = time.perf_counter()
+            transaction = _Transaction(conn)
+            token = self._transaction.set(transaction)
+            committed = False
+            try:
+                await conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                except BaseException:
+                    await conn.rollback()
+                    raise
+                await conn.commit()
+                committed = True
+            finally:
+                self._transaction.reset(token)
+                self._record_transaction(
+                    time.perf_counter() - started, started - requested, committed
+                )
+                for callback, args in transaction.callbacks:
+                    callback(*args)
+
+    def _record_transaction(self, duration: float, lock_wait: float, committed: bool):
+        """Record the outcome and timings of a finished transaction."""
+        metrics = self._transaction_metrics
+        metrics["transactions"] += 1
+        metrics["commits" if committed else "rollbacks"] += 1
+        metrics["duration_total"] += duration
+        metrics["duration_max"] = max(metrics["duration_max"], duration)
+        metrics["lock_wait_total"] += lock_wait
+        metrics["lock_wait_max"] = max(metrics["lock_wait_max"], lock_wait)
+
+    async def initialize(self):
+        """
+        Initialize database schema.
+
+        Applies any pending schema migrations. When the schema is already at
+        the latest version no DDL is run.
+        """
+        async with self._writer() as conn:
+            applied = await migrate(conn)
+        logger.info(
+            f"Database schema initialized successfully ({applied} migration(s) applied)"
+        )
 
     async def get_connection(self) -> aiosqlite.Connection:
         """
@@ -120,11 +763,54 @@ class Database:
         Returns:
             Cursor object.
         """
-        conn = await self.get_connection()
-        cursor = await conn.execute(query, parameters)
-        await conn.commit()
+        if self.group_commit and not self.in_transaction:
+            await self.get_connection()
+            future = asyncio.get_running_loop().create_future()
+            await self._write_queue.put((query, parameters, future))
+            return await future
+
+        async with self._write_connection() as (conn, autocommit):
+            cursor, elapsed = await self._timed_execute(conn, query, parameters)
+            commit_time = await self._timed_commit(conn) if autocommit else 0.0
+            await self._record_query(
+                conn, query, parameters, elapsed, cursor.rowcount, commit_time
+            )
         return cursor
 
+    async def execute_returning(
+        self,
+        query: str,
+        parameters: tuple = (),
+        row_factory: Optional[Callable[[Any, tuple], Any]] = None,
+    ) -> list:
+        """
+        Execute a write with a ``RETURNING`` clause and commit it.
+
+        The returned rows are read before the commit, so the check and the
+        write happen in one atomic statement. Group commit is bypassed
+        because the caller needs the rows, not just a cursor.
+
+        Args:
+            query: SQL statement ending in ``RETURNING ...``.
+            parameters: Query parameters.
+            row_factory: Optional factory building each row (e.g. a record type).
+
+        Returns:
+            List of returned rows (empty if no row matched).
+        """
+        async with self._write_connection() as (conn, autocommit):
+            cursor, elapsed = await self._timed_execute(conn, query, parameters)
+            if row_factory is not None:
+                cursor.row_factory = row_factory
+            started = time.perf_counter()
+            rows = await cursor.fetchall()
+            elapsed += time.perf_counter() - started
+            commit_time = await self._timed_commit(conn) if autocommit else 0.0
+            await self._record_query(
+                conn, query, parameters, elapsed, len(rows), commit_time
+            )
+        return rows
+
     async def execute_many(self, query: str, parameters_list: list):
         """
         Execute a SQL statement multiple times.
@@ -133,42 +819,157 @@ class Database:
             query: SQL query to execute.
             parameters_list: List of parameter tuples.
         """
-        conn = await self.get_connection()
-        await conn.executemany(query, parameters_list)
-        await conn.commit()
+        async with self._write_connection() as (conn, autocommit):
+            cursor, elapsed = await self._timed_execute(
+                conn, query, parameters_list, many=True
+            )
+            commit_time = await self._timed_commit(conn) if autocommit else 0.0
+            first = parameters_list[0] if parameters_list else ()
+            await self._record_query(
+                conn, query, first, elapsed, cursor.rowcount, commit_time
+            )
+
+    async def execute_batch(self, statements: List[Tuple[str, tuple]]) -> List[int]:
+        """
+        Execute several SQL statements in one transaction with one commit.
+
+        Args:
+            statements: List of (query, parameters) tuples.
 
-    async def fetch_one(self, query: str, parameters: tuple = ()):
+        Returns:
+            Row count of each statement.
+        """
+        rowcounts = []
+        timings = []
+        async with self._write_connection() as (conn, autocommit):
+            # Inside a transaction the batch becomes a savepoint instead
+            await conn.execute("BEGIN" if autocommit else "SAVEPOINT batch")
+            try:
+                for query, parameters in statements:
+                    cursor, elapsed = await self._timed_execute(conn, query, parameters)
+                    rowcounts.append(cursor.rowcount)
+                    timings.append(elapsed)
+                if autocommit:
+                    commit_time = await self._timed_commit(conn)
+                else:
+                    await conn.execute("RELEASE batch")
+                    commit_time = 0.0
+            except Exception:
+                if autocommit:
+                    await conn.rollback()
+                else:
+                    await conn.execute("ROLLBACK TO batch")
+                    await conn.execute("RELEASE batch")
+                raise
+
+            commit_share = commit_time / len(statements) if statements else 0.0
+            for (query, parameters), elapsed, rowcount in zip(
+                statements, timings, rowcounts
+            ):
+                await self._record_query(
+                    conn, query, parameters, elapsed, rowcount, commit_share
+                )
+        return rowcounts
+
+    async def file_stats(self) -> Dict[str, int]:
+        """
+        Get database file page statistics.
+
+        Returns:
+            Dictionary with page_size, page_count, freelist_count and size_bytes.
+        """
+        stats = {}
+        for pragma in ("page_size", "page_count", "freelist_count"):
+            row = await self.fetch_one(f"PRAGMA {pragma}")
+            stats[pragma] = row[0]
+        stats["size_bytes"] = stats["page_size"] * stats["page_count"]
+        return stats
+
+    async def incremental_vacuum(self, pages: int = 0) -> int:
+        """
+        Return free pages to the filesystem without a full VACUUM.
+
+        Only effective when the database uses ``auto_vacuum = INCREMENTAL``.
+
+        Args:
+            pages: Maximum pages to release (0 releases all free pages).
+
+        Returns:
+            Number of bytes reclaimed.
+        """
+        before = await self.file_stats()
+        async with self._writer() as conn:
+            cursor = await conn.execute(f"PRAGMA incremental_vacuum({int(pages)})")
+            # The pragma frees pages as its rows are stepped
+            await cursor.fetchall()
+            await conn.commit()
+        after = await self.file_stats()
+        return before["size_bytes"] - after["size_bytes"]
+
+    async def fetch_one(
+        self,
+        query: str,
+        parameters: tuple = (),
+        row_factory: Optional[Callable[[Any, tuple], Any]] = None,
+    ):
         """
         Fetch a single row from the database.
 
         Args:
             query: SQL query to execute.
             parameters: Query parameters.
+            row_factory: Optional factory building each row (e.g. a record type).
 
         Returns:
-            Single row as aiosqlite.Row or None.
+            Single row as aiosqlite.Row (or ``row_factory`` result) or None.
         """
-        conn = await self.get_connection()
-        cursor = await conn.execute(query, parameters)
-        row = await cursor.fetchone()
+        async with self._reader() as conn:
+            cursor, elapsed = await self._timed_execute(conn, query, parameters)
+            if row_factory is not None:
+                cursor.row_factory = row_factory
+            started = time.perf_counter()
+            row = await cursor.fetchone()
+            elapsed += time.perf_counter() - started
+            await self._record_query(
+                conn, query, parameters, elapsed, int(row is not None)
+            )
         return row
 
-    async def fetch_all(self, query: str, parameters: tuple = ()):
+    async def fetch_all(
+        self,
+        query: str,
+        parameters: tuple = (),
+        row_factory: Optional[Callable[[Any, tuple], Any]] = None,
+    ):
         """
         Fetch all rows from the database.
 
         Args:
             query: SQL query to execute.
             parameters: Query parameters.
+            row_factory: Optional factory building each row (e.g. a record type).
 
         Returns:
-            List of rows as aiosqlite.Row objects.
+            List of rows as aiosqlite.Row objects (or ``row_factory`` results).
         """
-        conn = await self.get_connection()
-        cursor = await conn.execute(query, parameters)
-        rows = await cursor.fetchall()
+        async with self._reader() as conn:
+            cursor, elapsed = await self._timed_execute(conn, query, parameters)
+            if row_factory is not None:
+                cursor.row_factory = row_factory
+            started = time.perf_counter()
+            rows = await cursor.fetchall()
+            elapsed += time.perf_counter() - started
+            await self._record_query(conn, query, parameters, elapsed, len(rows))
         return rows
 
 
 # Global database instance
-db = Database()
+db = Database(
+    read_pool_size=Config.DB_READ_POOL_SIZE,
+    acquire_timeout=Config.DB_POOL_ACQUIRE_TIMEOUT,
+    pragma_profile=Config.DB_PRAGMA_PROFILE,
+    group_commit=Config.DB_GROUP_COMMIT,
+    group_commit_window=Config.DB_GROUP_COMMIT_WINDOW_MS / 1000,
+    group_commit_max_batch=Config.DB_GROUP_COMMIT_MAX_BATCH,
+    slow_query_threshold=Config.DB_SLOW_QUERY_MS / 1000,
+)
@@ -0,0 +1,452 @@
+"""
+Versioned schema migrations for StudyBuddy.
+
+Each migration has a version number and either a list of SQL statements
+(applied in one transaction) or an async ``apply`` function for online
+migrations that commit in small steps. Applied versions are recorded in the
+``schema_version`` table, so startup only runs migrations that are newer
+than the database and skips all DDL when it is already current.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+# Rows rewritten per transaction by online data migrations
+DEFAULT_BATCH_SIZE = 5000
+
+
+class Migration:
+    """A single schema migration step."""
+
+    def __init__(
+        self,
+        version: int,
+        description: str,
+        statements: Sequence[str] = (),
+        apply: Optional[Callable[[aiosqlite.Connection], Awaitable[None]]] = None,
+    ):
+        """
+        Initialize migration.
+
+        Args:
+            version: Schema version this migration upgrades to.
+            description: Short human-readable summary.
+            statements: SQL statements run together in one transaction.
+            apply: Async function for online migrations; it receives the
+                writer connection and is responsible for its own commits.
+        """
+        if bool(statements) == bool(apply):
+            raise ValueError(
+                f"Migration {version} needs either statements or apply, not both"
+            )
+        self.version = version
+        self.description = description
+        self.statements = list(statements)
+        self.apply = apply
+
+    def __repr__(self) -> str:
+        return f"Migration({self.version}, {self.description!r})"
+
+
+async def update_in_batches(
+    conn: aiosqlite.Connection,
+    table: str,
+    assignments: str,
+    condition: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Rewrite rows of a table in rowid order, one short transaction per batch.
+
+    Args:
+        conn: Writer connection.
+        table: Table to update.
+        assignments: SQL ``SET`` clause body (e.g. ``"col = col + 1"``).
+        condition: SQL condition selecting rows that still need the update,
+            so an interrupted run can be resumed.
+        batch_size: Rows scanned per transaction.
+
+    Returns:
+        Number of rows updated.
+    """
+    last_rowid = 0
+    updated = 0
+
+    while True:
+        cursor = await conn.execute(
+            f"SELECT MAX(rowid) FROM (SELECT rowid FROM {table} "
+            f"WHERE rowid > ? ORDER BY rowid LIMIT ?)",
+            (last_rowid, batch_size),
+        )
+        row = await cursor.fetchone()
+        batch_end = row[0]
+        if batch_end is None:
+            break
+
+        cursor = await conn.execute(
+            f"UPDATE {table} SET {assignments} "
+            f"WHERE rowid > ? AND rowid <= ? AND ({condition})",
+            (last_rowid, batch_end),
+        )
+        await conn.commit()
+        updated += cursor.rowcount
+        last_rowid = batch_end
+
+        # Let queued queries run between batches
+        await asyncio.sleep(0)
+
+    logger.info(f"Updated {updated} row(s) in {table}")
+    return updated
+
+
+async def switch_indexes(
+    conn: aiosqlite.Connection,
+    create_statements: Sequence[str],
+    drop_indexes: Sequence[str],
+):
+    """
+    Replace indexes without leaving queries unindexed in between.
+
+    New indexes are built first, each in its own transaction, and the old
+    ones are dropped afterwards, so the write lock is only held for one
+    index build at a time.
+
+    Args:
+        conn: Writer connection.
+        create_statements: ``CREATE INDEX IF NOT EXISTS`` statements.
+        drop_indexes: Names of indexes to drop once the new ones exist.
+    """
+    for statement in create_statements:
+        await conn.execute(statement)
+        await conn.commit()
+        await asyncio.sleep(0)
+
+    for index_name in drop_indexes:
+        await conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+        await conn.commit()
+
+
+async def _composite_task_indexes(conn: aiosqlite.Connection):
+    """
+    Replace the single-column task indexes with composite and partial ones.
+
+    ``(user_id, due_date)`` serves the per-user list queries without a sort,
+    and the partial ``due_date`` index over unreminded rows serves the
+    reminder scan while staying small as tasks get reminded.
+    """
+    await switch_indexes(
+        conn,
+        [
+            "CREATE INDEX IF NOT EXISTS idx_tasks_user_due "
+            "ON tasks(user_id, due_date)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_unreminded_due "
+            "ON tasks(due_date) WHERE reminded = 0",
+        ],
+        ["idx_tasks_user_id", "idx_tasks_due_date", "idx_tasks_reminded"],
+    )
+
+
+async def convert_to_incremental_vacuum(conn: aiosqlite.Connection) -> bool:
+    """
+    Switch a database to incremental auto-vacuum.
+
+    Changing auto_vacuum on a database that has tables needs one full VACUUM,
+    which rewrites and locks the whole file and cannot run inside a
+    transaction. After this, space freed by the archive job is returned with
+    cheap ``PRAGMA incremental_vacuum`` calls.
+
+    Args:
+        conn: Writer connection.
+
+    Returns:
+        True if the database was converted, False if it already was.
+    """
+    cursor = await conn.execute("PRAGMA auto_vacuum")
+    row = await cursor.fetchone()
+    if row[0] == 2:  # Already INCREMENTAL
+        return False
+
+    await conn.commit()
+    await conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    await conn.execute("VACUUM")
+    return True
+
+
+async def _enable_incremental_vacuum(conn: aiosqlite.Connection):
+    """
+    Enable incremental auto-vacuum on databases that hold no data yet.
+
+    On an empty database the VACUUM is instant. Existing deployments are left
+    as they are, since a full VACUUM at startup could block for minutes; they
+    are converted offline with ``python -m database.vacuum``.
+    """
+    cursor = await conn.execute(
+        "SELECT EXISTS (SELECT 1 FROM users) OR EXISTS (SELECT 1 FROM tasks) "
+        "OR EXISTS (SELECT 1 FROM tasks_archive)"
+    )
+    row = await cursor.fetchone()
+    if row[0]:
+        logger.warning(
+            "Incremental auto-vacuum is not enabled on this existing database; "
+            "stop the bot and run 'python -m database.vacuum' to convert it"
+        )
+        return
+
+    await convert_to_incremental_vacuum(conn)
+
+
+async def _epoch_day_due_dates(conn: aiosqlite.Connection):
+    """
+    Convert ISO text due dates to integer days since 1970-01-01.
+
+    ``due_date`` is declared ``DATE`` (NUMERIC affinity), so integers are
+    stored as integers and the existing indexes keep working; only the
+    values are rewritten. Rows that are already integers are skipped.
+    """
+    for table in ("tasks", "tasks_archive"):
+        await update_in_batches(
+            conn,
+            table,
+            "due_date = CAST(julianday(due_date) - 2440587.5 AS INTEGER)",
+            "typeof(due_date) = 'text'",
+        )
+
+
+# Ordered list of all migrations. Append new ones; never edit applied ones.
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "Initial schema: users, tasks and single-column task indexes",
+        statements=[
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                user_id INTEGER PRIMARY KEY,
+                username TEXT,
+                first_name TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                task_type TEXT NOT NULL,
+                title TEXT NOT NULL,
+                due_date DATE NOT NULL,
+                reminded BOOLEAN DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_tasks_user_id ON tasks(user_id)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_reminded ON tasks(reminded)",
+        ],
+    ),
+    Migration(
+        2,
+        "Composite (user_id, due_date) and partial unreminded task indexes",
+        apply=_composite_task_indexes,
+    ),
+    Migration(
+        3,
+        "Archive table for past tasks",
+        statements=[
+            """
+            CREATE TABLE IF NOT EXISTS tasks_archive (
+                id INTEGER PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                task_type TEXT NOT NULL,
+                title TEXT NOT NULL,
+                due_date DATE NOT NULL,
+                reminded BOOLEAN DEFAULT 0,
+                created_at TIMESTAMP,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_tasks_archive_user_due "
+            "ON tasks_archive(user_id, due_date)",
+        ],
+    ),
+    Migration(
+        4,
+        "Incremental auto-vacuum (new databases; existing ones offline)",
+        apply=_enable_incremental_vacuum,
+    ),
+    Migration(
+        5,
+        "Store task due dates as integer epoch days",
+        apply=_epoch_day_due_dates,
+    ),
+    Migration(
+        6,
+        "Reminder outbox with retry scheduling and dead letters",
+        statements=[
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                task_ids TEXT NOT NULL,
+                message TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_outbox_status_due "
+            "ON outbox(status, next_attempt_at)",
+            "CREATE INDEX IF NOT EXISTS idx_outbox_user ON outbox(user_id)",
+        ],
+    ),
+    Migration(
+        7,
+        "Active flag for users who blocked the bot",
+        statements=[
+            "ALTER TABLE users ADD COLUMN is_active INTEGER NOT NULL DEFAULT 1",
+            "ALTER TABLE users ADD COLUMN blocked_at TIMESTAMP",
+        ],
+    ),
+    Migration(
+        8,
+        "Per-user timezone and reminder hour",
+        statements=[
+            "ALTER TABLE users ADD COLUMN timezone TEXT",
+            "ALTER TABLE users ADD COLUMN reminder_hour INTEGER",
+        ],
+    ),
+    Migration(
+        9,
+        "Leader leases and outbox claims for running several instances",
+        statements=[
+            """
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """,
+            "ALTER TABLE outbox ADD COLUMN claimed_by TEXT",
+            "ALTER TABLE outbox ADD COLUMN claimed_until REAL",
+        ],
+    ),
+]
+
+
+def latest_version(migrations: Sequence[Migration] = MIGRATIONS) -> int:
+    """
+    Get the newest schema version defined by the migrations.
+
+    Args:
+        migrations: Ordered migrations.
+
+    Returns:
+        Highest migration version, or 0 if there are none.
+    """
+    return migrations[-1].version if migrations else 0
+
+
+async def get_schema_version(conn: aiosqlite.Connection) -> int:
+    """
+    Read the current schema version of a database.
+
+    Args:
+        conn: Database connection.
+
+    Returns:
+        Highest applied version, or 0 for a database without migrations.
+    """
+    try:
+        cursor = await conn.execute("SELECT MAX(version) FROM schema_version")
+    except sqlite3.OperationalError:
+        return 0
+    row = await cursor.fetchone()
+    return row[0] or 0
+
+
+async def migrate(
+    conn: aiosqlite.Connection, migrations: Sequence[Migration] = MIGRATIONS
+) -> int:
+    """
+    Bring the database schema up to the latest version.
+
+    Args:
+        conn: Writer connection.
+        migrations: Ordered migrations to apply.
+
+    Returns:
+        Number of migrations applied.
+
+    Raises:
+        ValueError: If migration versions are not strictly increasing.
+        RuntimeError: If the database is newer than the known migrations.
+    """
+    versions = [migration.version for migration in migrations]
+    if versions != sorted(set(versions)):
+        raise ValueError("Migration versions must be unique and increasing")
+
+    target = latest_version(migrations)
+    current = await get_schema_version(conn)
+
+    # Fast path: schema is current, run no DDL at all
+    if current == target:
+        logger.info(f"Database schema is up to date (version {current})")
+        return 0
+
+    if current > target:
+        raise RuntimeError(
+            f"Database schema version {current} is newer than this code ({target})"
+        )
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    await conn.commit()
+
+    applied = 0
+    for migration in migrations:
+        if migration.version <= current:
+            continue
+
+        started = time.perf_counter()
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+
+        try:
+            if migration.apply is not None:
+                await migration.apply(conn)
+            else:
+                # DDL is transactional in SQLite but not implicitly begun
+                await conn.execute("BEGIN")
+                for statement in migration.statements:
+                    await conn.execute(statement)
+
+            await conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (migration.version, migration.description),
+            )
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            logger.error(f"Migration {migration.version} failed", exc_info=True)
+            raise
+
+        applied += 1
+        logger.info(
+            f"Applied migration {migration.version} "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+    return applied
@@ -4,14 +4,79 @@ Database models and CRUD operations for StudyBuddy.
 This module provides data access layer for users and tasks.
 """
 
+import asyncio
+import heapq
 import logging
-from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, Optional
+import os
+import socket
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from database.db import db
+from database.activity import activity_buffer
+from database.cache import task_cache
+from database.db import Database, db
+from database.reminder_queue import is_reminder_open, reminder_queue
+from database.records import (
+    OUTBOX_COLUMNS,
+    TASK_COLUMNS,
+    TASK_COLUMNS_T,
+    USER_COLUMNS,
+    OutboxRecord,
+    TaskRecord,
+    UserRecord,
+    from_epoch_day,
+    to_epoch_day,
+    utc_today,
+)
+from database.sharding import shard_router
 
 logger = logging.getLogger(__name__)
 
+# Most IDs bound in one ``IN (...)`` list, well under SQLite's parameter limit
+MAX_IN_PARAMS = 500
+
+# RETURNING columns reading a task owner's reminder settings in the same
+# statement as a write, so queueing the reminder needs no extra round trip
+OWNER_SETTINGS_COLUMNS = (
+    "(SELECT timezone FROM users WHERE users.user_id = tasks.user_id) AS timezone, "
+    "(SELECT reminder_hour FROM users WHERE users.user_id = tasks.user_id) "
+    "AS reminder_hour"
+)
+
+
+def _user_db(user_id: int) -> Database:
+    """Get the database holding a user's rows (their shard, when sharded)."""
+    return shard_router.for_user(user_id) if shard_router else db
+
+
+def _task_db(task_id: int) -> Database:
+    """Get the database holding a task (its shard, when sharded)."""
+    return shard_router.for_task(task_id) if shard_router else db
+
+
+def _outbox_db(outbox_id: int) -> Database:
+    """Get the database holding an outbox row (its ID carries the shard)."""
+    return shard_router.for_task(outbox_id) if shard_router else db
+
+
+def _all_dbs() -> List[Database]:
+    """Get every database global scans must visit."""
+    return shard_router.shards if shard_router else [db]
+
+
+def _control_db() -> Database:
+    """Get the database holding instance-wide state such as leases."""
+    return shard_router.shards[0] if shard_router else db
+
+
+def _invalidate_user(user_id: int):
+    """Drop a user's cached tasks now and again when an open transaction ends."""
+    task_cache.invalidate_user(user_id)
+    # Readers outside the transaction may re-cache pre-commit rows meanwhile
+    _user_db(user_id).after_transaction(task_cache.invalidate_user, user_id)
+
 
 class User:
     """User model for database operations."""
@@ -23,60 +88,179 @@ class User:
         """
         Create a new user or update existing user's last_active timestamp.
 
+        Only the first sighting of a user touches the database synchronously;
+        after that the last_active update goes through the write-behind
+        activity buffer.
+
         Args:
             user_id: Telegram user ID.
             username: Telegram username.
             first_name: User's first name.
         """
-        # Check if user exists
-        existing_user = await db.fetch_one(
-            "SELECT user_id FROM users WHERE user_id = ?", (user_id,)
+        if activity_buffer.is_known(user_id):
+            await activity_buffer.record(user_id)
+            return
+
+        # First sighting in this process: insert or touch in one statement
+        await _user_db(user_id).execute(
+            """
+            INSERT INTO users (user_id, username, first_name, created_at, last_active)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            ON CONFLICT(user_id) DO UPDATE SET last_active = excluded.last_active
+            """,
+            (user_id, username, first_name),
         )
+        logger.info(f"Upserted user {user_id}")
+
+        activity_buffer.mark_known(user_id)
 
-        if existing_user:
-            # Update last_active
-            await db.execute(
-                "UPDATE users SET last_active = CURRENT_TIMESTAMP WHERE user_id = ?",
+    @staticmethod
+    async def get(user_id: int) -> Optional[UserRecord]:
+        """
+        Get user by ID.
+
+        Args:
+            user_id: Telegram user ID.
+
+        Returns:
+            User record or None if not found.
+        """
+        return await _user_db(user_id).fetch_one(
+            f"SELECT {USER_COLUMNS} FROM users WHERE user_id = ?",
+            (user_id,),
+            row_factory=UserRecord.row_factory,
+        )
+
+    @staticmethod
+    async def get_all() -> List[UserRecord]:
+        """
+        Get all users.
+
+        Reads every shard concurrently and merges the results by user ID.
+
+        Returns:
+            List of user records ordered by user ID.
+        """
+        shard_results = await asyncio.gather(
+            *(
+                database.fetch_all(
+                    f"SELECT {USER_COLUMNS} FROM users ORDER BY user_id",
+                    row_factory=UserRecord.row_factory,
+                )
+                for database in _all_dbs()
+            )
+        )
+        return list(heapq.merge(*shard_results, key=lambda user: user.user_id))
+
+    @staticmethod
+    async def deactivate(user_id: int) -> bool:
+        """
+        Mark a user inactive after Telegram reports the chat unreachable.
+
+        Their pending outbox rows are dead-lettered in the same transaction,
+        and reminder scans skip them until they are reactivated.
+
+        Args:
+            user_id: Telegram user ID.
+
+        Returns:
+            True if the user was active before.
+        """
+        database = _user_db(user_id)
+        async with database.transaction():
+            cursor = await database.execute(
+                """
+                UPDATE users SET is_active = 0, blocked_at = CURRENT_TIMESTAMP
+                WHERE user_id = ? AND is_active = 1
+                """,
                 (user_id,),
             )
-            logger.info(f"Updated last_active for user {user_id}")
-        else:
-            # Create new user
-            await db.execute(
+            if cursor.rowcount == 0:
+                return False
+            await database.execute(
                 """
-                INSERT INTO users (user_id, username, first_name, created_at, last_active)
-                VALUES (?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                UPDATE outbox SET status = 'dead', last_error = 'User is inactive'
+                WHERE user_id = ? AND status = 'pending'
                 """,
-                (user_id, username, first_name),
+                (user_id,),
             )
-            logger.info(f"Created new user {user_id} ({first_name})")
+
+        logger.info(f"Deactivated user {user_id}: chat is unreachable")
+        return True
 
     @staticmethod
-    async def get(user_id: int) -> Optional[Dict[str, Any]]:
+    async def reactivate(user_id: int) -> bool:
         """
-        Get user by ID.
+        Mark a user active again, e.g. when they send /start after unblocking.
 
         Args:
             user_id: Telegram user ID.
 
         Returns:
-            User data as dictionary or None if not found.
+            True if the user was inactive before.
         """
-        row = await db.fetch_one("SELECT * FROM users WHERE user_id = ?", (user_id,))
-        if row:
-            return dict(row)
-        return None
+        cursor = await _user_db(user_id).execute(
+            """
+            UPDATE users SET is_active = 1, blocked_at = NULL
+            WHERE user_id = ? AND is_active = 0
+            """,
+            (user_id,),
+        )
+        if cursor.rowcount == 0:
+            return False
+
+        # Their tasks were left out of the reminder queue while inactive
+        if reminder_queue.loaded_from is not None:
+            await Task._queue_user_reminders(
+                user_id, reminder_queue.loaded_from, reminder_queue.loaded_until
+            )
+        logger.info(f"Reactivated user {user_id}")
+        return True
 
     @staticmethod
-    async def get_all() -> List[Dict[str, Any]]:
+    async def set_reminder_settings(
+        user_id: int, tz_name: Optional[str] = None, reminder_hour: Optional[int] = None
+    ) -> bool:
         """
-        Get all users.
+        Update a user's timezone and/or local reminder hour.
+
+        Reminders already queued for the user are moved to the new time.
+
+        Args:
+            user_id: Telegram user ID.
+            tz_name: IANA timezone name (optional).
+            reminder_hour: Local hour 0-23 on the eve of a due date (optional).
 
         Returns:
-            List of user dictionaries.
+            True if the user was updated, False if not found.
         """
-        rows = await db.fetch_all("SELECT * FROM users")
-        return [dict(row) for row in rows]
+        updates = []
+        params: List[Any] = []
+
+        if tz_name is not None:
+            updates.append("timezone = ?")
+            params.append(tz_name)
+
+        if reminder_hour is not None:
+            updates.append("reminder_hour = ?")
+            params.append(reminder_hour)
+
+        if not updates:
+            return await User.get(user_id) is not None
+
+        params.append(user_id)
+        cursor = await _user_db(user_id).execute(
+            f"UPDATE users SET {', '.join(updates)} WHERE user_id = ?", tuple(params)
+        )
+        if cursor.rowcount == 0:
+            return False
+
+        if reminder_queue.loaded_from is not None:
+            await Task._queue_user_reminders(
+                user_id, reminder_queue.loaded_from, reminder_queue.loaded_until
+            )
+        logger.info(f"Updated reminder settings for user {user_id}")
+        return True
 
 
 class Task:
@@ -96,19 +280,89 @@ class Task:
         Returns:
             ID of newly created task.
         """
-        cursor = await db.execute(
-            """
+        database = _user_db(user_id)
+        query = """
             INSERT INTO tasks (user_id, task_type, title, due_date, reminded, created_at)
             VALUES (?, ?, ?, ?, 0, CURRENT_TIMESTAMP)
-            """,
-            (user_id, task_type, title, due_date.isoformat()),
-        )
-        task_id = cursor.lastrowid
+        """
+        params = (user_id, task_type, title, to_epoch_day(due_date))
+
+        if not reminder_queue.covers(due_date):
+            cursor = await database.execute(query, params)
+            task_id = cursor.lastrowid
+            _invalidate_user(user_id)
+        else:
+            # The reminder is queued now, so read the owner's settings too
+            (row,) = await database.execute_returning(
+                f"{query} RETURNING id, {OWNER_SETTINGS_COLUMNS}", params
+            )
+            task_id = row["id"]
+            _invalidate_user(user_id)
+            reminder_queue.schedule(
+                task_id, due_date, row["timezone"], row["reminder_hour"]
+            )
         logger.info(f"Created task {task_id} for user {user_id}: {title}")
         return task_id
 
     @staticmethod
-    async def get_by_id(task_id: int) -> Optional[Dict[str, Any]]:
+    async def create_many(user_id: int, tasks: List[Tuple[str, str, date]]) -> int:
+        """
+        Create several tasks for a user in a single transaction.
+
+        Args:
+            user_id: Telegram user ID.
+            tasks: List of (task_type, title, due_date) tuples.
+
+        Returns:
+            Number of tasks created.
+        """
+        if not tasks:
+            return 0
+
+        await _user_db(user_id).execute_many(
+            """
+            INSERT INTO tasks
+                (user_id, task_type, title, due_date, reminded, created_at)
+            VALUES (?, ?, ?, ?, 0, CURRENT_TIMESTAMP)
+            """,
+            [
+                (user_id, task_type, title, to_epoch_day(due_date))
+                for task_type, title, due_date in tasks
+            ],
+        )
+        _invalidate_user(user_id)
+
+        # IDs are only needed for tasks whose reminder is already queued
+        if any(reminder_queue.covers(due_date) for _, _, due_date in tasks):
+            await Task._queue_user_reminders(
+                user_id, reminder_queue.loaded_from, reminder_queue.loaded_until
+            )
+
+        logger.info(f"Created {len(tasks)} tasks for user {user_id}")
+        return len(tasks)
+
+    @staticmethod
+    async def _queue_user_reminders(user_id: int, start: date, end: date):
+        """Queue reminders for a user's unreminded tasks due in [start, end)."""
+        rows = await _user_db(user_id).fetch_all(
+            """
+            SELECT t.id, t.due_date, u.timezone, u.reminder_hour FROM tasks AS t
+            CROSS JOIN users AS u ON u.user_id = t.user_id
+            WHERE t.user_id = ? AND t.due_date >= ? AND t.due_date < ?
+            AND t.reminded = 0 AND u.is_active = 1
+            """,
+            (user_id, to_epoch_day(start), to_epoch_day(end)),
+        )
+        for row in rows:
+            reminder_queue.schedule(
+                row["id"],
+                from_epoch_day(row["due_date"]),
+                row["timezone"],
+                row["reminder_hour"],
+            )
+
+    @staticmethod
+    async def get_by_id(task_id: int) -> Optional[TaskRecord]:
         """
         Get task by ID.
 
@@ -116,42 +370,158 @@ class Task:
             task_id: Task ID.
 
         Returns:
-            Task data as dictionary or None if not found.
+            Task record or None if not found.
         """
-        row = await db.fetch_one("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        if row:
-            return dict(row)
-        return None
+        return await _task_db(task_id).fetch_one(
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?",
+            (task_id,),
+            row_factory=TaskRecord.row_factory,
+        )
 
     @staticmethod
     async def get_user_tasks(
-        user_id: int, include_past: bool = False
-    ) -> List[Dict[str, Any]]:
+        user_id: int,
+        include_past: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[Any, int]] = None,
+        before: Optional[Tuple[Any, int]] = None,
+    ) -> List[TaskRecord]:
         """
-        Get all tasks for a user, sorted by due date.
+        Get tasks for a user, sorted by due date.
+
+        Supports keyset pagination: pass the ``(due_date, id)`` of the last
+        task on the current page as ``after`` for the next page, or of the
+        first task as ``before`` for the previous page.
 
         Args:
             user_id: Telegram user ID.
             include_past: Whether to include past tasks.
+            limit: Maximum number of tasks to return (None for all).
+            after: Return tasks strictly after this (due_date, id) cursor;
+                due_date may be a date or an ISO string.
+            before: Return tasks strictly before this (due_date, id) cursor.
 
         Returns:
-            List of task dictionaries sorted by due date (earliest first).
+            List of task records sorted by due date (earliest first).
+        """
+        after = Task._cursor_key(after)
+        before = Task._cursor_key(before)
+
+        # Inside a transaction read the database directly, so the cache never
+        # holds rows that may still be rolled back
+        if (
+            not include_past
+            and task_cache.enabled
+            and not task_cache.is_oversized(user_id)
+            and not _user_db(user_id).in_transaction
+        ):
+            tasks = await Task._get_cached_upcoming(user_id)
+            if tasks is not None:
+                return Task._slice_page(tasks, limit, after, before)
+
+        return await Task._query_user_tasks(user_id, include_past, limit, after, before)
+
+    @staticmethod
+    async def _query_user_tasks(
+        user_id: int,
+        include_past: bool,
+        limit: Optional[int],
+        after: Optional[Tuple[date, int]],
+        before: Optional[Tuple[date, int]],
+    ) -> List[TaskRecord]:
+        """
+        Run the keyset-paginated task query against the database.
+
+        Past tasks may have been moved to ``tasks_archive``, so
+        ``include_past`` merges both tables; upcoming-only reads never touch
+        the archive.
         """
+        conditions = ["user_id = ?"]
+        params: List[Any] = [user_id]
+
+        if not include_past:
+            conditions.append("due_date >= ?")
+            params.append(to_epoch_day(utc_today()))
+
+        if after is not None:
+            conditions.append("(due_date, id) > (?, ?)")
+            params.extend((to_epoch_day(after[0]), after[1]))
+
+        if before is not None:
+            conditions.append("(due_date, id) < (?, ?)")
+            params.extend((to_epoch_day(before[0]), before[1]))
+
+        where = " AND ".join(conditions)
         if include_past:
-            query = """
-                SELECT * FROM tasks
-                WHERE user_id = ?
-                ORDER BY due_date ASC
+            query = f"""
+                SELECT {TASK_COLUMNS} FROM tasks WHERE {where}
+                UNION ALL
+                SELECT {TASK_COLUMNS} FROM tasks_archive WHERE {where}
             """
+            params = params * 2
         else:
-            query = """
-                SELECT * FROM tasks
-                WHERE user_id = ? AND due_date >= DATE('now')
-                ORDER BY due_date ASC
-            """
+            query = f"SELECT {TASK_COLUMNS} FROM tasks WHERE {where}"
+
+        # Walk backwards from a "before" cursor, then restore ascending order
+        direction = "DESC" if before is not None else "ASC"
+        query += f" ORDER BY due_date {direction}, id {direction}"
+
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        tasks = await _user_db(user_id).fetch_all(
+            query, tuple(params), row_factory=TaskRecord.row_factory
+        )
+        if before is not None:
+            tasks.reverse()
+        return tasks
+
+    @staticmethod
+    async def _get_cached_upcoming(user_id: int) -> Optional[List[TaskRecord]]:
+        """
+        Get a user's complete upcoming task list through the task cache.
+
+        Returns:
+            Upcoming tasks, or None if the list is too long to cache.
+        """
+        tasks = task_cache.get(user_id)
+        if tasks is None:
+            generation = task_cache.generation(user_id)
+            limit = task_cache.max_tasks_per_user
+            tasks = await Task._query_user_tasks(user_id, False, limit + 1, None, None)
+            task_cache.put(user_id, tasks, generation)
+            if len(tasks) > limit:
+                return None
 
-        rows = await db.fetch_all(query, (user_id,))
-        return [dict(row) for row in rows]
+        # Entries may outlive midnight, so filter on today's UTC date again
+        today = utc_today()
+        return [task for task in tasks if task.due_date >= today]
+
+    @staticmethod
+    def _cursor_key(cursor: Optional[Tuple[Any, int]]) -> Optional[Tuple[date, int]]:
+        """Normalize a (due_date, id) cursor so due_date is a date."""
+        if cursor is None:
+            return None
+        due_date, task_id = cursor
+        if isinstance(due_date, str):
+            due_date = date.fromisoformat(due_date)
+        return due_date, int(task_id)
+
+    @staticmethod
+    def _slice_page(
+        tasks: List[TaskRecord],
+        limit: Optional[int],
+        after: Optional[Tuple[date, int]],
+        before: Optional[Tuple[date, int]],
+    ) -> List[TaskRecord]:
+        """Apply keyset cursors and a limit to an ordered task list in memory."""
+        if after is not None:
+            tasks = [t for t in tasks if (t.due_date, t.id) > after]
+        if before is not None:
+            tasks = [t for t in tasks if (t.due_date, t.id) < before]
+            return tasks[-limit:] if limit is not None else tasks
+        return tasks[:limit] if limit is not None else tasks
 
     @staticmethod
     async def delete(task_id: int) -> bool:
@@ -164,12 +534,17 @@ class Task:
         Returns:
             True if task was deleted, False if not found.
         """
-        # Check if task exists
-        task = await Task.get_by_id(task_id)
-        if not task:
-            return False
+        database = _task_db(task_id)
+        async with database.transaction():
+            deleted = await database.execute_returning(
+                "DELETE FROM tasks WHERE id = ? RETURNING user_id", (task_id,)
+            )
+            if not deleted:
+                return False
+            await Outbox._withdraw_task(database, deleted[0]["user_id"], task_id)
 
-        await db.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        _invalidate_user(deleted[0]["user_id"])
+        reminder_queue.discard(task_id)
         logger.info(f"Deleted task {task_id}")
         return True
 
@@ -185,12 +560,18 @@ class Task:
         Returns:
             True if task was deleted, False if not found or unauthorized.
         """
-        # Verify task belongs to user
-        task = await Task.get_by_id(task_id)
-        if not task or task["user_id"] != user_id:
-            return False
+        database = _task_db(task_id)
+        async with database.transaction():
+            # Ownership check and delete in one statement
+            cursor = await database.execute(
+                "DELETE FROM tasks WHERE id = ? AND user_id = ?", (task_id, user_id)
+            )
+            if cursor.rowcount == 0:
+                return False
+            await Outbox._withdraw_task(database, user_id, task_id)
 
-        await db.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        _invalidate_user(user_id)
+        reminder_queue.discard(task_id)
         logger.info(f"User {user_id} deleted task {task_id}")
         return True
 
@@ -202,34 +583,161 @@ class Task:
         Args:
             task_id: Task ID.
         """
-        await db.execute("UPDATE tasks SET reminded = 1 WHERE id = ?", (task_id,))
+        await _task_db(task_id).execute(
+            "UPDATE tasks SET reminded = 1 WHERE id = ?", (task_id,)
+        )
+        task_cache.invalidate_task(task_id)
+        _task_db(task_id).after_transaction(task_cache.invalidate_task, task_id)
+        reminder_queue.discard(task_id)
         logger.info(f"Marked task {task_id} as reminded")
 
     @staticmethod
-    async def get_tasks_needing_reminder() -> List[Dict[str, Any]]:
+    async def mark_many_as_reminded(task_ids: List[int]) -> Set[int]:
+        """
+        Mark several tasks as reminded with one commit per database.
+
+        IDs are grouped by shard and updated with chunked ``IN (...)``
+        statements inside a single transaction. Called inside an open
+        transaction, the updates join it instead, which is how
+        ``Outbox.enqueue`` claims tasks atomically with its outbox rows.
+
+        Args:
+            task_ids: Task IDs.
+
+        Returns:
+            IDs that were not already marked.
+        """
+        by_database: Dict[Database, List[int]] = {}
+        for task_id in task_ids:
+            by_database.setdefault(_task_db(task_id), []).append(task_id)
+
+        marked: Set[int] = set()
+        for database, ids in by_database.items():
+            async with database.transaction():
+                marked |= await Task._claim_unreminded(database, ids)
+
+        logger.info(f"Marked {len(marked)} of {len(task_ids)} task(s) as reminded")
+        return marked
+
+    @staticmethod
+    async def _claim_unreminded(database: Database, task_ids: List[int]) -> Set[int]:
         """
-        Get all tasks that need reminders (due in 24-25 hours and not yet reminded).
+        Mark tasks on one database as reminded, inside the caller's transaction.
+
+        The ``reminded = 0`` condition makes each update a compare-and-set,
+        so of several writers racing for a task exactly one gets it back.
 
         Returns:
-            List of task dictionaries that need reminders.
+            IDs this call flipped from unreminded to reminded.
         """
-        # Calculate time window: 24 to 25 hours from now
-        now = datetime.now()
-        reminder_start = (now + timedelta(hours=24)).date()
-        reminder_end = (now + timedelta(hours=25)).date()
+        claimed: Set[int] = set()
+        for start in range(0, len(task_ids), MAX_IN_PARAMS):
+            chunk = task_ids[start : start + MAX_IN_PARAMS]
+            rows = await database.execute_returning(
+                f"UPDATE tasks SET reminded = 1 "
+                f"WHERE id IN ({', '.join('?' * len(chunk))}) AND reminded = 0 "
+                f"RETURNING id",
+                tuple(chunk),
+            )
+            claimed.update(row["id"] for row in rows)
+
+        for task_id in task_ids:
+            task_cache.invalidate_task(task_id)
+            database.after_transaction(task_cache.invalidate_task, task_id)
+            reminder_queue.discard(task_id)
+        return claimed
 
+    @staticmethod
+    async def get_tasks_needing_reminder() -> List[TaskRecord]:
+        """
+        Get all tasks whose reminder window is open and that were not reminded.
+
+        A window opens at the owner's reminder hour on the eve of the due
+        date and closes when the due date starts, both in the owner's
+        timezone. Tasks of inactive users are skipped. Scans every shard
+        concurrently and merges the results in due order.
+
+        Returns:
+            List of task records that need reminders.
+        """
+        # Local dates run from UTC-12 to UTC+14, so only tasks due the day
+        # after one of them can have an open window
+        now = datetime.now(timezone.utc)
+        first_due = (now - timedelta(hours=12)).date() + timedelta(days=1)
+        last_due = (now + timedelta(hours=14)).date() + timedelta(days=1)
+
+        # Inactive users are filtered by primary-key lookups in users
+        query = f"""
+            SELECT {TASK_COLUMNS_T}, u.timezone, u.reminder_hour FROM tasks AS t
+            CROSS JOIN users AS u ON u.user_id = t.user_id
+            WHERE t.reminded = 0
+            AND t.due_date >= ?
+            AND t.due_date <= ?
+            AND u.is_active = 1
+            ORDER BY t.due_date ASC, t.id ASC
+        """
+        params = (to_epoch_day(first_due), to_epoch_day(last_due))
+
+        shard_results = await asyncio.gather(
+            *(database.fetch_all(query, params) for database in _all_dbs())
+        )
+        shard_tasks = [
+            [
+                TaskRecord.row_factory(None, tuple(row)[:-2])
+                for row in rows
+                if is_reminder_open(
+                    from_epoch_day(row["due_date"]),
+                    row["timezone"],
+                    row["reminder_hour"],
+                    now,
+                )
+            ]
+            for rows in shard_results
+        ]
+        return list(
+            heapq.merge(*shard_tasks, key=lambda task: (task.due_date, task.id))
+        )
+
+    @staticmethod
+    async def get_reminder_schedule(
+        start: date, end: date
+    ) -> List[Tuple[int, date, Optional[str], Optional[int]]]:
+        """
+        Get unreminded tasks of active users due in a date range.
+
+        Used to load the reminder queue. Scans every shard concurrently.
+
+        Args:
+            start: First due date to include.
+            end: Due date to stop before.
+
+        Returns:
+            List of (task_id, due_date, timezone, reminder_hour) tuples, with
+            the owner's settings (None where they use the defaults).
+        """
         query = """
-            SELECT * FROM tasks
-            WHERE reminded = 0
-            AND due_date >= ?
-            AND due_date < ?
-            ORDER BY due_date ASC
+            SELECT t.id, t.due_date, u.timezone, u.reminder_hour FROM tasks AS t
+            CROSS JOIN users AS u ON u.user_id = t.user_id
+            WHERE t.reminded = 0
+            AND t.due_date >= ?
+            AND t.due_date < ?
+            AND u.is_active = 1
         """
+        params = (to_epoch_day(start), to_epoch_day(end))
 
-        rows = await db.fetch_all(
-            query, (reminder_start.isoformat(), reminder_end.isoformat())
+        shard_results = await asyncio.gather(
+            *(database.fetch_all(query, params) for database in _all_dbs())
         )
-        return [dict(row) for row in rows]
+        return [
+            (
+                row["id"],
+                from_epoch_day(row["due_date"]),
+                row["timezone"],
+                row["reminder_hour"],
+            )
+            for rows in shard_results
+            for row in rows
+        ]
 
     @staticmethod
     async def update(
@@ -250,11 +758,6 @@ class Task:
         Returns:
             True if task was updated, False if not found.
         """
-        # Check if task exists
-        task = await Task.get_by_id(task_id)
-        if not task:
-            return False
-
         # Build update query dynamically based on provided fields
         updates = []
         params = []
@@ -269,20 +772,112 @@ class Task:
 
         if due_date is not None:
             updates.append("due_date = ?")
-            params.append(due_date.isoformat())
+            params.append(to_epoch_day(due_date))
             # Reset reminded flag if date changes
             updates.append("reminded = 0")
 
         if not updates:
-            return True  # Nothing to update
+            # Nothing to update; report whether the task exists
+            return await Task.get_by_id(task_id) is not None
 
         params.append(task_id)
-        query = f"UPDATE tasks SET {', '.join(updates)} WHERE id = ?"
+        query = (
+            f"UPDATE tasks SET {', '.join(updates)} WHERE id = ? "
+            f"RETURNING user_id, {OWNER_SETTINGS_COLUMNS}"
+        )
+
+        database = _task_db(task_id)
+        async with database.transaction():
+            updated = await database.execute_returning(query, tuple(params))
+            if not updated:
+                return False
+            if due_date is not None:
+                # A reminder already queued for the old date must not go out
+                await Outbox._withdraw_task(database, updated[0]["user_id"], task_id)
 
-        await db.execute(query, tuple(params))
+        row = updated[0]
+        _invalidate_user(row["user_id"])
+        if due_date is not None:
+            reminder_queue.schedule(
+                task_id, due_date, row["timezone"], row["reminder_hour"]
+            )
         logger.info(f"Updated task {task_id}")
         return True
 
+    @staticmethod
+    async def archive_past_tasks(
+        before: date, batch_size: int = 500, pause: float = 0.0
+    ) -> int:
+        """
+        Move tasks due before a date into ``tasks_archive`` in small batches.
+
+        Each batch copies and deletes one rowid range in its own short
+        transaction, so the write lock is released between batches.
+
+        Args:
+            before: Archive tasks with a due date strictly before this date.
+            batch_size: Maximum tasks moved per transaction.
+            pause: Seconds to sleep between batches to let other writes in.
+
+        Returns:
+            Number of tasks archived.
+        """
+        cutoff = to_epoch_day(before)
+        shard_moved = await asyncio.gather(
+            *(
+                Task._archive_shard(database, cutoff, batch_size, pause)
+                for database in _all_dbs()
+            )
+        )
+        moved = sum(shard_moved)
+
+        if moved:
+            # Past tasks are filtered out of cached lists, but drop them anyway
+            task_cache.clear()
+            logger.info(f"Archived {moved} task(s) due before {before}")
+        return moved
+
+    @staticmethod
+    async def _archive_shard(
+        database: Database, cutoff: int, batch_size: int, pause: float
+    ) -> int:
+        """Archive one database's tasks due before ``cutoff``, batch by batch."""
+        last_id = 0
+        moved = 0
+
+        while True:
+            rows = await database.fetch_all(
+                "SELECT id FROM tasks WHERE id > ? AND due_date < ? "
+                "ORDER BY id LIMIT ?",
+                (last_id, cutoff, batch_size),
+            )
+            if not rows:
+                break
+
+            batch_end = rows[-1]["id"]
+            batch = (last_id, batch_end, cutoff)
+            _, deleted = await database.execute_batch(
+                [
+                    (
+                        "INSERT INTO tasks_archive (id, user_id, task_type, "
+                        "title, due_date, reminded, created_at) "
+                        "SELECT id, user_id, task_type, title, due_date, reminded, "
+                        "created_at FROM tasks "
+                        "WHERE id > ? AND id <= ? AND due_date < ?",
+                        batch,
+                    ),
+                    (
+                        "DELETE FROM tasks WHERE id > ? AND id <= ? AND due_date < ?",
+                        batch,
+                    ),
+                ]
+            )
+            moved += deleted
+            last_id = batch_end
+            await asyncio.sleep(pause)
+
+        return moved
+
     @staticmethod
     async def count_user_tasks(user_id: int) -> int:
         """
@@ -294,13 +889,13 @@ class Task:
         Returns:
             Number of tasks.
         """
-        row = await db.fetch_one(
+        row = await _user_db(user_id).fetch_one(
             "SELECT COUNT(*) as count FROM tasks WHERE user_id = ?", (user_id,)
         )
         return row["count"] if row else 0
 
     @staticmethod
-    async def get_upcoming_tasks(user_id: int, days: int = 7) -> List[Dict[str, Any]]:
+    async def get_upcoming_tasks(user_id: int, days: int = 7) -> List[TaskRecord]:
         """
         Get tasks due within the next N days.
 
@@ -309,17 +904,353 @@ class Task:
             days: Number of days to look ahead.
 
         Returns:
-            List of upcoming task dictionaries.
+            List of upcoming task records.
         """
-        end_date = (datetime.now() + timedelta(days=days)).date()
+        today = utc_today()
+        end_date = today + timedelta(days=days)
 
-        query = """
-            SELECT * FROM tasks
+        query = f"""
+            SELECT {TASK_COLUMNS} FROM tasks
             WHERE user_id = ?
-            AND due_date >= DATE('now')
+            AND due_date >= ?
             AND due_date <= ?
             ORDER BY due_date ASC
         """
+        params = (user_id, to_epoch_day(today), to_epoch_day(end_date))
+
+        return await _user_db(user_id).fetch_all(
+            query, params, row_factory=TaskRecord.row_factory
+        )
+
+
+class Outbox:
+    """Reminder outbox model for database operations."""
+
+    @staticmethod
+    async def enqueue(
+        messages: List[Tuple[int, List[int], str]],
+    ) -> List[Tuple[int, List[int], str]]:
+        """
+        Materialize reminder messages and mark their tasks as reminded.
+
+        Rows are written on each user's shard in one transaction together with
+        the tasks' reminded flags, so every reminder is materialized once.
+        A message is only written if this call flipped all of its tasks; if
+        another instance got to some of them first, the rest are released
+        and the message is dropped, to be rebuilt by the next scan.
+
+        Args:
+            messages: (user_id, task_ids, message) tuples.
+
+        Returns:
+            The messages that were written to the outbox.
+        """
+        now = time.time()
+        by_database: Dict[Database, List[Tuple[int, List[int], str]]] = {}
+        for user_id, task_ids, message in messages:
+            by_database.setdefault(_user_db(user_id), []).append(
+                (user_id, task_ids, message)
+            )
+
+        created: List[Tuple[int, List[int], str]] = []
+        for database, rows in by_database.items():
+            async with database.transaction():
+                task_ids = [task_id for _, ids, _ in rows for task_id in ids]
+                claimed = await Task.mark_many_as_reminded(task_ids)
+                won = [row for row in rows if claimed.issuperset(row[1])]
+                released = [
+                    task_id
+                    for _, task_ids, _ in rows
+                    if not claimed.issuperset(task_ids)
+                    for task_id in task_ids
+                    if task_id in claimed
+                ]
+                for start in range(0, len(released), MAX_IN_PARAMS):
+                    chunk = released[start : start + MAX_IN_PARAMS]
+                    await database.execute(
+                        f"UPDATE tasks SET reminded = 0 "
+                        f"WHERE id IN ({', '.join('?' * len(chunk))})",
+                        tuple(chunk),
+                    )
+                if won:
+                    await database.execute_many(
+                        """
+                        INSERT INTO outbox (user_id, task_ids, message, next_attempt_at)
+                        VALUES (?, ?, ?, ?)
+                        """,
+                        [
+                            (user_id, ",".join(map(str, task_ids)), message, now)
+                            for user_id, task_ids, message in won
+                        ],
+                    )
+                created.extend(won)
+
+        skipped = len(messages) - len(created)
+        logger.info(
+            f"Queued {len(created)} reminder message(s) in the outbox"
+            + (f", {skipped} already claimed elsewhere" if skipped else "")
+        )
+        return created
+
+    @staticmethod
+    async def _withdraw_task(database: Database, user_id: int, task_id: int) -> int:
+        """
+        Drop pending outbox rows for a task, inside the caller's transaction.
+
+        Called when a task is deleted or moved to another date. A digest
+        row also covers the user's other tasks, so those are marked
+        unreminded again and the next reminder check queues them afresh.
+
+        Returns:
+            Number of outbox rows dropped.
+        """
+        rows = await database.execute_returning(
+            """
+            DELETE FROM outbox
+            WHERE user_id = ? AND status = 'pending'
+            AND ',' || task_ids || ',' LIKE '%,' || ? || ',%'
+            RETURNING task_ids
+            """,
+            (user_id, task_id),
+        )
+        released = [
+            int(other_id)
+            for row in rows
+            for other_id in row["task_ids"].split(",")
+            if other_id and int(other_id) != task_id
+        ]
+        for start in range(0, len(released), MAX_IN_PARAMS):
+            chunk = released[start : start + MAX_IN_PARAMS]
+            await database.execute(
+                f"UPDATE tasks SET reminded = 0 "
+                f"WHERE id IN ({', '.join('?' * len(chunk))})",
+                tuple(chunk),
+            )
+        for other_id in released:
+            task_cache.invalidate_task(other_id)
+            database.after_transaction(task_cache.invalidate_task, other_id)
+        if rows:
+            logger.info(f"Withdrew {len(rows)} queued reminder(s) for task {task_id}")
+        return len(rows)
+
+    @staticmethod
+    async def claim_due(
+        holder: str, now: float, limit: int, claim_seconds: float
+    ) -> List[OutboxRecord]:
+        """
+        Claim pending outbox rows whose next attempt is due.
+
+        Each database runs one compare-and-set ``UPDATE ... RETURNING`` that
+        only takes rows with no live claim, so two instances never hold the
+        same row. A claim lapses after ``claim_seconds`` if its holder dies.
+
+        Args:
+            holder: Claiming instance ID.
+            now: Current Unix time.
+            limit: Maximum rows claimed per database.
+            claim_seconds: How long the claim is held.
+
+        Returns:
+            Claimed outbox records, earliest attempt first.
+        """
+        query = f"""
+            UPDATE outbox SET claimed_by = ?, claimed_until = ?
+            WHERE id IN (
+                SELECT id FROM outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                AND (claimed_until IS NULL OR claimed_until <= ?)
+                ORDER BY next_attempt_at ASC
+                LIMIT ?
+            )
+            RETURNING {OUTBOX_COLUMNS}
+        """
+        params = (holder, now + claim_seconds, now, now, limit)
+        shard_results = await asyncio.gather(
+            *(
+                database.execute_returning(
+                    query, params, row_factory=OutboxRecord.row_factory
+                )
+                for database in _all_dbs()
+            )
+        )
+        # RETURNING rows come back in no particular order
+        return sorted(
+            (row for rows in shard_results for row in rows),
+            key=lambda row: row.next_attempt_at,
+        )
+
+    @staticmethod
+    async def next_attempt_time() -> Optional[float]:
+        """
+        Get the earliest time any pending outbox row can be claimed.
+
+        Returns:
+            Unix time, or None if the outbox has nothing pending.
+        """
+        rows = await asyncio.gather(
+            *(
+                database.fetch_one(
+                    "SELECT MIN(MAX(next_attempt_at, COALESCE(claimed_until, 0))) "
+                    "AS next_at FROM outbox WHERE status = 'pending'"
+                )
+                for database in _all_dbs()
+            )
+        )
+        times = [row["next_at"] for row in rows if row["next_at"] is not None]
+        return min(times) if times else None
+
+    @staticmethod
+    async def delete_sent(outbox_ids: List[int]) -> int:
+        """
+        Remove delivered rows from the outbox, one commit per database.
+
+        Args:
+            outbox_ids: Outbox row IDs.
+
+        Returns:
+            Number of rows removed.
+        """
+        by_database: Dict[Database, List[int]] = {}
+        for outbox_id in outbox_ids:
+            by_database.setdefault(_outbox_db(outbox_id), []).append(outbox_id)
+
+        deleted = 0
+        for database, ids in by_database.items():
+            async with database.transaction():
+                for start in range(0, len(ids), MAX_IN_PARAMS):
+                    chunk = ids[start : start + MAX_IN_PARAMS]
+                    placeholders = ", ".join("?" * len(chunk))
+                    cursor = await database.execute(
+                        f"DELETE FROM outbox WHERE id IN ({placeholders})",
+                        tuple(chunk),
+                    )
+                    deleted += cursor.rowcount
+        return deleted
+
+    @staticmethod
+    async def record_failure(
+        outbox_id: int,
+        holder: str,
+        attempts: int,
+        next_attempt_at: float,
+        error: str,
+        dead: bool = False,
+    ) -> bool:
+        """
+        Record a failed delivery attempt and release the claim on the row.
+
+        Args:
+            outbox_id: Outbox row ID.
+            holder: Instance ID that claimed the row.
+            attempts: Attempts counted so far; flood-control waits do not count.
+            next_attempt_at: Unix time of the next attempt.
+            error: Error description.
+            dead: Move the row to the dead letters instead of retrying.
+
+        Returns:
+            True if recorded, False if the claim had passed to another holder.
+        """
+        status = "dead" if dead else "pending"
+        cursor = await _outbox_db(outbox_id).execute(
+            """
+            UPDATE outbox
+            SET attempts = ?, next_attempt_at = ?, last_error = ?, status = ?,
+                claimed_by = NULL, claimed_until = NULL
+            WHERE id = ? AND claimed_by = ?
+            """,
+            (attempts, next_attempt_at, error, status, outbox_id, holder),
+        )
+        return cursor.rowcount == 1
+
+    @staticmethod
+    async def count_by_status() -> Dict[str, int]:
+        """
+        Count outbox rows by status across every shard.
+
+        Returns:
+            Dictionary mapping status ('pending', 'dead') to row count.
+        """
+        shard_results = await asyncio.gather(
+            *(
+                database.fetch_all(
+                    "SELECT status, COUNT(*) AS count FROM outbox GROUP BY status"
+                )
+                for database in _all_dbs()
+            )
+        )
+        counts = {"pending": 0, "dead": 0}
+        for rows in shard_results:
+            for row in rows:
+                counts[row["status"]] = counts.get(row["status"], 0) + row["count"]
+        return counts
+
+
+class Lease:
+    """Named leases that let one instance at a time run a singleton job."""
+
+    @staticmethod
+    def new_holder_id() -> str:
+        """Build a holder ID unique to this process and caller."""
+        return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+
+    @staticmethod
+    async def acquire(name: str, holder: str, ttl: float) -> bool:
+        """
+        Take a lease, or renew it if the holder already has it.
+
+        The upsert only overwrites a row held by the same holder or one that
+        has expired, so at most one holder owns a live lease.
+
+        Args:
+            name: Lease name.
+            holder: Instance ID asking for the lease.
+            ttl: Seconds the lease stays valid without renewal.
+
+        Returns:
+            True if the holder now owns the lease.
+        """
+        now = time.time()
+        cursor = await _control_db().execute(
+            """
+            INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE
+            SET holder = excluded.holder, expires_at = excluded.expires_at
+            WHERE leases.holder = excluded.holder OR leases.expires_at <= ?
+            """,
+            (name, holder, now + ttl, now),
+        )
+        return cursor.rowcount == 1
+
+    @staticmethod
+    async def release(name: str, holder: str) -> bool:
+        """
+        Give up a lease so another instance can take it right away.
+
+        Args:
+            name: Lease name.
+            holder: Instance ID releasing the lease.
+
+        Returns:
+            True if the holder owned the lease.
+        """
+        cursor = await _control_db().execute(
+            "DELETE FROM leases WHERE name = ? AND holder = ?", (name, holder)
+        )
+        return cursor.rowcount == 1
+
+    @staticmethod
+    async def get_holder(name: str) -> Optional[str]:
+        """
+        Get the current holder of a live lease.
 
-        rows = await db.fetch_all(query, (user_id, end_date.isoformat()))
-        return [dict(row) for row in rows]
+        Args:
+            name: Lease name.
+
+        Returns:
+            Holder ID, or None if the lease is free or expired.
+        """
+        row = await _control_db().fetch_one(
+            "SELECT holder FROM leases WHERE name = ? AND expires_at > ?",
+            (name, time.time()),
+        )
+        return row["holder"] if row else None
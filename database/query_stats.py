@@ -0,0 +1,138 @@
+"""
+Per-statement query statistics for StudyBuddy.
+
+Statements are grouped by template (the SQL text with whitespace collapsed
+and ``IN (?, ?, ...)`` lists folded), so every call of a model method lands
+in the same bucket regardless of its parameters.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets; the last is open
+LATENCY_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+_IN_LIST = re.compile(r"IN \(\?(?:, ?\?)*\)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def query_template(query: str) -> str:
+    """
+    Normalize a SQL statement into its template.
+
+    Args:
+        query: SQL text as passed to the database.
+
+    Returns:
+        Statement with whitespace collapsed and IN lists folded.
+    """
+    return _IN_LIST.sub("IN (...)", " ".join(query.split()))
+
+
+def _bucket_label(index: int) -> str:
+    """Get the display label of a latency bucket."""
+    if index == len(LATENCY_BUCKETS):
+        return f">{LATENCY_BUCKETS[-1] * 1000:g}ms"
+    return f"<={LATENCY_BUCKETS[index] * 1000:g}ms"
+
+
+class QueryStats:
+    """Latency, row and commit counters per statement template."""
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self._templates: Dict[str, Dict[str, Any]] = {}
+        self.slow_queries = 0
+
+    def record(
+        self,
+        query: str,
+        elapsed: float,
+        rows: int = 0,
+        commit_time: float = 0.0,
+        error: bool = False,
+    ):
+        """
+        Record one execution of a statement.
+
+        Args:
+            query: SQL text.
+            elapsed: Seconds spent executing and fetching (excluding commit).
+            rows: Rows returned or affected.
+            commit_time: Seconds spent committing the statement's changes.
+            error: Whether the statement raised.
+        """
+        template = query_template(query)
+        entry = self._templates.get(template)
+        if entry is None:
+            entry = self._templates[template] = {
+                "count": 0,
+                "errors": 0,
+                "total_time": 0.0,
+                "max_time": 0.0,
+                "rows": 0,
+                "commit_time": 0.0,
+                "histogram": [0] * (len(LATENCY_BUCKETS) + 1),
+            }
+
+        entry["count"] += 1
+        entry["errors"] += error
+        entry["total_time"] += elapsed
+        entry["max_time"] = max(entry["max_time"], elapsed)
+        entry["rows"] += rows
+        entry["commit_time"] += commit_time
+
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and elapsed > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+        entry["histogram"][bucket] += 1
+
+    def snapshot(self, top_n: int = 10) -> Dict[str, Any]:
+        """
+        Get a copy of the statistics with the costliest templates first.
+
+        Args:
+            top_n: Number of templates to include, by total time including
+                commits.
+
+        Returns:
+            Dictionary with overall totals and a ``top`` list of templates.
+        """
+        ranked = sorted(
+            self._templates.items(),
+            key=lambda item: item[1]["total_time"] + item[1]["commit_time"],
+            reverse=True,
+        )
+        top: List[Dict[str, Any]] = []
+        for template, entry in ranked[:top_n]:
+            top.append(
+                {
+                    "query": template,
+                    "count": entry["count"],
+                    "errors": entry["errors"],
+                    "total_time": entry["total_time"],
+                    "avg_time": entry["total_time"] / entry["count"],
+                    "max_time": entry["max_time"],
+                    "rows": entry["rows"],
+                    "commit_time": entry["commit_time"],
+                    "histogram": {
+                        _bucket_label(index): count
+                        for index, count in enumerate(entry["histogram"])
+                    },
+                }
+            )
+
+        return {
+            "templates": len(self._templates),
+            "statements": sum(e["count"] for e in self._templates.values()),
+            "total_time": sum(e["total_time"] for e in self._templates.values()),
+            "commit_time": sum(e["commit_time"] for e in self._templates.values()),
+            "slow_queries": self.slow_queries,
+            "top": top,
+        }
+
+    def reset(self):
+        """Clear all statistics."""
+        self._templates.clear()
+        self.slow_queries = 0
@@ -0,0 +1,209 @@
+"""
+Compact record types for rows read from the database.
+
+``TaskRecord`` and ``UserRecord`` use ``__slots__`` and are built directly by
+SQLite row factories, so reading a list of tasks does not allocate a dict
+per row and ``due_date`` is converted once at the model boundary instead of
+in every formatter. Both support ``record["field"]`` and ``record.get()`` so
+code written against the old dictionaries keeps working.
+
+Due dates are stored as integer day numbers since 1970-01-01, so range
+predicates and index lookups compare plain integers.
+"""
+
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+# Columns selected for tasks, in TaskRecord constructor order
+TASK_COLUMNS = "id, user_id, task_type, title, due_date, reminded"
+
+# TASK_COLUMNS qualified with the ``t`` alias, for queries joining users
+TASK_COLUMNS_T = ", ".join(f"t.{column}" for column in TASK_COLUMNS.split(", "))
+
+# Columns selected for users, in UserRecord constructor order
+USER_COLUMNS = (
+    "user_id, username, first_name, last_active, is_active, timezone, reminder_hour"
+)
+
+# Columns selected for outbox rows, in OutboxRecord constructor order
+OUTBOX_COLUMNS = "id, user_id, task_ids, message, attempts, next_attempt_at"
+
+# Ordinal of day 0 in the stored epoch-day numbering
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def utc_today() -> date:
+    """Get today's date in UTC, the day boundary for stored due dates."""
+    return datetime.now(timezone.utc).date()
+
+
+def to_epoch_day(value: date) -> int:
+    """
+    Convert a date to its stored day number.
+
+    Args:
+        value: Calendar date.
+
+    Returns:
+        Days since 1970-01-01.
+    """
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+@lru_cache(maxsize=8192)
+def from_epoch_day(day: int) -> date:
+    """
+    Convert a stored day number back to a date.
+
+    Results are cached: a task list holds few distinct due dates, and a
+    cache hit is cheaper than building the date again.
+
+    Args:
+        day: Days since 1970-01-01.
+
+    Returns:
+        Calendar date.
+    """
+    return date.fromordinal(day + EPOCH_ORDINAL)
+
+
+class _Record:
+    """Base class providing mapping-style access to slotted fields."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a field value, or ``default`` if there is no such field."""
+        return getattr(self, key, default)
+
+    def keys(self):
+        """Return the field names."""
+        return self.__slots__
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a plain dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    # Records are mutable and compare by value, so like the dict rows they
+    # replace they are deliberately unhashable
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class TaskRecord(_Record):
+    """A task row with ``due_date`` already parsed."""
+
+    __slots__ = ("id", "user_id", "task_type", "title", "due_date", "reminded")
+
+    def __init__(
+        self,
+        id: int,
+        user_id: int,
+        task_type: str,
+        title: str,
+        due_date: date,
+        reminded: int,
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.task_type = task_type
+        self.title = title
+        self.due_date = due_date
+        self.reminded = reminded
+
+    @classmethod
+    def row_factory(cls, cursor, row: tuple) -> "TaskRecord":
+        """SQLite row factory for queries selecting ``TASK_COLUMNS``."""
+        task_id, user_id, task_type, title, due_date, reminded = row
+        return cls(
+            task_id, user_id, task_type, title, from_epoch_day(due_date), reminded
+        )
+
+
+class UserRecord(_Record):
+    """A user row."""
+
+    __slots__ = (
+        "user_id",
+        "username",
+        "first_name",
+        "last_active",
+        "is_active",
+        "timezone",
+        "reminder_hour",
+    )
+
+    def __init__(
+        self,
+        user_id: int,
+        username: Optional[str],
+        first_name: Optional[str],
+        last_active: Optional[str],
+        is_active: int = 1,
+        timezone: Optional[str] = None,
+        reminder_hour: Optional[int] = None,
+    ):
+        self.user_id = user_id
+        self.username = username
+        self.first_name = first_name
+        self.last_active = last_active
+        self.is_active = is_active
+        self.timezone = timezone
+        self.reminder_hour = reminder_hour
+
+    @classmethod
+    def row_factory(cls, cursor, row: tuple) -> "UserRecord":
+        """SQLite row factory for queries selecting ``USER_COLUMNS``."""
+        return cls(*row)
+
+
+class OutboxRecord(_Record):
+    """A pending reminder message in the outbox."""
+
+    __slots__ = ("id", "user_id", "task_ids", "message", "attempts", "next_attempt_at")
+
+    def __init__(
+        self,
+        id: int,
+        user_id: int,
+        task_ids: List[int],
+        message: str,
+        attempts: int,
+        next_attempt_at: float,
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.task_ids = task_ids
+        self.message = message
+        self.attempts = attempts
+        self.next_attempt_at = next_attempt_at
+
+    @classmethod
+    def row_factory(cls, cursor, row: tuple) -> "OutboxRecord":
+        """SQLite row factory for queries selecting ``OUTBOX_COLUMNS``."""
+        outbox_id, user_id, task_ids, message, attempts, next_attempt_at = row
+        return cls(
+            outbox_id,
+            user_id,
+            [int(task_id) for task_id in task_ids.split(",") if task_id],
+            message,
+            attempts,
+            next_attempt_at,
+        )
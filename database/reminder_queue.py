@@ -0,0 +1,253 @@
+"""
+In-memory queue of upcoming reminder times for StudyBuddy.
+
+A task due on day ``D`` becomes remindable at its owner's reminder hour on
+``D - 1`` in their timezone, and stays remindable until ``D`` starts there.
+Users in different timezones or with different hours therefore fall into
+different hourly buckets instead of all firing at once. This module keeps a
+min-heap of those times (in UTC) for tasks due within a short horizon,
+loaded from the database by the reminder service and kept current by the
+Task and User models on every write, so the service can sleep until the
+next reminder instead of polling.
+
+The heap only says *when* to look; the reminder query remains the source
+of truth, so a stale entry (say, from a rolled-back transaction) costs one
+indexed query and never a wrong reminder.
+"""
+
+import asyncio
+import heapq
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=512)
+def get_zone(name: Optional[str] = None) -> ZoneInfo:
+    """
+    Get a timezone by IANA name.
+
+    Args:
+        name: Timezone name, or None for ``Config.TIMEZONE``.
+
+    Returns:
+        The timezone.
+    """
+    return ZoneInfo(name or Config.TIMEZONE)
+
+
+def reminder_time(
+    due_date: date, tz_name: Optional[str] = None, hour: Optional[int] = None
+) -> datetime:
+    """
+    Get the time a task's reminder becomes due.
+
+    Args:
+        due_date: Task due date.
+        tz_name: Owner's timezone (None for the default).
+        hour: Owner's local reminder hour (None for the default).
+
+    Returns:
+        UTC time of the reminder hour on the eve of the due date.
+    """
+    hour = Config.REMINDER_HOUR if hour is None else hour
+    opens = datetime.combine(
+        due_date - timedelta(days=1), time(hour), tzinfo=get_zone(tz_name)
+    )
+    return opens.astimezone(timezone.utc)
+
+
+def is_reminder_open(
+    due_date: date, tz_name: Optional[str], hour: Optional[int], now: datetime
+) -> bool:
+    """
+    Check whether a task's reminder window is open.
+
+    The window runs from the reminder hour on the eve of the due date until
+    the due date starts in the owner's timezone.
+
+    Args:
+        due_date: Task due date.
+        tz_name: Owner's timezone (None for the default).
+        hour: Owner's local reminder hour (None for the default).
+        now: Current time (timezone-aware).
+
+    Returns:
+        True if the reminder should be sent now.
+    """
+    closes = datetime.combine(due_date, time(), tzinfo=get_zone(tz_name))
+    return reminder_time(due_date, tz_name, hour) <= now < closes
+
+
+class ReminderQueue:
+    """Min-heap of (reminder time, task ID) with lazy deletion."""
+
+    def __init__(self, horizon_days: int = 2):
+        """
+        Initialize reminder queue.
+
+        Args:
+            horizon_days: Days of due dates, from tomorrow, held in memory.
+        """
+        self.horizon_days = horizon_days
+        self._heap: List[Tuple[datetime, int]] = []
+        # task_id -> reminder time of its live heap entry
+        self._entries: Dict[int, datetime] = {}
+        # Due dates in [loaded_from, loaded_until) are held; later tasks wait
+        # for the next load
+        self.loaded_from: Optional[date] = None
+        self.loaded_until: Optional[date] = None
+        # Set by the reminder service; woken when the earliest entry changes
+        self.changed: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        """Get the number of pending reminders."""
+        return len(self._entries)
+
+    def horizon(self, today: date) -> Tuple[date, date]:
+        """
+        Get the [start, end) due-date range to load on a given UTC day.
+
+        Users ahead of UTC may already be on their eve of a task due today
+        (UTC), so the range starts today and reaches ``horizon_days`` past
+        the furthest due date that can open within a day.
+        """
+        return today, today + timedelta(days=self.horizon_days + 2)
+
+    def load(
+        self,
+        tasks: Iterable[Tuple[int, date, Optional[str], Optional[int]]],
+        start: date,
+        until: date,
+    ):
+        """
+        Replace the queue with tasks loaded from the database.
+
+        Args:
+            tasks: (task_id, due_date, timezone, reminder_hour) tuples of
+                unreminded tasks and their owners' settings.
+            start: Start of the due-date range that was loaded.
+            until: Exclusive end of the due-date range that was loaded.
+        """
+        self._entries = {
+            task_id: reminder_time(due, tz_name, hour)
+            for task_id, due, tz_name, hour in tasks
+        }
+        self._heap = [(at, task_id) for task_id, at in self._entries.items()]
+        heapq.heapify(self._heap)
+        self.loaded_from, self.loaded_until = start, until
+        self._notify()
+        logger.debug(f"Loaded {len(self._entries)} reminder(s) until {until}")
+
+    def schedule(
+        self,
+        task_id: int,
+        due_date: date,
+        tz_name: Optional[str] = None,
+        hour: Optional[int] = None,
+    ):
+        """
+        Add or move a task's reminder.
+
+        Tasks due past the loaded horizon are dropped; the next load picks
+        them up.
+
+        Args:
+            task_id: Task ID.
+            due_date: Task due date.
+            tz_name: Owner's timezone (None for the default).
+            hour: Owner's local reminder hour (None for the default).
+        """
+        if not self.covers(due_date):
+            self.discard(task_id)
+            return
+
+        at = reminder_time(due_date, tz_name, hour)
+        if self._entries.get(task_id) == at:
+            return
+        self._entries[task_id] = at
+        heapq.heappush(self._heap, (at, task_id))
+        if self._heap[0] == (at, task_id):
+            self._notify()
+        self._compact()
+
+    def covers(self, due_date: date) -> bool:
+        """Whether a due date falls inside the loaded horizon."""
+        if self.loaded_until is None:
+            return False
+        return self.loaded_from <= due_date < self.loaded_until
+
+    def discard(self, task_id: int):
+        """
+        Remove a task's reminder (its heap entry is skipped when reached).
+
+        Args:
+            task_id: Task ID.
+        """
+        if self._entries.pop(task_id, None) is not None:
+            self._compact()
+
+    def next_time(self) -> Optional[datetime]:
+        """Get the earliest pending reminder time, if any."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[int]:
+        """
+        Remove and return tasks whose reminder time has been reached.
+
+        Args:
+            now: Current time (timezone-aware).
+
+        Returns:
+            Task IDs in reminder-time order.
+        """
+        due = []
+        self._drop_stale()
+        while self._heap and self._heap[0][0] <= now:
+            _, task_id = heapq.heappop(self._heap)
+            del self._entries[task_id]
+            due.append(task_id)
+            self._drop_stale()
+        return due
+
+    def histogram(self) -> List[int]:
+        """
+        Count pending reminders by the UTC hour they are due.
+
+        Returns:
+            24 counts, index 0 for 00:00-00:59 UTC.
+        """
+        counts = [0] * 24
+        for at in self._entries.values():
+            counts[at.hour] += 1
+        return counts
+
+    def _drop_stale(self):
+        """Pop heap entries that were discarded or rescheduled."""
+        while self._heap:
+            at, task_id = self._heap[0]
+            if self._entries.get(task_id) == at:
+                return
+            heapq.heappop(self._heap)
+
+    def _compact(self):
+        """Rebuild the heap once stale entries outnumber live ones."""
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(at, task_id) for task_id, at in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _notify(self):
+        """Wake the reminder service so it recomputes its sleep."""
+        if self.changed is not None:
+            self.changed.set()
+
+
+# Global reminder queue instance
+reminder_queue = ReminderQueue()
@@ -0,0 +1,152 @@
+"""
+Offline tool to change the number of SQLite shards.
+
+Users whose shard changes are copied, with their tasks, archived tasks and
+outbox rows, into the shard they now hash to and then deleted from the old
+one. Each user is moved independently and the target is cleared first, so an
+interrupted run can simply be started again. Stop the bot before running it.
+
+Usage:
+    python -m database.reshard --from 1 --to 4 [--db studybuddy.db]
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Dict, List
+
+from database.db import Database
+from database.sharding import ensure_task_id_range, shard_index_for_user, shard_paths
+
+logger = logging.getLogger(__name__)
+
+
+def _insert_statement(table: str, row, skip: tuple = ()) -> tuple:
+    """Build an INSERT copying ``row`` into ``table`` (minus ``skip`` columns)."""
+    columns = [column for column in row.keys() if column not in skip]
+    placeholders = ", ".join("?" for _ in columns)
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+        tuple(row[column] for column in columns),
+    )
+
+
+async def move_user(source: Database, target: Database, user_id: int) -> int:
+    """
+    Move one user's rows from one shard to another.
+
+    Tasks and outbox rows get new IDs from the target shard's range;
+    archived tasks keep their IDs, which are already unique across shards.
+    Outbox rows keep their old task IDs, which are informational only.
+
+    Args:
+        source: Shard currently holding the user.
+        target: Shard the user now hashes to.
+        user_id: Telegram user ID.
+
+    Returns:
+        Number of tasks moved.
+    """
+    user = await source.fetch_one("SELECT * FROM users WHERE user_id = ?", (user_id,))
+    tasks = await source.fetch_all(
+        "SELECT * FROM tasks WHERE user_id = ? ORDER BY id", (user_id,)
+    )
+    archived = await source.fetch_all(
+        "SELECT * FROM tasks_archive WHERE user_id = ?", (user_id,)
+    )
+    outbox = await source.fetch_all(
+        "SELECT * FROM outbox WHERE user_id = ? ORDER BY id", (user_id,)
+    )
+
+    # Clear leftovers of an interrupted earlier run, then copy in one transaction
+    statements = [
+        ("DELETE FROM tasks WHERE user_id = ?", (user_id,)),
+        ("DELETE FROM tasks_archive WHERE user_id = ?", (user_id,)),
+        ("DELETE FROM outbox WHERE user_id = ?", (user_id,)),
+        ("DELETE FROM users WHERE user_id = ?", (user_id,)),
+        _insert_statement("users", user),
+    ]
+    statements += [_insert_statement("tasks", task, skip=("id",)) for task in tasks]
+    statements += [_insert_statement("tasks_archive", row) for row in archived]
+    statements += [_insert_statement("outbox", row, skip=("id",)) for row in outbox]
+    await target.execute_batch(statements)
+
+    await source.execute_batch(
+        [
+            ("DELETE FROM tasks WHERE user_id = ?", (user_id,)),
+            ("DELETE FROM tasks_archive WHERE user_id = ?", (user_id,)),
+            ("DELETE FROM outbox WHERE user_id = ?", (user_id,)),
+            ("DELETE FROM users WHERE user_id = ?", (user_id,)),
+        ]
+    )
+    return len(tasks)
+
+
+async def reshard(base_path: str, old_count: int, new_count: int) -> Dict[str, int]:
+    """
+    Redistribute users from ``old_count`` shards to ``new_count`` shards.
+
+    Shard files keep their index, so shard 0 is always the base file.
+    When shrinking, the files past ``new_count`` are left empty on disk.
+
+    Args:
+        base_path: Path of the unsharded database (shard 0).
+        old_count: Current number of shards.
+        new_count: Desired number of shards.
+
+    Returns:
+        Counts of users and tasks moved.
+
+    Raises:
+        ValueError: If either shard count is less than 1.
+    """
+    if old_count < 1 or new_count < 1:
+        raise ValueError("Shard counts must be at least 1")
+
+    shards: List[Database] = [
+        Database(path) for path in shard_paths(base_path, max(old_count, new_count))
+    ]
+    users_moved = 0
+    tasks_moved = 0
+
+    try:
+        for index, shard in enumerate(shards):
+            await shard.initialize()
+            if index < new_count:
+                await ensure_task_id_range(shard, index)
+
+        for index, source in enumerate(shards[:old_count]):
+            rows = await source.fetch_all("SELECT user_id FROM users ORDER BY user_id")
+            for row in rows:
+                target_index = shard_index_for_user(row["user_id"], new_count)
+                if target_index == index:
+                    continue
+                tasks_moved += await move_user(
+                    source, shards[target_index], row["user_id"]
+                )
+                users_moved += 1
+            logger.info(f"Shard {index}: moved {users_moved} user(s) so far")
+    finally:
+        for shard in shards:
+            await shard.disconnect()
+
+    return {"users_moved": users_moved, "tasks_moved": tasks_moved}
+
+
+async def main():
+    """Parse arguments and run the reshard."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--from", dest="old_count", type=int, required=True)
+    parser.add_argument("--to", dest="new_count", type=int, required=True)
+    parser.add_argument("--db", default="studybuddy.db")
+    args = parser.parse_args()
+
+    result = await reshard(args.db, args.old_count, args.new_count)
+    print(
+        f"Moved {result['users_moved']} user(s) and {result['tasks_moved']} task(s). "
+        f"Set DB_SHARD_COUNT={args.new_count} before starting the bot."
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+"""
+Horizontal sharding of user data across several SQLite files.
+
+Each user hashes to one shard, and each shard is an ordinary ``Database``.
+Task and outbox IDs are allocated from a disjoint range per shard (the shard
+index is stored in the high bits), so a row can be routed from its ID alone.
+Global scans fan out to every shard concurrently.
+"""
+
+import logging
+import os
+import zlib
+from typing import List, Optional
+
+from config import Config
+from database.db import Database, db
+
+logger = logging.getLogger(__name__)
+
+# Task IDs in shard k start at k << TASK_ID_SHARD_BITS
+TASK_ID_SHARD_BITS = 40
+
+# AUTOINCREMENT tables whose IDs carry the shard index
+ID_RANGE_TABLES = ("tasks", "outbox")
+
+
+def shard_index_for_user(user_id: int, shard_count: int) -> int:
+    """
+    Map a user to a shard index with a stable hash.
+
+    Args:
+        user_id: Telegram user ID.
+        shard_count: Number of shards.
+
+    Returns:
+        Shard index in ``range(shard_count)``.
+    """
+    return zlib.crc32(str(user_id).encode()) % shard_count
+
+
+def shard_index_for_task(task_id: int) -> int:
+    """
+    Get the shard index encoded in a task ID.
+
+    Args:
+        task_id: Task ID.
+
+    Returns:
+        Shard index the task was created in.
+    """
+    return task_id >> TASK_ID_SHARD_BITS
+
+
+def shard_paths(base_path: str, shard_count: int) -> List[str]:
+    """
+    Build shard file names from the single-database path.
+
+    Shard 0 keeps the original file, so enabling sharding on an existing
+    deployment leaves all current data in place.
+
+    Args:
+        base_path: Path of the unsharded database (e.g. "studybuddy.db").
+        shard_count: Number of shards.
+
+    Returns:
+        List of shard file paths.
+    """
+    root, ext = os.path.splitext(base_path)
+    return [base_path] + [f"{root}_shard{i}{ext}" for i in range(1, shard_count)]
+
+
+class ShardRouter:
+    """Routes users and tasks to one of several Database shards."""
+
+    def __init__(self, shards: List[Database]):
+        """
+        Initialize shard router.
+
+        Args:
+            shards: One Database per shard, in shard-index order.
+        """
+        if not shards:
+            raise ValueError("ShardRouter needs at least one shard")
+        self.shards = shards
+        logger.info(f"Shard router initialized with {len(shards)} shard(s)")
+
+    def for_user(self, user_id: int) -> Database:
+        """Get the shard holding a user's data."""
+        return self.shards[shard_index_for_user(user_id, len(self.shards))]
+
+    def for_task(self, task_id: int) -> Database:
+        """Get the shard holding a task."""
+        return self.shards[shard_index_for_task(task_id)]
+
+    async def initialize(self):
+        """Migrate every shard and reserve its task ID range."""
+        for index, shard in enumerate(self.shards):
+            await shard.initialize()
+            await ensure_task_id_range(shard, index)
+
+    async def disconnect(self):
+        """Close every shard."""
+        for shard in self.shards:
+            await shard.disconnect()
+
+
+async def ensure_task_id_range(shard: Database, index: int):
+    """
+    Make a shard's AUTOINCREMENT task and outbox IDs start at its reserved range.
+
+    Args:
+        shard: Shard database (already migrated).
+        index: Shard index.
+    """
+    floor = index << TASK_ID_SHARD_BITS
+    if floor == 0:
+        return
+
+    for table in ID_RANGE_TABLES:
+        row = await shard.fetch_one(
+            "SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)
+        )
+        if row is None:
+            await shard.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, floor)
+            )
+        elif row[0] < floor:
+            await shard.execute(
+                "UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (floor, table)
+            )
+
+
+def create_shard_router(
+    base_path: str,
+    shard_count: int,
+    primary: Optional[Database] = None,
+    **kwargs,
+) -> ShardRouter:
+    """
+    Build a router with one Database per shard file.
+
+    Args:
+        base_path: Path of the unsharded database.
+        shard_count: Number of shards.
+        primary: Existing Database for ``base_path`` to reuse as shard 0.
+        **kwargs: Extra ``Database`` constructor arguments.
+
+    Returns:
+        ShardRouter over the shard files.
+    """
+    paths = shard_paths(base_path, shard_count)
+    shards = [primary or Database(paths[0], **kwargs)]
+    shards += [Database(path, **kwargs) for path in paths[1:]]
+    return ShardRouter(shards)
+
+
+# Global shard router (None when running on a single database)
+shard_router: Optional[ShardRouter] = (
+    create_shard_router(
+        db.db_path,
+        Config.DB_SHARD_COUNT,
+        primary=db,
+        read_pool_size=Config.DB_READ_POOL_SIZE,
+        acquire_timeout=Config.DB_POOL_ACQUIRE_TIMEOUT,
+        pragma_profile=Config.DB_PRAGMA_PROFILE,
+        group_commit=Config.DB_GROUP_COMMIT,
+        group_commit_window=Config.DB_GROUP_COMMIT_WINDOW_MS / 1000,
+        group_commit_max_batch=Config.DB_GROUP_COMMIT_MAX_BATCH,
+        slow_query_threshold=Config.DB_SLOW_QUERY_MS / 1000,
+    )
+    if Config.DB_SHARD_COUNT > 1
+    else None
+)
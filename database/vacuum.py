@@ -0,0 +1,62 @@
+"""
+Offline tool to switch existing databases to incremental auto-vacuum.
+
+The conversion runs one full VACUUM per database file, which rewrites and
+locks the whole file, so it is kept out of bot startup. Stop the bot before
+running it; databases that are already converted are skipped.
+
+Usage:
+    python -m database.vacuum [--db studybuddy.db] [--shards 1]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import List
+
+from database.db import Database
+from database.migrations import convert_to_incremental_vacuum
+from database.sharding import shard_paths
+
+logger = logging.getLogger(__name__)
+
+
+async def enable_incremental_vacuum(base_path: str, shard_count: int = 1) -> List[str]:
+    """
+    Convert every shard of a database to incremental auto-vacuum.
+
+    Args:
+        base_path: Path of the unsharded database (shard 0).
+        shard_count: Number of shards.
+
+    Returns:
+        Paths of the files that were converted.
+    """
+    converted = []
+    for path in shard_paths(base_path, shard_count):
+        database = Database(path)
+        try:
+            await database.initialize()
+            started = time.perf_counter()
+            if await convert_to_incremental_vacuum(await database.get_connection()):
+                converted.append(path)
+                logger.info(f"Converted {path} in {time.perf_counter() - started:.1f}s")
+        finally:
+            await database.disconnect()
+    return converted
+
+
+async def main():
+    """Parse arguments and run the conversion."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default="studybuddy.db")
+    parser.add_argument("--shards", type=int, default=1)
+    args = parser.parse_args()
+
+    converted = await enable_incremental_vacuum(args.db, args.shards)
+    print(f"Converted {len(converted)} database file(s) to incremental auto-vacuum.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
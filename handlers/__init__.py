@@ -4,6 +4,6 @@ Handlers package for StudyBuddy Telegram Bot.
 This package contains all command handlers and conversation flows.
 """
 
-from handlers import add, delete, help, list, start
+from handlers import add, delete, errors, help, list, settings, start
 
-__all__ = ["start", "help", "add", "list", "delete"]
+__all__ = ["start", "help", "add", "list", "delete", "settings", "errors"]
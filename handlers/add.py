@@ -2,7 +2,8 @@
 Add task command handler for StudyBuddy Telegram Bot.
 
 This module handles the /add command with FSM (Finite State Machine)
-for multi-step task creation flow.
+for multi-step task creation flow, and a bulk mode where one /add message
+carries many "title; DD/MM/YYYY; type" lines.
 """
 
 import logging
@@ -12,11 +13,17 @@ from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 
+from config import Config
 from database.models import Task, User
 from keyboards.reply import get_main_menu_keyboard, get_task_type_keyboard
 from states.task_states import AddTaskStates
-from utils.formatters import format_task_confirmation
-from utils.validators import validate_date, validate_task_title, validate_task_type
+from utils.formatters import format_bulk_import_summary, format_task_confirmation
+from utils.validators import (
+    parse_bulk_tasks,
+    validate_date,
+    validate_task_title,
+    validate_task_type,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +46,13 @@ async def cmd_add_start(message: Message, state: FSMContext):
     # Update user's last_active timestamp
     await User.create_or_update(user_id=user_id)
 
+    # Lines after the command switch to bulk import
+    _, _, bulk_text = (message.text or "").partition("\n")
+    if bulk_text.strip():
+        await state.clear()
+        await process_bulk_add(message, bulk_text)
+        return
+
     logger.info(f"User {user_id} started add task flow")
 
     # Clear any existing state
@@ -54,6 +68,43 @@ async def cmd_add_start(message: Message, state: FSMContext):
     await state.set_state(AddTaskStates.waiting_for_type)
 
 
+async def process_bulk_add(message: Message, bulk_text: str):
+    """
+    Validate and create every task in a bulk /add message.
+
+    All valid lines are inserted in a single transaction; invalid lines are
+    reported back in one summary reply.
+
+    Args:
+        message: Incoming message object.
+        bulk_text: Message text after the command line.
+    """
+    user_id = message.from_user.id
+
+    tasks, errors = parse_bulk_tasks(bulk_text, max_tasks=Config.MAX_BULK_TASKS)
+
+    logger.info(
+        f"User {user_id} bulk import: {len(tasks)} valid, {len(errors)} invalid"
+    )
+
+    try:
+        await Task.create_many(
+            user_id,
+            [(task_type, title, due_date) for title, due_date, task_type in tasks],
+        )
+    except Exception as e:
+        logger.error(f"Error creating bulk tasks: {e}", exc_info=True)
+        await message.answer(
+            "❌ Oops! Something went wrong while saving your tasks.\n\n"
+            "No tasks were added. Please try again."
+        )
+        return
+
+    await message.answer(
+        format_bulk_import_summary(tasks, errors), reply_markup=get_main_menu_keyboard()
+    )
+
+
 @router.callback_query(
     AddTaskStates.waiting_for_type, F.data.in_(["type_assignment", "type_exam"])
 )
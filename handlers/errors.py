@@ -0,0 +1,53 @@
+"""
+Error handler for StudyBuddy Telegram Bot.
+
+This module catches Telegram errors raised by any handler when a user's
+chat can no longer be reached, and marks that user inactive so reminder
+scans skip them until they send /start again.
+"""
+
+import logging
+
+from aiogram import Router
+from aiogram.types import ErrorEvent
+
+from database.models import User
+from services.reminder import is_chat_unreachable
+
+logger = logging.getLogger(__name__)
+
+# Create router for error handling
+router = Router()
+
+
+def is_unreachable_user_chat(event: ErrorEvent) -> bool:
+    """
+    Filter error events whose user's chat can no longer be reached.
+
+    Other errors do not match, so aiogram keeps propagating and logging them.
+
+    Args:
+        event: Error event with the failed update and its exception.
+
+    Returns:
+        True if the error means the chat is gone and the update has a user.
+    """
+    from_user = getattr(event.update.event, "from_user", None)
+    return from_user is not None and is_chat_unreachable(event.exception)
+
+
+@router.error(is_unreachable_user_chat)
+async def handle_unreachable_chat(event: ErrorEvent) -> bool:
+    """
+    Deactivate the user whose chat raised a Forbidden/chat-not-found error.
+
+    Args:
+        event: Error event with the failed update and its exception.
+
+    Returns:
+        True, marking the error as handled.
+    """
+    from_user = event.update.event.from_user
+    await User.deactivate(from_user.id)
+    logger.warning(f"User {from_user.id} is unreachable: {event.exception}")
+    return True
@@ -45,10 +45,11 @@ async def cmd_help(message: Message):
         "➕ Add Task - Create a new assignment or exam\n"
         "📋 List Tasks - View all upcoming tasks\n"
         "🗑️ Delete Task - Remove a completed task\n"
+        "⚙️ /settings - Choose your timezone and reminder time\n"
         "❓ Help - Show this help message\n\n"
         "<b>💡 Tips:</b>\n"
         "• Dates must be in DD/MM/YYYY format (e.g., 25/12/2025)\n"
-        "• You'll receive reminders 24 hours before deadlines\n"
+        "• You'll receive reminders the day before deadlines (see /settings)\n"
         "• Use /list to check what's coming up\n"
         "• Task titles can be up to 200 characters long\n\n"
         "<b>📝 How to Add a Task:</b>\n"
@@ -57,6 +58,11 @@ async def cmd_help(message: Message):
         "3. Enter task name\n"
         "4. Enter due date in DD/MM/YYYY format\n"
         "5. Get automatic reminder 24 hours before!\n\n"
+        "<b>📥 Adding Many Tasks at Once:</b>\n"
+        "Send /add followed by one task per line:\n"
+        "<code>/add\n"
+        "Math Homework; 25/12/2025; assignment\n"
+        "Physics Final; 10/01/2026; exam</code>\n\n"
         "<b>🔔 Reminder System:</b>\n"
         "You'll automatically receive a reminder 24 hours before "
         "each task is due. No need to worry about forgetting!\n\n"
@@ -2,18 +2,26 @@
 List command handler for StudyBuddy Telegram Bot.
 
 This module handles the /list command, which displays all upcoming
-tasks for the user.
+tasks for the user, one page at a time.
 """
 
 import logging
+from typing import Any, Dict, List, Optional, Tuple
 
 from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
-from aiogram.types import Message
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
 
+from config import Config
 from database.models import Task, User
-from keyboards.reply import get_main_menu_keyboard
-from utils.formatters import format_task_list
+from keyboards.reply import get_main_menu_keyboard, get_pagination_keyboard
+from utils.formatters import (
+    MAX_MESSAGE_LENGTH,
+    format_task_list,
+    format_task_summary,
+    lines_within,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +29,129 @@ logger = logging.getLogger(__name__)
 router = Router()
 
 
+def _cursor_data(action: str, page: int, number: int, task: Dict[str, Any]) -> str:
+    """
+    Build callback data for a page button.
+
+    Args:
+        action: "list_next" or "list_prev".
+        page: Page number the button leads to.
+        number: List number at the cursor: the first task of the next page,
+            or the first task of the current page when going back.
+        task: Task whose (due_date, id) is the keyset cursor.
+
+    Returns:
+        Callback data string, e.g. "list_next:2:51:2025-12-25:17".
+    """
+    return f"{action}:{page}:{number}:{task['due_date']}:{task['id']}"
+
+
+def _parse_cursor_data(data: str) -> Tuple[str, int, int, Tuple[str, int]]:
+    """
+    Parse callback data created by ``_cursor_data``.
+
+    Args:
+        data: Callback data string.
+
+    Returns:
+        Tuple of (action, page, number, (due_date, task_id)).
+    """
+    action, page, number, due_date, task_id = data.split(":")
+    return action, int(page), int(number), (due_date, int(task_id))
+
+
+def _fit_page(tasks: List[Dict[str, Any]], from_end: bool = False) -> int:
+    """
+    Count how many tasks fit in one message once rendered.
+
+    Args:
+        tasks: Candidate tasks for the page.
+        from_end: Keep the last tasks (moving backward) instead of the first.
+
+    Returns:
+        Number of tasks that fit, taken from the chosen end.
+    """
+    ordered = tasks[::-1] if from_end else tasks
+    # Room for the header, the page footer and four-digit list numbers
+    lines = [f"\n0000. {format_task_summary(task)}" for task in ordered]
+    return len(lines_within(lines, MAX_MESSAGE_LENGTH - 100))
+
+
+async def _load_page(
+    user_id: int,
+    page: int,
+    number: int = 1,
+    after: Optional[Tuple[str, int]] = None,
+    before: Optional[Tuple[str, int]] = None,
+) -> Tuple[List[Dict[str, Any]], int, Optional[InlineKeyboardMarkup]]:
+    """
+    Load one page of upcoming tasks and its navigation keyboard.
+
+    One extra row is fetched to tell whether another page exists in the
+    direction of travel. Pages hold at most ``MAX_TASKS_PER_PAGE`` tasks and
+    are trimmed further to fit one Telegram message; the cursors follow the
+    tasks actually shown.
+
+    Args:
+        user_id: Telegram user ID.
+        page: Page number being loaded (1-based).
+        number: List number at the cursor (see ``_cursor_data``).
+        after: Keyset cursor for moving forward.
+        before: Keyset cursor for moving backward.
+
+    Returns:
+        Tuple of (tasks on the page, number of the first task, pagination
+        keyboard or None).
+    """
+    page_size = Config.MAX_TASKS_PER_PAGE
+    tasks = await Task.get_user_tasks(
+        user_id=user_id,
+        include_past=False,
+        limit=page_size + 1,
+        after=after,
+        before=before,
+    )
+
+    has_more = len(tasks) > page_size
+    if before is not None:
+        # Extra row is the oldest one; drop it to keep the page aligned
+        tasks = tasks[1:] if has_more else tasks
+        fit = _fit_page(tasks, from_end=True)
+        has_prev = has_more or fit < len(tasks) or page > 1
+        tasks = tasks[len(tasks) - fit :]
+        has_next = True
+        start = max(number - len(tasks), 1)
+    else:
+        tasks = tasks[:page_size]
+        fit = _fit_page(tasks)
+        has_prev = page > 1
+        has_next = has_more or fit < len(tasks)
+        tasks = tasks[:fit]
+        start = number
+
+    keyboard = get_pagination_keyboard(
+        prev_data=(
+            _cursor_data("list_prev", page - 1, start, tasks[0])
+            if has_prev and tasks
+            else None
+        ),
+        next_data=(
+            _cursor_data("list_next", page + 1, start + len(tasks), tasks[-1])
+            if has_next and tasks
+            else None
+        ),
+    )
+    return tasks, start, keyboard
+
+
 @router.message(F.text == "📋 List Tasks")
 @router.message(Command("list"))
 async def cmd_list(message: Message):
     """
     Handle /list command.
 
-    Displays all upcoming tasks for the user, sorted by due date.
+    Displays the first page of upcoming tasks for the user, sorted by
+    due date, with next/prev buttons when there is more than one page.
 
     Args:
         message: Incoming message object.
@@ -39,13 +163,53 @@ async def cmd_list(message: Message):
 
     logger.info(f"User {user_id} requested task list")
 
-    # Get all upcoming tasks for the user
-    tasks = await Task.get_user_tasks(user_id=user_id, include_past=False)
+    # Get the first page of upcoming tasks for the user
+    tasks, _, keyboard = await _load_page(user_id, page=1)
 
     # Format and send the task list
-    task_list_message = format_task_list(tasks)
-
-    await message.answer(task_list_message, reply_markup=get_main_menu_keyboard())
+    if keyboard is None:
+        task_list_message = format_task_list(tasks)
+        await message.answer(task_list_message, reply_markup=get_main_menu_keyboard())
+    else:
+        task_list_message = format_task_list(tasks, page=1)
+        await message.answer(task_list_message, reply_markup=keyboard)
 
     # Log task count
     logger.info(f"Displayed {len(tasks)} tasks for user {user_id}")
+
+
+@router.callback_query(
+    F.data.startswith("list_next:") | F.data.startswith("list_prev:")
+)
+async def process_list_page(callback: CallbackQuery):
+    """
+    Handle next/prev page buttons by editing the list message in place.
+
+    Args:
+        callback: Callback query from inline keyboard.
+    """
+    user_id = callback.from_user.id
+    action, page, number, cursor = _parse_cursor_data(callback.data)
+
+    if action == "list_next":
+        tasks, start, keyboard = await _load_page(user_id, page, number, after=cursor)
+    else:
+        tasks, start, keyboard = await _load_page(user_id, page, number, before=cursor)
+
+    if not tasks:
+        # Tasks were removed since the page was shown; start over
+        page = 1
+        tasks, start, keyboard = await _load_page(user_id, page=page)
+
+    await callback.answer()
+
+    try:
+        await callback.message.edit_text(
+            format_task_list(tasks, start=start, page=page), reply_markup=keyboard
+        )
+    except TelegramBadRequest as e:
+        # Falling back to page 1 while it is already shown changes nothing
+        if "message is not modified" not in str(e):
+            raise
+
+    logger.info(f"Displayed page {page} ({len(tasks)} tasks) for user {user_id}")
@@ -0,0 +1,105 @@
+"""
+Reminder settings handlers for StudyBuddy Telegram Bot.
+
+This module handles the /settings, /timezone and /reminderhour commands,
+which let users choose when their reminders arrive.
+"""
+
+import logging
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from config import Config
+from database.models import User
+from keyboards.reply import get_main_menu_keyboard
+from utils.validators import validate_reminder_hour, validate_timezone
+
+logger = logging.getLogger(__name__)
+
+# Create router for settings commands
+router = Router()
+
+
+@router.message(Command("settings"))
+async def cmd_settings(message: Message):
+    """
+    Handle /settings command.
+
+    Shows the user's timezone and reminder hour and how to change them.
+
+    Args:
+        message: Incoming message object.
+    """
+    user_id = message.from_user.id
+    await User.create_or_update(user_id=user_id)
+
+    user = await User.get(user_id)
+    tz_name = user.timezone or Config.TIMEZONE
+    hour = Config.REMINDER_HOUR if user.reminder_hour is None else user.reminder_hour
+
+    await message.answer(
+        "⚙️ <b>Reminder Settings</b>\n\n"
+        f"🌍 Timezone: {tz_name}\n"
+        f"⏰ Reminder time: {hour:02d}:00 the day before a task is due\n\n"
+        "To change them:\n"
+        "<code>/timezone Europe/Berlin</code>\n"
+        "<code>/reminderhour 18</code>",
+        parse_mode="HTML",
+        reply_markup=get_main_menu_keyboard(),
+    )
+
+
+@router.message(Command("timezone"))
+async def cmd_timezone(message: Message, command: CommandObject):
+    """
+    Handle /timezone command.
+
+    Args:
+        message: Incoming message object.
+        command: Parsed command with the timezone name as its argument.
+    """
+    user_id = message.from_user.id
+    await User.create_or_update(user_id=user_id)
+
+    if not command.args:
+        await message.answer("Send your timezone, e.g. /timezone Europe/Berlin")
+        return
+
+    is_valid, tz_name, error_message = validate_timezone(command.args)
+    if not is_valid:
+        await message.answer(error_message)
+        return
+
+    await User.set_reminder_settings(user_id, tz_name=tz_name)
+    logger.info(f"User {user_id} set timezone to {tz_name}")
+    await message.answer(f"✅ Timezone set to {tz_name}.")
+
+
+@router.message(Command("reminderhour"))
+async def cmd_reminder_hour(message: Message, command: CommandObject):
+    """
+    Handle /reminderhour command.
+
+    Args:
+        message: Incoming message object.
+        command: Parsed command with the hour (0-23) as its argument.
+    """
+    user_id = message.from_user.id
+    await User.create_or_update(user_id=user_id)
+
+    if not command.args:
+        await message.answer("Send an hour from 0 to 23, e.g. /reminderhour 18")
+        return
+
+    is_valid, hour, error_message = validate_reminder_hour(command.args)
+    if not is_valid:
+        await message.answer(error_message)
+        return
+
+    await User.set_reminder_settings(user_id, reminder_hour=hour)
+    logger.info(f"User {user_id} set reminder hour to {hour}")
+    await message.answer(
+        f"✅ Reminders will arrive at {hour:02d}:00 the day before a task is due."
+    )
@@ -25,7 +25,8 @@ async def cmd_start(message: Message):
     """
     Handle /start command.
 
-    Greets the user and creates/updates their record in the database.
+    Greets the user, creates/updates their record in the database and
+    reactivates them if they had blocked the bot.
 
     Args:
         message: Incoming message object.
@@ -38,6 +39,8 @@ async def cmd_start(message: Message):
     await User.create_or_update(
         user_id=user_id, username=username, first_name=first_name
     )
+    # Users who blocked the bot come back through /start
+    await User.reactivate(user_id)
 
     logger.info(f"User {user_id} ({first_name}) started the bot")
 
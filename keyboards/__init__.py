@@ -9,6 +9,7 @@ from keyboards.reply import (
     get_confirmation_keyboard,
     get_main_menu_keyboard,
     get_numbered_keyboard,
+    get_pagination_keyboard,
     get_task_selection_keyboard,
     get_task_type_keyboard,
     remove_keyboard,
@@ -22,4 +23,5 @@ __all__ = [
     "remove_keyboard",
     "get_task_selection_keyboard",
     "get_numbered_keyboard",
+    "get_pagination_keyboard",
 ]
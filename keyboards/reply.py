@@ -5,7 +5,7 @@ This module provides inline and reply keyboards for interactive bot conversation
 """
 
 import logging
-from typing import List
+from typing import List, Optional
 
 from aiogram.types import (
     InlineKeyboardButton,
@@ -168,3 +168,30 @@ def get_numbered_keyboard(count: int, prefix: str = "num") -> InlineKeyboardMark
 
     keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
     return keyboard
+
+
+def get_pagination_keyboard(
+    prev_data: Optional[str] = None, next_data: Optional[str] = None
+) -> Optional[InlineKeyboardMarkup]:
+    """
+    Get inline keyboard with previous/next page buttons.
+
+    Args:
+        prev_data: Callback data for the previous page (None hides the button).
+        next_data: Callback data for the next page (None hides the button).
+
+    Returns:
+        InlineKeyboardMarkup with navigation buttons, or None if there are none.
+    """
+    row = []
+
+    if prev_data is not None:
+        row.append(InlineKeyboardButton(text="⬅️ Prev", callback_data=prev_data))
+
+    if next_data is not None:
+        row.append(InlineKeyboardButton(text="Next ➡️", callback_data=next_data))
+
+    if not row:
+        return None
+
+    return InlineKeyboardMarkup(inline_keyboard=[row])
@@ -16,8 +16,12 @@ from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import BotCommand
 
 from config import Config
+from database.activity import activity_buffer
 from database.db import db
-from handlers import add, delete, help, list, start
+from database.sharding import shard_router
+from handlers import add, delete, errors, help, list, settings, start
+from services.archive import archive_service
+from services.backup import backup_service
 from services.reminder import initialize_reminder_service
 
 # Setup logging
@@ -35,6 +39,7 @@ async def set_bot_commands(bot: Bot):
         BotCommand(command="add", description="➕ Add a new task"),
         BotCommand(command="list", description="📋 View all tasks"),
         BotCommand(command="delete", description="🗑️ Delete a task"),
+        BotCommand(command="settings", description="⚙️ Reminder settings"),
         BotCommand(command="help", description="❓ Get help"),
         BotCommand(command="cancel", description="❌ Cancel current action"),
     ]
@@ -53,12 +58,18 @@ async def on_startup():
 
     # Initialize database
     try:
-        await db.initialize()
+        if shard_router:
+            await shard_router.initialize()
+        else:
+            await db.initialize()
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}", exc_info=True)
         raise
 
+    # Start batched last_active writes
+    activity_buffer.start()
+
     logger.info("Startup complete!")
 
 
@@ -70,9 +81,22 @@ async def on_shutdown():
     """
     logger.info("Bot is shutting down...")
 
+    # Flush buffered user activity before the connection goes away
+    try:
+        await activity_buffer.stop()
+    except Exception as e:
+        logger.error(f"Error flushing user activity: {e}", exc_info=True)
+
+    # Log the costliest queries of this run
+    for database in shard_router.shards if shard_router else [db]:
+        database.log_stats()
+
     # Close database connection
     try:
-        await db.disconnect()
+        if shard_router:
+            await shard_router.disconnect()
+        else:
+            await db.disconnect()
         logger.info("Database connection closed")
     except Exception as e:
         logger.error(f"Error closing database: {e}", exc_info=True)
@@ -107,15 +131,21 @@ async def main():
         dp.include_router(add.router)
         dp.include_router(list.router)
         dp.include_router(delete.router)
+        dp.include_router(settings.router)
+        dp.include_router(errors.router)
 
         logger.info("All handlers registered")
 
+        # Run startup actions (connect and migrate before any background job)
+        await on_startup()
+
         # Initialize and start reminder service
         reminder_service = initialize_reminder_service(bot)
         reminder_service.start()
 
-        # Run startup actions
-        await on_startup()
+        # Schedule archival and backups on the same scheduler
+        archive_service.start(reminder_service.scheduler)
+        backup_service.start(reminder_service.scheduler)
 
         # Set bot commands menu
         await set_bot_commands(bot)
@@ -137,7 +167,7 @@ async def main():
             )
         finally:
             # Stop reminder service
-            reminder_service.stop()
+            await reminder_service.stop()
 
             # Run shutdown actions
             await on_shutdown()
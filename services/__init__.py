@@ -4,10 +4,22 @@ Services package for StudyBuddy Telegram Bot.
 This package contains background services like the reminder scheduler.
 """
 
+from services.archive import ArchiveService, archive_service
+from services.backup import BackupService, backup_service
 from services.reminder import (
     ReminderService,
     get_reminder_service,
     initialize_reminder_service,
+    is_chat_unreachable,
 )
 
-__all__ = ["ReminderService", "get_reminder_service", "initialize_reminder_service"]
+__all__ = [
+    "ReminderService",
+    "get_reminder_service",
+    "initialize_reminder_service",
+    "is_chat_unreachable",
+    "ArchiveService",
+    "archive_service",
+    "BackupService",
+    "backup_service",
+]
@@ -0,0 +1,167 @@
+"""
+Archive and compaction service for StudyBuddy Telegram Bot.
+
+This module periodically moves tasks that are past a retention window into
+the ``tasks_archive`` table and returns the freed pages to the filesystem,
+so the live ``tasks`` table and its indexes stop growing forever.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from config import Config
+from database.db import db
+from database.models import Lease, Task
+from database.records import utc_today
+from database.sharding import shard_router
+
+logger = logging.getLogger(__name__)
+
+# Lease that keeps instances sharing the database from archiving concurrently
+LEASE_NAME = "archive"
+
+
+class ArchiveService:
+    """Service for archiving past tasks and compacting the database."""
+
+    def __init__(
+        self,
+        retention_days: int = 30,
+        batch_size: int = 500,
+        interval_hours: float = 24,
+    ):
+        """
+        Initialize archive service.
+
+        Args:
+            retention_days: Keep tasks in the live table this many days past due.
+            batch_size: Tasks moved per transaction.
+            interval_hours: Hours between archive runs.
+        """
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.interval_hours = interval_hours
+        self.scheduler: Optional[AsyncIOScheduler] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.instance_id = Lease.new_holder_id()
+        logger.info("Archive service initialized")
+
+    async def run_scheduled(self) -> Optional[Dict[str, Any]]:
+        """
+        Run the archive job unless another instance ran it this interval.
+
+        The lease is taken for a whole interval and renewed by the holder's
+        next run, so of several instances sharing the database only one
+        archives and vacuums; another takes over once the holder stops.
+
+        Returns:
+            Archive report, or None if this instance skipped the run.
+        """
+        try:
+            holder = await Lease.acquire(
+                LEASE_NAME, self.instance_id, self.interval_hours * 3600
+            )
+        except Exception as e:
+            logger.error(f"Error taking archive lease: {e}", exc_info=True)
+            return None
+
+        if not holder:
+            logger.info("Another instance holds the archive lease, skipping")
+            return None
+        return await self.run_archive()
+
+    async def run_archive(self) -> Dict[str, Any]:
+        """
+        Archive tasks older than the retention window and compact the file.
+
+        The scheduler calls this through ``run_scheduled`` on the lease holder.
+
+        Returns:
+            Report with rows moved, bytes reclaimed and duration.
+        """
+        started = time.perf_counter()
+        cutoff = utc_today() - timedelta(days=self.retention_days)
+
+        logger.info(f"Running archive job for tasks due before {cutoff}")
+
+        try:
+            rows_moved = await Task.archive_past_tasks(
+                cutoff, batch_size=self.batch_size, pause=0.01
+            )
+            bytes_reclaimed = await self._compact_databases() if rows_moved else 0
+        except Exception as e:
+            logger.error(f"Error in archive job: {e}", exc_info=True)
+            raise
+
+        report = {
+            "cutoff": cutoff.isoformat(),
+            "rows_moved": rows_moved,
+            "bytes_reclaimed": bytes_reclaimed,
+            "duration_seconds": round(time.perf_counter() - started, 3),
+        }
+        self.last_report = report
+
+        logger.info(
+            f"Archive job complete. Moved: {rows_moved}, "
+            f"Reclaimed: {bytes_reclaimed} bytes, "
+            f"Took: {report['duration_seconds']}s"
+        )
+        return report
+
+    async def _compact_databases(self) -> int:
+        """Run an incremental vacuum on every database (each shard, if sharded)."""
+        databases = shard_router.shards if shard_router else [db]
+        reclaimed = await asyncio.gather(
+            *(database.incremental_vacuum() for database in databases)
+        )
+        return sum(reclaimed)
+
+    def start(self, scheduler: AsyncIOScheduler):
+        """
+        Schedule the archive job on an existing scheduler.
+
+        Args:
+            scheduler: Running scheduler shared with the other services.
+        """
+        self.scheduler = scheduler
+        scheduler.add_job(
+            self.run_scheduled,
+            trigger=IntervalTrigger(hours=self.interval_hours),
+            id="archive_tasks",
+            name="Archive past tasks and compact database",
+            replace_existing=True,
+            max_instances=1,  # Prevent overlapping runs
+        )
+        logger.info(
+            f"Archive service started. Archiving every {self.interval_hours} hour(s), "
+            f"retention {self.retention_days} day(s)"
+        )
+
+    def get_status(self) -> dict:
+        """
+        Get current status of the archive service.
+
+        Returns:
+            Dictionary with service status information.
+        """
+        job = self.scheduler.get_job("archive_tasks") if self.scheduler else None
+        return {
+            "retention_days": self.retention_days,
+            "interval_hours": self.interval_hours,
+            "next_run": job.next_run_time if job else None,
+            "last_report": self.last_report,
+        }
+
+
+# Global archive service instance
+archive_service = ArchiveService(
+    retention_days=Config.ARCHIVE_RETENTION_DAYS,
+    batch_size=Config.ARCHIVE_BATCH_SIZE,
+    interval_hours=Config.ARCHIVE_INTERVAL_HOURS,
+)
@@ -0,0 +1,477 @@
+"""
+Online backup service for StudyBuddy Telegram Bot.
+
+Backups use SQLite's backup API from a separate read-only connection in a
+worker thread. A limited number of pages is copied per step with a pause
+between steps, so the database is never locked for the whole copy and the
+bot keeps serving queries. Finished backups are optionally gzip-compressed
+and rotated.
+
+The module also works from the command line (stop the bot before a restore):
+
+    python -m services.backup backup
+    python -m services.backup verify backups/studybuddy-20260101-020000.db.gz
+    python -m services.backup restore backups/studybuddy-20260101-020000.db.gz
+"""
+
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from config import Config
+from database.db import Database, db
+from database.migrations import latest_version
+from database.models import Lease
+from database.sharding import shard_router
+
+logger = logging.getLogger(__name__)
+
+# Lease that keeps instances sharing the database from backing it up twice
+LEASE_NAME = "backup"
+
+# Times a stepped copy may restart (because another connection wrote to the
+# source) before it is finished from a single snapshot instead
+MAX_STEP_RESTARTS = 3
+
+
+class _TooManyRestarts(Exception):
+    """Raised from the progress callback to abandon a stepped copy."""
+
+
+def copy_database(
+    source_path: str,
+    target_path: str,
+    pages_per_step: int = 256,
+    step_pause: float = 0.01,
+    max_restarts: int = MAX_STEP_RESTARTS,
+) -> Dict[str, Any]:
+    """
+    Copy a live SQLite database with the backup API.
+
+    This blocks, so run it in a worker thread. The source lock is only held
+    for one step of ``pages_per_step`` pages at a time. A write from another
+    connection restarts a stepped copy; after ``max_restarts`` restarts the
+    copy is finished in one step from a single read snapshot, which in WAL
+    mode does not block writers either.
+
+    Args:
+        source_path: Database file to copy.
+        target_path: File to write the copy to.
+        pages_per_step: Pages copied per backup step.
+        step_pause: Seconds to sleep between steps.
+        max_restarts: Restarts tolerated before falling back to one step.
+
+    Returns:
+        Dictionary with pages, steps, restarts and whether the single-step
+        fallback was used.
+    """
+    progress: Dict[str, Any] = {
+        "pages": 0,
+        "steps": 0,
+        "restarts": 0,
+        "single_step": False,
+    }
+    last_remaining: Optional[int] = None
+
+    def on_step(status: int, remaining: int, total: int):
+        nonlocal last_remaining
+        progress["steps"] += 1
+        progress["pages"] = total
+        if last_remaining is not None and remaining >= last_remaining:
+            progress["restarts"] += 1
+            if progress["restarts"] > max_restarts:
+                raise _TooManyRestarts()
+        last_remaining = remaining
+        if remaining:
+            time.sleep(step_pause)
+
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    try:
+        target = sqlite3.connect(target_path)
+        try:
+            try:
+                source.backup(target, pages=pages_per_step, progress=on_step)
+            except _TooManyRestarts:
+                source.backup(target, pages=-1)
+                progress["single_step"] = True
+        finally:
+            target.close()
+    finally:
+        source.close()
+    return progress
+
+
+def _gzip_file(source_path: str, target_path: str):
+    """Compress a file with gzip."""
+    with open(source_path, "rb") as source, gzip.open(target_path, "wb") as target:
+        shutil.copyfileobj(source, target)
+
+
+@contextmanager
+def _plain_database(backup_path: str) -> Iterator[str]:
+    """Yield a path to an uncompressed copy of a backup file."""
+    if not backup_path.endswith(".gz"):
+        yield backup_path
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        plain_path = os.path.join(tmp_dir, "restore.db")
+        with gzip.open(backup_path, "rb") as source, open(plain_path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        yield plain_path
+
+
+def verify_backup(backup_path: str) -> Dict[str, Any]:
+    """
+    Check a backup file's integrity and schema version.
+
+    Args:
+        backup_path: Backup file (``.db`` or ``.db.gz``).
+
+    Returns:
+        Dictionary with ``ok``, the integrity ``problems`` found, the
+        backup's ``schema_version`` and its task count.
+    """
+    with _plain_database(backup_path) as plain_path:
+        conn = sqlite3.connect(f"file:{plain_path}?mode=ro", uri=True)
+        try:
+            problems = [
+                row[0] for row in conn.execute("PRAGMA integrity_check").fetchall()
+            ]
+            if problems == ["ok"]:
+                problems = []
+            try:
+                schema_version = conn.execute(
+                    "SELECT MAX(version) FROM schema_version"
+                ).fetchone()[0]
+                tasks = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            except sqlite3.DatabaseError as e:
+                problems.append(f"schema: {e}")
+                schema_version, tasks = None, None
+        except sqlite3.DatabaseError as e:
+            problems, schema_version, tasks = [str(e)], None, None
+        finally:
+            conn.close()
+
+    if schema_version is not None and schema_version > latest_version():
+        problems.append(
+            f"schema version {schema_version} is newer than this code "
+            f"({latest_version()})"
+        )
+    return {
+        "ok": not problems,
+        "problems": problems,
+        "schema_version": schema_version,
+        "tasks": tasks,
+    }
+
+
+def restore_backup(backup_path: str, db_path: str) -> Dict[str, Any]:
+    """
+    Verify a backup and copy it over a database file.
+
+    The bot must be stopped first. The restored file is verified again.
+
+    Args:
+        backup_path: Backup file (``.db`` or ``.db.gz``).
+        db_path: Database file to overwrite.
+
+    Returns:
+        Verification report of the restored database.
+
+    Raises:
+        ValueError: If the backup or the restored database fails verification.
+    """
+    report = verify_backup(backup_path)
+    if not report["ok"]:
+        raise ValueError(f"Backup failed verification: {report['problems']}")
+
+    with _plain_database(backup_path) as plain_path:
+        source = sqlite3.connect(f"file:{plain_path}?mode=ro", uri=True)
+        target = sqlite3.connect(db_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+    restored = verify_backup(db_path)
+    if not restored["ok"]:
+        raise ValueError(f"Restored database failed verification: {restored}")
+    logger.info(f"Restored {db_path} from {backup_path}")
+    return restored
+
+
+def _foreground_totals(databases: List[Database]) -> Tuple[int, float]:
+    """Sum statement count and time (including commits) over databases."""
+    statements, seconds = 0, 0.0
+    for database in databases:
+        snapshot = database.stats(top_n=0)
+        statements += snapshot["statements"]
+        seconds += snapshot["total_time"] + snapshot["commit_time"]
+    return statements, seconds
+
+
+class BackupService:
+    """Service for scheduled online backups of the bot's databases."""
+
+    def __init__(
+        self,
+        backup_dir: str = "backups",
+        interval_hours: float = 24,
+        keep: int = 7,
+        compress: bool = True,
+        pages_per_step: int = 256,
+        step_pause: float = 0.01,
+    ):
+        """
+        Initialize backup service.
+
+        Args:
+            backup_dir: Directory backups are written to.
+            interval_hours: Hours between backups (0 disables scheduling).
+            keep: Number of backups kept per database file.
+            compress: Gzip finished backups.
+            pages_per_step: Pages copied per backup step.
+            step_pause: Seconds to pause between steps.
+        """
+        self.backup_dir = backup_dir
+        self.interval_hours = interval_hours
+        self.keep = keep
+        self.compress = compress
+        self.pages_per_step = pages_per_step
+        self.step_pause = step_pause
+        self.scheduler: Optional[AsyncIOScheduler] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.metrics: Dict[str, Any] = {
+            "backups": 0,
+            "failures": 0,
+            "duration_total": 0.0,
+            "duration_max": 0.0,
+        }
+        self.instance_id = Lease.new_holder_id()
+        logger.info("Backup service initialized")
+
+    async def run_backup(self) -> Dict[str, Any]:
+        """
+        Back up every database file, then rotate old backups.
+
+        The scheduler calls this through ``run_scheduled`` on the lease holder.
+
+        Returns:
+            Report with the files written, pages copied, duration and the
+            foreground query latency during the backup versus before it.
+        """
+        databases = shard_router.shards if shard_router else [db]
+        os.makedirs(self.backup_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+        logger.info(f"Running backup job into {self.backup_dir}")
+        started = time.perf_counter()
+        statements_before, seconds_before = _foreground_totals(databases)
+
+        files = []
+        pages = restarts = 0
+        try:
+            for database in databases:
+                path, progress = await self._backup_database(database, stamp)
+                files.append(path)
+                pages += progress["pages"]
+                restarts += progress["restarts"]
+        except Exception as e:
+            self.metrics["failures"] += 1
+            logger.error(f"Error in backup job: {e}", exc_info=True)
+            raise
+
+        duration = time.perf_counter() - started
+        statements_after, seconds_after = _foreground_totals(databases)
+        during = statements_after - statements_before
+        baseline_avg = seconds_before / statements_before if statements_before else 0.0
+        during_avg = (seconds_after - seconds_before) / during if during else 0.0
+
+        self.metrics["backups"] += 1
+        self.metrics["duration_total"] += duration
+        self.metrics["duration_max"] = max(self.metrics["duration_max"], duration)
+
+        report = {
+            "files": files,
+            "pages": pages,
+            "restarts": restarts,
+            "bytes": sum(os.path.getsize(path) for path in files),
+            "duration_seconds": round(duration, 3),
+            "foreground_queries": during,
+            "foreground_avg_ms": round(during_avg * 1000, 3),
+            "baseline_avg_ms": round(baseline_avg * 1000, 3),
+            "foreground_slowdown": (
+                round(during_avg / baseline_avg, 2) if during and baseline_avg else None
+            ),
+            "removed": self._rotate(databases),
+        }
+        self.last_report = report
+
+        logger.info(
+            f"Backup job complete. Files: {len(files)}, Pages: {pages}, "
+            f"Took: {report['duration_seconds']}s, "
+            f"Foreground queries: {during} at {report['foreground_avg_ms']} ms avg "
+            f"(baseline {report['baseline_avg_ms']} ms)"
+        )
+        return report
+
+    async def run_scheduled(self) -> Optional[Dict[str, Any]]:
+        """
+        Run the backup job unless another instance ran it this interval.
+
+        The lease is taken for a whole interval and renewed by the holder's
+        next run, so instances sharing the database take one backup between
+        them; another takes over once the holder stops.
+
+        Returns:
+            Backup report, or None if this instance skipped the run.
+        """
+        try:
+            holder = await Lease.acquire(
+                LEASE_NAME, self.instance_id, self.interval_hours * 3600
+            )
+        except Exception as e:
+            logger.error(f"Error taking backup lease: {e}", exc_info=True)
+            return None
+
+        if not holder:
+            logger.info("Another instance holds the backup lease, skipping")
+            return None
+        return await self.run_backup()
+
+    async def _backup_database(
+        self, database: Database, stamp: str
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Copy one database file into the backup directory."""
+        stem = os.path.splitext(os.path.basename(database.db_path))[0]
+        path = os.path.join(self.backup_dir, f"{stem}-{stamp}.db")
+        partial = f"{path}.partial"
+
+        progress = await asyncio.to_thread(
+            copy_database,
+            database.db_path,
+            partial,
+            self.pages_per_step,
+            self.step_pause,
+        )
+        if self.compress:
+            await asyncio.to_thread(_gzip_file, partial, f"{path}.gz")
+            os.remove(partial)
+            path = f"{path}.gz"
+        else:
+            os.replace(partial, path)
+        return path, progress
+
+    def _rotate(self, databases: List[Database]) -> List[str]:
+        """Delete all but the newest ``keep`` backups of each database file."""
+        removed = []
+        names = os.listdir(self.backup_dir)
+        for database in databases:
+            prefix = os.path.splitext(os.path.basename(database.db_path))[0] + "-"
+            backups = sorted(
+                name
+                for name in names
+                if name.startswith(prefix) and name.endswith((".db", ".db.gz"))
+            )
+            for name in backups[: -self.keep]:
+                os.remove(os.path.join(self.backup_dir, name))
+                removed.append(name)
+        return removed
+
+    def start(self, scheduler: AsyncIOScheduler):
+        """
+        Schedule the backup job on an existing scheduler.
+
+        Args:
+            scheduler: Running scheduler shared with the other services.
+        """
+        self.scheduler = scheduler
+        if self.interval_hours <= 0:
+            logger.info("Backup service disabled (BACKUP_INTERVAL_HOURS=0)")
+            return
+
+        scheduler.add_job(
+            self.run_scheduled,
+            trigger=IntervalTrigger(hours=self.interval_hours),
+            id="backup_database",
+            name="Back up database files",
+            replace_existing=True,
+            max_instances=1,  # Prevent overlapping runs
+        )
+        logger.info(
+            f"Backup service started. Backing up every {self.interval_hours} "
+            f"hour(s) into {self.backup_dir}, keeping {self.keep}"
+        )
+
+    def get_status(self) -> dict:
+        """
+        Get current status of the backup service.
+
+        Returns:
+            Dictionary with service status information and metrics.
+        """
+        job = self.scheduler.get_job("backup_database") if self.scheduler else None
+        return {
+            "backup_dir": self.backup_dir,
+            "interval_hours": self.interval_hours,
+            "next_run": job.next_run_time if job else None,
+            "last_report": self.last_report,
+            "metrics": dict(self.metrics),
+        }
+
+
+# Global backup service instance
+backup_service = BackupService(
+    backup_dir=Config.BACKUP_DIR,
+    interval_hours=Config.BACKUP_INTERVAL_HOURS,
+    keep=Config.BACKUP_KEEP,
+    compress=Config.BACKUP_COMPRESS,
+    pages_per_step=Config.BACKUP_PAGES_PER_STEP,
+    step_pause=Config.BACKUP_STEP_PAUSE_MS / 1000,
+)
+
+
+def main():
+    """Run a backup, verification or restore from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("backup", help="Back up the database files now")
+    verify = commands.add_parser("verify", help="Check a backup's integrity")
+    verify.add_argument("backup")
+    restore = commands.add_parser("restore", help="Verify and restore a backup")
+    restore.add_argument("backup")
+    restore.add_argument("--db", default=db.db_path)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "backup":
+        report = asyncio.run(backup_service.run_backup())
+        print(f"Wrote {', '.join(report['files'])}")
+    elif args.command == "verify":
+        report = verify_backup(args.backup)
+        print("OK" if report["ok"] else f"FAILED: {report['problems']}")
+        raise SystemExit(0 if report["ok"] else 1)
+    else:
+        report = restore_backup(args.backup, args.db)
+        print(
+            f"Restored {args.db} (schema version {report['schema_version']}, "
+            f"{report['tasks']} task(s))"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Outgoing message rate limiting for StudyBuddy Telegram Bot.
+
+Telegram allows about 30 messages per second across all chats and about one
+per second to a single chat. This module provides token buckets for both,
+so concurrent senders can go as fast as the limits allow without tripping
+flood control.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class TokenBucket:
+    """
+    Token bucket that refills at a fixed rate.
+
+    Callers reserve a token up front and then sleep until it has been earned,
+    so concurrent callers are served in arrival order without a lock.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second.
+            capacity: Maximum burst size (defaults to one second of tokens).
+            clock: Monotonic time source in seconds.
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self):
+        """Add the tokens earned since the last update."""
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    @property
+    def idle(self) -> bool:
+        """Whether the bucket is full (nobody is waiting on it)."""
+        self._refill()
+        return self._tokens >= self.capacity
+
+    def reserve(self) -> float:
+        """
+        Take one token, going into debt if none is available.
+
+        Returns:
+            Seconds the caller must wait before using the token.
+        """
+        self._refill()
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> float:
+        """
+        Wait until a token is available and take it.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class ChatRateLimiter:
+    """Global token bucket combined with one bucket per chat."""
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        per_chat_rate: float = 1.0,
+        per_chat_burst: float = 1.0,
+        max_chats: int = 10000,
+    ):
+        """
+        Initialize chat rate limiter.
+
+        Args:
+            global_rate: Messages per second across all chats.
+            per_chat_rate: Messages per second to a single chat.
+            per_chat_burst: Messages a chat may receive back to back.
+            max_chats: Per-chat buckets kept before idle ones are dropped.
+        """
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.max_chats = max_chats
+        self._global = TokenBucket(global_rate)
+        self._chats: Dict[int, TokenBucket] = {}
+
+        self.acquired = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    async def acquire(self, chat_id: int) -> float:
+        """
+        Wait until a message may be sent to a chat.
+
+        The chat's own limit is waited out first, so a busy chat does not
+        hold global capacity it cannot use yet.
+
+        Args:
+            chat_id: Telegram chat ID.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_chats:
+                self._drop_idle_chats()
+            bucket = self._chats[chat_id] = TokenBucket(
+                self.per_chat_rate, self.per_chat_burst
+            )
+
+        started = time.monotonic()
+        await bucket.acquire()
+        await self._global.acquire()
+        waited = time.monotonic() - started
+
+        self.acquired += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        return waited
+
+    def _drop_idle_chats(self):
+        """Forget per-chat buckets that are full again."""
+        for chat_id in [c for c, bucket in self._chats.items() if bucket.idle]:
+            del self._chats[chat_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get limiter metrics.
+
+        Returns:
+            Dictionary with acquisitions, wait totals and tracked chats.
+        """
+        return {
+            "acquired": self.acquired,
+            "wait_total": self.wait_total,
+            "wait_avg": self.wait_total / self.acquired if self.acquired else 0.0,
+            "wait_max": self.wait_max,
+            "chats": len(self._chats),
+        }
@@ -2,23 +2,73 @@
 Reminder service for StudyBuddy Telegram Bot.
 
 This module provides background job scheduling for automated task reminders.
-Checks for tasks due in 24 hours and sends reminder notifications to users.
+A timer sleeps until the next reminder in the in-memory reminder queue (each
+user's reminder hour in their timezone), then writes notifications for tasks
+whose window has opened to the outbox. A sender loop delivers outbox messages
+with retries, backoff and dead-lettering, and marks users who blocked the bot
+inactive. A periodic reconciliation job reloads the queue from the database
+as a safety net.
+
+Several bot processes may run side by side: a lease row in the database
+elects one leader that scans and sends, a standby takes over once the lease
+expires, and outbox rows are claimed one by one so no message goes out twice.
 """
 
+import argparse
 import asyncio
 import logging
-from datetime import datetime, timedelta
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
 from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from config import Config
-from database.models import Task
-from utils.formatters import format_reminder_message
+from database.db import db
+from database.models import Lease, Outbox, Task, User
+from database.records import OutboxRecord, TaskRecord
+from database.reminder_queue import ReminderQueue, reminder_queue
+from database.sharding import shard_router
+from services.rate_limit import ChatRateLimiter
+from services.reminder_acks import ReminderAcks
+from utils.formatters import format_reminder_digest, format_reminder_message
 
 logger = logging.getLogger(__name__)
 
+# Lease electing the instance that scans and sends reminders
+LEASE_NAME = "reminders"
+
+# Reminder scans per check when racing instances split a user's tasks
+MAX_SCAN_PASSES = 3
+
+# Send errors that retrying cannot fix (bot blocked, chat gone, bad message)
+PERMANENT_ERRORS = (TelegramForbiddenError, TelegramBadRequest)
+
+
+def is_chat_unreachable(error: Exception) -> bool:
+    """
+    Check whether a Telegram error means the user can no longer be messaged.
+
+    Args:
+        error: Exception raised by a Bot API call.
+
+    Returns:
+        True if the bot was blocked or the chat no longer exists.
+    """
+    if isinstance(error, TelegramForbiddenError):
+        return True
+    if isinstance(error, TelegramBadRequest):
+        return "chat not found" in str(error).lower()
+    return False
+
 
 class ReminderService:
     """Service for managing automated task reminders."""
@@ -32,16 +82,112 @@ class ReminderService:
         """
         self.bot = bot
         self.scheduler = AsyncIOScheduler()
+        self.queue = reminder_queue
         self.is_running = False
+        self._timer: Optional[asyncio.Task] = None
+        # Timer wakeups and reconciliation must not queue the same reminder twice
+        self._send_lock = asyncio.Lock()
+        self.wakeups = 0
+        self.reconciliations = 0
+
+        # One message per user listing all their due tasks
+        self.digest = Config.REMINDER_DIGEST
+
+        # Concurrent fan-out within Telegram's global and per-chat limits
+        self.concurrency = Config.REMINDER_SEND_CONCURRENCY
+        self.rate_limiter = ChatRateLimiter(
+            global_rate=Config.REMINDER_GLOBAL_RATE,
+            per_chat_rate=Config.REMINDER_CHAT_RATE,
+        )
+        self._pending: Optional[asyncio.Queue] = None
+
+        # Durable outbox between the reminder scan and the sender
+        self.outbox_batch_size = Config.REMINDER_OUTBOX_BATCH_SIZE
+        self.max_attempts = Config.REMINDER_MAX_ATTEMPTS
+        self.retry_base = Config.REMINDER_RETRY_BASE_SECONDS
+        self.retry_max = Config.REMINDER_RETRY_MAX_SECONDS
+        self._sender: Optional[asyncio.Task] = None
+        self._outbox_changed: Optional[asyncio.Event] = None
+        self._drain_lock = asyncio.Lock()
+
+        # Leader election between bot instances sharing the database
+        self.instance_id = Lease.new_holder_id()
+        self.lease_seconds = Config.REMINDER_LEASE_SECONDS
+        self.claim_seconds = Config.REMINDER_CLAIM_SECONDS
+        self.is_leader = False
+        self.leader_changes = 0
+        self._lease_task: Optional[asyncio.Task] = None
+
+        # Delivered outbox rows are removed in batches rather than one commit each
+        self.acks = ReminderAcks(
+            flush_interval=Config.REMINDER_ACK_FLUSH_SECONDS,
+            max_pending=Config.REMINDER_ACK_BATCH_SIZE,
+        )
+        self.send_metrics = {
+            "runs": 0,
+            "sent": 0,
+            "failed": 0,
+            "retried": 0,
+            "dead": 0,
+            "tasks_reminded": 0,
+            "send_time_total": 0.0,
+            "last_throughput": 0.0,
+            "queue_depth_max": 0,
+            # Messages delivered in each UTC hour of the day
+            "sent_by_hour": [0] * 24,
+        }
         logger.info("Reminder service initialized")
 
     async def check_and_send_reminders(self):
         """
-        Check for tasks needing reminders and send notifications.
+        Check for tasks needing reminders and queue their notifications.
+
+        This method is called by the reminder timer and after each
+        reconciliation. It finds all tasks whose owner's reminder window is
+        open and that haven't been reminded yet, writes their messages to the
+        outbox while marking them as reminded, and wakes the outbox sender.
+        Only the instance holding the reminder lease scans.
+        """
+        async with self._send_lock:
+            if not await self._hold_lease():
+                logger.info("Not the reminder leader, skipping reminder check")
+                return
+            # Rescan if a racing instance left some of our tasks unreminded
+            for _ in range(MAX_SCAN_PASSES):
+                if not await self._queue_due_reminders():
+                    break
 
-        This method is called periodically by the scheduler.
-        It finds all tasks due in 24-25 hours that haven't been reminded yet,
-        sends reminder messages, and marks them as reminded.
+    async def _hold_lease(self) -> bool:
+        """
+        Acquire or renew the reminder lease.
+
+        Returns:
+            True if this instance is the leader.
+        """
+        try:
+            leader = await Lease.acquire(
+                LEASE_NAME, self.instance_id, self.lease_seconds
+            )
+        except Exception as e:
+            logger.error(f"Error renewing reminder lease: {e}", exc_info=True)
+            leader = False
+
+        if leader != self.is_leader:
+            self.is_leader = leader
+            self.leader_changes += 1
+            if leader:
+                logger.info(f"Instance {self.instance_id} is the reminder leader")
+            else:
+                logger.warning(f"Instance {self.instance_id} lost the reminder lease")
+        return leader
+
+    async def _queue_due_reminders(self) -> bool:
+        """
+        Materialize outbox messages for every task currently in its window.
+
+        Returns:
+            True if some messages were dropped because another instance had
+            claimed part of their tasks.
         """
         try:
             logger.info("Running reminder check...")
@@ -51,66 +197,342 @@ class ReminderService:
 
             if not tasks:
                 logger.info("No tasks need reminders at this time")
-                return
+                return False
 
             logger.info(f"Found {len(tasks)} task(s) needing reminders")
 
-            # Send reminder for each task
-            reminders_sent = 0
-            reminders_failed = 0
+            # One message per user in digest mode, else one per task
+            if self.digest:
+                by_user: Dict[int, List[TaskRecord]] = {}
+                for task in tasks:
+                    by_user.setdefault(task["user_id"], []).append(task)
+                groups = list(by_user.values())
+            else:
+                groups = [[task] for task in tasks]
+
+            messages = []
+            for group in groups:
+                if len(group) == 1:
+                    reminder_message = format_reminder_message(group[0])
+                else:
+                    reminder_message = format_reminder_digest(group)
+                task_ids = [task["id"] for task in group]
+                messages.append((group[0]["user_id"], task_ids, reminder_message))
+
+            # Messages whose tasks another instance claimed first are dropped
+            created = await Outbox.enqueue(messages)
+            reminded = sum(len(task_ids) for _, task_ids, _ in created)
+            self.send_metrics["tasks_reminded"] += reminded
+            if self._outbox_changed is not None:
+                self._outbox_changed.set()
 
-            for task in tasks:
-                try:
-                    user_id = task["user_id"]
-                    task_id = task["id"]
+            logger.info(
+                f"Reminder check complete. Queued {len(created)} message(s) for "
+                f"{reminded} task(s)"
+            )
+            return len(created) < len(messages)
 
-                    # Format reminder message
-                    reminder_message = format_reminder_message(task)
+        except Exception as e:
+            logger.error(f"Error in reminder check: {e}", exc_info=True)
+            return False
 
-                    # Send reminder to user
-                    await self.bot.send_message(chat_id=user_id, text=reminder_message)
+    async def drain_outbox(self) -> int:
+        """
+        Send every outbox message whose next attempt is due.
 
-                    # Mark task as reminded
-                    await Task.mark_as_reminded(task_id)
+        Due rows are claimed in batches of ``outbox_batch_size`` and sent by a
+        bounded pool of senders paced by the rate limiter. A claim keeps other
+        instances off a row for ``claim_seconds``, and claimed rows are not
+        claimed again, so each is attempted once per drain. Delivered rows are
+        removed in batches; failed ones are rescheduled with exponential
+        backoff or dead-lettered. Draining stops if the lease is lost.
 
-                    reminders_sent += 1
-                    logger.info(
-                        f"Sent reminder for task {task_id} to user {user_id}: {task['title']}"
-                    )
+        Returns:
+            Number of messages attempted.
+        """
+        attempted = 0
+        async with self._drain_lock:
+            while self.is_leader:
+                due = await Outbox.claim_due(
+                    self.instance_id,
+                    time.time(),
+                    self.outbox_batch_size,
+                    self.claim_seconds,
+                )
+                # Skip rows whose claim lapsed while their ack was pending
+                rows = [row for row in due if not self.acks.is_pending(row.id)]
+                if not due:
+                    break
+                attempted += len(rows)
+                if rows:
+                    await self._send_batch(rows)
+        return attempted
+
+    async def _send_batch(self, rows: List[OutboxRecord]):
+        """Send one batch of outbox rows concurrently and record the results."""
+        pending = self._pending = asyncio.Queue()
+        for row in rows:
+            pending.put_nowait(row)
+        self.send_metrics["queue_depth_max"] = max(
+            self.send_metrics["queue_depth_max"], len(rows)
+        )
+
+        # Bounded pool of senders, paced by the rate limiter
+        results = {"sent": 0, "failed": 0, "retried": 0, "dead": 0}
+        started = time.perf_counter()
+        wait_before = self.rate_limiter.wait_total
+        workers = min(self.concurrency, len(rows))
+        await asyncio.gather(
+            *(self._outbox_worker(pending, results) for _ in range(workers))
+        )
+        self._pending = None
+        try:
+            await self.acks.flush()
+        except Exception as e:
+            logger.error(f"Failed to acknowledge reminders: {e}", exc_info=True)
+        elapsed = time.perf_counter() - started
+        limiter_wait = self.rate_limiter.wait_total - wait_before
+
+        self.send_metrics["runs"] += 1
+        for key in ("sent", "failed", "retried", "dead"):
+            self.send_metrics[key] += results[key]
+        self.send_metrics["send_time_total"] += elapsed
+        self.send_metrics["last_throughput"] = (
+            results["sent"] / elapsed if elapsed else 0.0
+        )
 
-                except Exception as e:
-                    reminders_failed += 1
+        logger.info(
+            f"Outbox batch complete. Sent: {results['sent']}, "
+            f"Failed: {results['failed']} (retrying {results['retried']}, "
+            f"dead-lettered {results['dead']}) in {elapsed:.2f}s "
+            f"({self.send_metrics['last_throughput']:.1f} msg/s, "
+            f"{limiter_wait:.2f}s waiting on rate limits, {workers} sender(s))"
+        )
+
+    async def _outbox_worker(self, pending: asyncio.Queue, results: dict):
+        """Send queued outbox rows one at a time until the queue is empty."""
+        while not pending.empty():
+            row = pending.get_nowait()
+            try:
+                # Wait for global and per-chat capacity, then send
+                await self.rate_limiter.acquire(row.user_id)
+                await self.bot.send_message(chat_id=row.user_id, text=row.message)
+
+                # Remove the delivered row (batched)
+                await self.acks.add(row.id)
+
+                results["sent"] += 1
+                self.send_metrics["sent_by_hour"][datetime.now(timezone.utc).hour] += 1
+                logger.info(
+                    f"Sent reminder for task(s) {row.task_ids} to user {row.user_id}"
+                )
+
+            except Exception as e:
+                results["failed"] += 1
+                try:
+                    dead = await self._record_failure(row, e)
+                    results["dead" if dead else "retried"] += 1
+                except Exception as record_error:
                     logger.error(
-                        f"Failed to send reminder for task {task.get('id')}: {e}",
+                        f"Failed to record outbox failure for {row.id}: "
+                        f"{record_error}",
                         exc_info=True,
                     )
 
-            logger.info(
-                f"Reminder check complete. Sent: {reminders_sent}, Failed: {reminders_failed}"
+    async def _record_failure(self, row: OutboxRecord, error: Exception) -> bool:
+        """
+        Reschedule a failed outbox row, or dead-letter it.
+
+        Flood-control errors wait the time Telegram asks for without using
+        up an attempt. Errors that no retry can fix (blocked bot, unknown
+        chat) and rows out of attempts are dead-lettered; users whose chat
+        is unreachable are deactivated.
+
+        Returns:
+            True if the row was dead-lettered.
+        """
+        if isinstance(error, TelegramRetryAfter):
+            attempts = row.attempts
+            delay = float(error.retry_after)
+            dead = False
+        else:
+            attempts = row.attempts + 1
+            delay = min(
+                self.retry_base * 2 ** (attempts - 1) * random.uniform(1.0, 1.2),
+                self.retry_max,
+            )
+            dead = attempts >= self.max_attempts or isinstance(error, PERMANENT_ERRORS)
+
+        recorded = await Outbox.record_failure(
+            row.id,
+            self.instance_id,
+            attempts,
+            time.time() + delay,
+            str(error),
+            dead=dead,
+        )
+        if not recorded:
+            logger.warning(f"Reminder {row.id} was claimed by another instance")
+        if is_chat_unreachable(error):
+            # Stop scanning their tasks until they come back with /start
+            await User.deactivate(row.user_id)
+        if dead:
+            logger.warning(
+                f"Dead-lettered reminder {row.id} for user {row.user_id} after "
+                f"{attempts} attempt(s): {error}"
+            )
+        else:
+            logger.warning(
+                f"Reminder {row.id} for user {row.user_id} failed "
+                f"(attempt {attempts}), retrying in {delay:.0f}s: {error}"
             )
+        return dead
+
+    async def _run_sender(self):
+        """Drain the outbox, then sleep until its next due row or new messages."""
+        changed = self._outbox_changed = asyncio.Event()
+        while True:
+            changed.clear()
+            try:
+                await self.drain_outbox()
+                next_at = await Outbox.next_attempt_time()
+            except Exception as e:
+                logger.error(f"Error draining reminder outbox: {e}", exc_info=True)
+                next_at = time.time() + self.retry_base
+
+            timeout = None
+            if next_at is not None and self.is_leader:
+                # Rows still awaiting an ack are due but skipped: don't spin
+                timeout = max(next_at - time.time(), self.acks.flush_interval)
+
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_lease(self):
+        """
+        Renew the reminder lease, or wait to take it over from another instance.
+
+        Renewing every third of the lease keeps a live leader in place, and a
+        standby takes over at most ``lease_seconds`` plus one renewal interval
+        after the leader stops.
+        """
+        while True:
+            was_leader = self.is_leader
+            if await self._hold_lease() and not was_leader:
+                # Catch up on anything due while no instance was leading
+                if self._outbox_changed is not None:
+                    self._outbox_changed.set()
+                await self.check_and_send_reminders()
+            await asyncio.sleep(self.lease_seconds / 3)
+
+    def get_send_stats(self) -> dict:
+        """
+        Get reminder fan-out metrics.
+
+        Returns:
+            Dictionary with send, retry and dead-letter counts, throughput,
+            queue depth and time spent waiting on the rate limiter.
+        """
+        metrics = dict(self.send_metrics)
+        total_time = metrics["send_time_total"]
+        metrics["throughput_avg"] = metrics["sent"] / total_time if total_time else 0.0
+        metrics["queue_depth"] = self._pending.qsize() if self._pending else 0
+        metrics["limiter"] = self.rate_limiter.get_stats()
+        metrics["acks_pending"] = self.acks.pending_count
+        metrics["ack_flushes"] = self.acks.flushes
+        return metrics
+
+    def get_reminder_histogram(self) -> Dict[str, List[int]]:
+        """
+        Get reminder load per UTC hour of the day.
+
+        Returns:
+            Dictionary with ``queued`` (pending reminders in the loaded
+            horizon, by the hour they are due) and ``sent`` (messages
+            delivered since start, by the hour they were sent), each a list
+            of 24 counts.
+        """
+        return {
+            "queued": self.queue.histogram(),
+            "sent": list(self.send_metrics["sent_by_hour"]),
+        }
 
+    async def reconcile(self):
+        """
+        Reload the reminder queue from the database and send anything due.
+
+        This method is called periodically by the scheduler. It catches
+        reminders the queue missed (tasks changed outside the Task model or
+        through another instance, or due dates that have entered the loaded
+        horizon since the last load).
+        """
+        try:
+            start, end = self.queue.horizon(datetime.now(timezone.utc).date())
+            schedule = await Task.get_reminder_schedule(start, end)
+            self.queue.load(schedule, start, end)
+            self.reconciliations += 1
+            logger.info(
+                f"Reminder queue reconciled: {len(schedule)} task(s) due "
+                f"{start} to {end}, next reminder at {self.queue.next_time()}"
+            )
+            busy_hours = [
+                f"{hour:02d}h={count}"
+                for hour, count in enumerate(self.queue.histogram())
+                if count
+            ]
+            logger.info(
+                f"Queued reminders by UTC hour: {', '.join(busy_hours) or 'none'}"
+            )
         except Exception as e:
-            logger.error(f"Error in reminder check: {e}", exc_info=True)
+            logger.error(f"Error reconciling reminder queue: {e}", exc_info=True)
+
+        await self.check_and_send_reminders()
+
+    async def _run_timer(self):
+        """Sleep until the next queued reminder is due, then send reminders."""
+        changed = self.queue.changed = asyncio.Event()
+        await self.reconcile()
+
+        while True:
+            changed.clear()
+            next_time = self.queue.next_time()
+            timeout = None
+            if next_time is not None:
+                timeout = max(
+                    (next_time - datetime.now(timezone.utc)).total_seconds(), 0
+                )
+
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+                continue  # Queue changed: recompute the sleep
+            except asyncio.TimeoutError:
+                pass
+
+            if self.queue.pop_due(datetime.now(timezone.utc)):
+                self.wakeups += 1
+                await self.check_and_send_reminders()
 
     def start(self):
         """
-        Start the reminder scheduler.
+        Start the reminder timer, the outbox sender and the reconciliation job.
 
-        Sets up a periodic job that runs every N minutes (configured in settings)
-        to check for tasks needing reminders.
+        The timer sleeps exactly until the next queued reminder and the
+        sender until the next due outbox row. The reconciliation job runs
+        every N minutes (configured in settings).
         """
         if self.is_running:
             logger.warning("Reminder service is already running")
             return
 
-        # Add periodic job
         interval_minutes = Config.REMINDER_INTERVAL_MINUTES
 
         self.scheduler.add_job(
-            self.check_and_send_reminders,
+            self.reconcile,
             trigger=IntervalTrigger(minutes=interval_minutes),
             id="reminder_check",
-            name="Check and send task reminders",
+            name="Reconcile reminder queue with the database",
             replace_existing=True,
             max_instances=1,  # Prevent overlapping runs
         )
@@ -120,25 +542,53 @@ class ReminderService:
         self.is_running = True
 
         logger.info(
-            f"Reminder service started. Checking every {interval_minutes} minute(s)"
+            f"Reminder service started. Reconciling every {interval_minutes} "
+            f"minute(s)"
         )
 
-        # Run initial check immediately
-        asyncio.create_task(self.check_and_send_reminders())
+        # Load the queue immediately and start sleeping until the first reminder
+        self._lease_task = asyncio.create_task(self._run_lease())
+        self._timer = asyncio.create_task(self._run_timer())
+        self._sender = asyncio.create_task(self._run_sender())
+        self.acks.start()
 
-    def stop(self):
+    async def stop(self):
         """
         Stop the reminder scheduler.
 
-        Gracefully shuts down the scheduler and waits for any running jobs to complete.
+        Gracefully shuts down the scheduler, writes any buffered reminder
+        acknowledgements and releases the lease so a standby takes over.
         """
         if not self.is_running:
             logger.warning("Reminder service is not running")
             return
 
+        for background in (self._lease_task, self._timer, self._sender):
+            if background is not None:
+                background.cancel()
+                try:
+                    await background
+                except asyncio.CancelledError:
+                    pass
+        self._lease_task = self._timer = self._sender = None
+        self.queue.changed = None
+        self._outbox_changed = None
+
         self.scheduler.shutdown(wait=True)
         self.is_running = False
 
+        try:
+            await self.acks.stop()
+        except Exception as e:
+            logger.error(f"Error flushing reminder acks: {e}", exc_info=True)
+
+        if self.is_leader:
+            try:
+                await Lease.release(LEASE_NAME, self.instance_id)
+            except Exception as e:
+                logger.error(f"Error releasing reminder lease: {e}", exc_info=True)
+            self.is_leader = False
+
         logger.info("Reminder service stopped")
 
     async def send_test_reminder(self, user_id: int, task_id: int):
@@ -183,7 +633,14 @@ class ReminderService:
         """
         return {
             "is_running": self.is_running,
+            "instance_id": self.instance_id,
+            "is_leader": self.is_leader,
             "interval_minutes": Config.REMINDER_INTERVAL_MINUTES,
+            "queued_reminders": len(self.queue),
+            "next_reminder": self.queue.next_time(),
+            "wakeups": self.wakeups,
+            "reconciliations": self.reconciliations,
+            "sending": self.get_send_stats(),
             "next_run": (
                 self.scheduler.get_job("reminder_check").next_run_time
                 if self.is_running
@@ -226,3 +683,57 @@ def initialize_reminder_service(bot: Bot) -> ReminderService:
     global reminder_service
     reminder_service = ReminderService(bot)
     return reminder_service
+
+
+def format_hour_histogram(counts: List[int], width: int = 40) -> str:
+    """
+    Render per-hour counts as a text bar chart.
+
+    Args:
+        counts: 24 counts, index 0 for 00:00-00:59 UTC.
+        width: Length of the longest bar.
+
+    Returns:
+        One line per hour with its count and bar.
+    """
+    peak = max(counts) or 1
+    return "\n".join(
+        f"{hour:02d}:00 UTC {count:>7} {'#' * round(count * width / peak)}"
+        for hour, count in enumerate(counts)
+    )
+
+
+async def queued_reminder_histogram(days: int) -> List[int]:
+    """
+    Bucket upcoming reminders by the UTC hour they will be sent.
+
+    Args:
+        days: Days of due dates to include beyond those that can open today.
+
+    Returns:
+        24 counts, index 0 for 00:00-00:59 UTC.
+    """
+    database = shard_router or db
+    await database.initialize()
+    try:
+        queue = ReminderQueue(horizon_days=days)
+        start, end = queue.horizon(datetime.now(timezone.utc).date())
+        queue.load(await Task.get_reminder_schedule(start, end), start, end)
+        return queue.histogram()
+    finally:
+        await database.disconnect()
+
+
+def main():
+    """Print the per-hour reminder histogram from the command line."""
+    parser = argparse.ArgumentParser(description="Report reminder load by UTC hour")
+    parser.add_argument("--days", type=int, default=2)
+    args = parser.parse_args()
+
+    counts = asyncio.run(queued_reminder_histogram(args.days))
+    print(format_hour_histogram(counts))
+    print(f"Total: {sum(counts)} reminder(s), busiest hour: {max(counts)}")
+
+
+if __name__ == "__main__":
+    main()
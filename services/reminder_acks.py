@@ -0,0 +1,127 @@
+"""
+Batched reminder acknowledgements for StudyBuddy Telegram Bot.
+
+Removing each delivered outbox row with its own statement and commit caps
+reminder throughput at the disk's fsync rate. This buffer collects the IDs
+of delivered rows and removes them with ``Outbox.delete_sent`` when enough
+have piled up, on a timer, after every send batch, and on shutdown.
+
+Until a row's acknowledgement is written it stays pending here, and the
+reminder service skips pending rows, so a reminder is not sent twice by
+this process even if a flush fails and is retried.
+"""
+
+import asyncio
+import logging
+from typing import Optional, Set
+
+from database.models import Outbox
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderAcks:
+    """In-memory buffer of delivered outbox rows waiting to be removed."""
+
+    def __init__(self, flush_interval: float = 1.0, max_pending: int = 100):
+        """
+        Initialize acknowledgement buffer.
+
+        Args:
+            flush_interval: Seconds between periodic flushes.
+            max_pending: Number of pending acknowledgements that triggers a flush.
+        """
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Set[int] = set()
+        self._flushing: Set[int] = set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.flushed_total = 0
+        self.flushes = 0
+
+    @property
+    def pending_count(self) -> int:
+        """Number of delivered reminders not yet removed from the outbox."""
+        return len(self._pending) + len(self._flushing)
+
+    def is_pending(self, outbox_id: int) -> bool:
+        """
+        Check whether an outbox row was delivered but not yet removed.
+
+        Args:
+            outbox_id: Outbox row ID.
+
+        Returns:
+            True if the acknowledgement is buffered or being written.
+        """
+        return outbox_id in self._pending or outbox_id in self._flushing
+
+    async def add(self, outbox_id: int):
+        """
+        Record a delivered reminder, flushing if the buffer is full.
+
+        Args:
+            outbox_id: Outbox row ID of the delivered message.
+        """
+        self._pending.add(outbox_id)
+        if len(self._pending) >= self.max_pending:
+            try:
+                await self.flush()
+            except Exception as e:
+                # The reminder was sent; its ack stays pending for the next flush
+                logger.error(f"Failed to acknowledge reminders: {e}", exc_info=True)
+
+    async def flush(self) -> int:
+        """
+        Remove all buffered delivered rows from the outbox in one batch.
+
+        Returns:
+            Number of acknowledgements written.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, set()
+            self._flushing = batch
+            try:
+                await Outbox.delete_sent(sorted(batch))
+            except Exception:
+                # Keep them pending so they are retried and not re-sent
+                self._pending |= batch
+                raise
+            finally:
+                self._flushing = set()
+
+            self.flushed_total += len(batch)
+            self.flushes += 1
+            logger.debug(f"Acknowledged {len(batch)} reminder(s)")
+            return len(batch)
+
+    async def _flush_periodically(self):
+        """Flush the buffer every ``flush_interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to acknowledge reminders: {e}", exc_info=True)
+
+    def start(self):
+        """Start the periodic flush task."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        """Stop the periodic flush task and write any remaining acknowledgements."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        flushed = await self.flush()
+        logger.info(f"Reminder acknowledgements stopped. Flushed {flushed} pending")
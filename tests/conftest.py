@@ -0,0 +1,10 @@
+"""
+Shared pytest configuration for StudyBuddy tests.
+
+Provides a dummy bot token so modules importing ``config`` can be loaded
+without a real .env file.
+"""
+
+import os
+
+os.environ.setdefault("BOT_TOKEN", "123456:TEST-TOKEN")
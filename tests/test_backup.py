@@ -0,0 +1,172 @@
+"""
+Unit tests for online backups in StudyBuddy Telegram Bot.
+
+Tests back up a temporary database while it is being written to.
+"""
+
+import asyncio
+import os
+import sqlite3
+
+import pytest
+import pytest_asyncio
+
+from database.db import Database
+from services.backup import BackupService, copy_database, restore_backup, verify_backup
+
+
+@pytest_asyncio.fixture
+async def live_db(tmp_path, monkeypatch):
+    """Create a populated temporary database for the backup service."""
+    database = Database(str(tmp_path / "bot.db"))
+    await database.initialize()
+    await database.execute("INSERT INTO users (user_id, first_name) VALUES (1, 'U')")
+    await database.execute_many(
+        "INSERT INTO tasks (user_id, task_type, title, due_date) "
+        "VALUES (1, 'exam', ?, 21915)",
+        [(f"Task {i} " + "x" * 200,) for i in range(2000)],
+    )
+    monkeypatch.setattr("services.backup.db", database)
+    monkeypatch.setattr("database.models.db", database)
+    monkeypatch.setattr("services.backup.shard_router", None)
+    yield database
+    await database.disconnect()
+
+
+def make_service(tmp_path, **kwargs) -> BackupService:
+    """Create a backup service writing into a temporary directory."""
+    options = {"pages_per_step": 16, "step_pause": 0.001}
+    options.update(kwargs)
+    return BackupService(backup_dir=str(tmp_path / "backups"), **options)
+
+
+class TestBackupService:
+    """Test cases for taking and rotating backups."""
+
+    @pytest.mark.asyncio
+    async def test_backup_while_writing(self, tmp_path, live_db):
+        """Test that writes keep running during a backup and the copy is valid."""
+        service = make_service(tmp_path, compress=False)
+        stop = asyncio.Event()
+
+        async def writer():
+            written = 0
+            while not stop.is_set():
+                await live_db.execute(
+                    "INSERT INTO tasks (user_id, task_type, title, due_date) "
+                    "VALUES (1, 'exam', 'During', 21915)"
+                )
+                written += 1
+                await asyncio.sleep(0)
+            return written
+
+        writing = asyncio.create_task(writer())
+        report = await service.run_backup()
+        stop.set()
+
+        assert await writing > 0
+        assert report["pages"] > 0
+        assert report["foreground_queries"] > 0
+        (path,) = report["files"]
+        assert path.endswith(".db")
+        result = verify_backup(path)
+        assert result["ok"]
+        assert result["tasks"] >= 2000
+
+    @pytest.mark.asyncio
+    async def test_compress_and_rotate(self, tmp_path, live_db):
+        """Test that backups are gzipped and only the newest are kept."""
+        service = make_service(tmp_path, keep=2)
+        backup_dir = tmp_path / "backups"
+        backup_dir.mkdir()
+        for stamp in ("20000101-000000", "20000102-000000"):
+            (backup_dir / f"bot-{stamp}.db.gz").write_bytes(b"old")
+        (backup_dir / "other-20000101-000000.db.gz").write_bytes(b"keep")
+
+        report = await service.run_backup()
+
+        assert report["files"][0].endswith(".db.gz")
+        assert report["removed"] == ["bot-20000101-000000.db.gz"]
+        assert sorted(os.listdir(backup_dir)) == sorted(
+            [
+                "bot-20000102-000000.db.gz",
+                os.path.basename(report["files"][0]),
+                "other-20000101-000000.db.gz",
+            ]
+        )
+
+    @pytest.mark.asyncio
+    async def test_one_instance_backs_up_per_interval(self, tmp_path, live_db):
+        """Test that instances sharing the database take one backup between them."""
+        first, second = make_service(tmp_path), make_service(tmp_path)
+
+        assert len((await first.run_scheduled())["files"]) == 1
+        assert await second.run_scheduled() is None
+        assert len(os.listdir(tmp_path / "backups")) == 1
+
+    def test_disabled_interval_schedules_nothing(self, tmp_path):
+        """Test that an interval of 0 does not add a job."""
+
+        class Scheduler:
+            def add_job(self, *args, **kwargs):
+                raise AssertionError("job scheduled")
+
+            def get_job(self, job_id):
+                return None
+
+        service = make_service(tmp_path, interval_hours=0)
+        service.start(Scheduler())
+        assert service.get_status()["next_run"] is None
+
+    def test_copy_falls_back_after_restarts(self, tmp_path, monkeypatch):
+        """Test that a copy restarted by writes finishes in one step."""
+        source_path = str(tmp_path / "source.db")
+        conn = sqlite3.connect(source_path)
+        conn.execute("CREATE TABLE t (value TEXT)")
+        conn.executemany("INSERT INTO t VALUES (?)", [("x" * 500,)] * 500)
+        conn.commit()
+
+        def write_between_steps(seconds):
+            conn.execute("INSERT INTO t VALUES ('y')")
+            conn.commit()
+
+        monkeypatch.setattr("services.backup.time.sleep", write_between_steps)
+        progress = copy_database(
+            source_path, str(tmp_path / "copy.db"), pages_per_step=4
+        )
+        monkeypatch.undo()
+        conn.close()
+
+        assert progress["restarts"] > 0
+        assert progress["single_step"]
+        copy = sqlite3.connect(str(tmp_path / "copy.db"))
+        assert copy.execute("SELECT COUNT(*) FROM t").fetchone()[0] >= 500
+        copy.close()
+
+
+class TestRestore:
+    """Test cases for verifying and restoring backups."""
+
+    @pytest.mark.asyncio
+    async def test_restore_round_trip(self, tmp_path, live_db):
+        """Test that a compressed backup restores over a changed database."""
+        report = await make_service(tmp_path).run_backup()
+        await live_db.execute("DELETE FROM tasks")
+        await live_db.disconnect()
+
+        restored = restore_backup(report["files"][0], live_db.db_path)
+
+        assert restored["ok"]
+        assert restored["tasks"] == 2000
+
+    def test_corrupt_backup_is_rejected(self, tmp_path):
+        """Test that restore refuses a file that is not a valid database."""
+        corrupt = tmp_path / "bot-20000101-000000.db"
+        corrupt.write_bytes(b"SQLite format 3\x00" + b"\xff" * 4096)
+        target = tmp_path / "target.db"
+        target.write_bytes(b"untouched")
+
+        assert not verify_backup(str(corrupt))["ok"]
+        with pytest.raises(ValueError):
+            restore_backup(str(corrupt), str(target))
+        assert target.read_bytes() == b"untouched"
@@ -0,0 +1,363 @@
+"""
+Unit tests for the Database manager in StudyBuddy Telegram Bot.
+
+Tests cover single-connection mode and the read/write connection pool.
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from database.db import Database
+
+
+@pytest_asyncio.fixture
+async def pooled_db(tmp_path):
+    """Provide an initialized database running in pool mode."""
+    database = Database(str(tmp_path / "pool.db"), read_pool_size=2)
+    await database.initialize()
+    yield database
+    await database.disconnect()
+
+
+class TestConnectionPool:
+    """Test cases for the reader/writer connection pool."""
+
+    @pytest.mark.asyncio
+    async def test_single_connection_mode(self, tmp_path):
+        """Test that pooling is disabled by default."""
+        database = Database(str(tmp_path / "single.db"))
+        await database.initialize()
+        await database.execute(
+            "INSERT INTO users (user_id, first_name) VALUES (?, ?)", (1, "Ann")
+        )
+        row = await database.fetch_one("SELECT first_name FROM users")
+        assert row["first_name"] == "Ann"
+        assert database.pool_stats()["pool_enabled"] is False
+        await database.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_reads_see_committed_writes(self, pooled_db):
+        """Test that pooled readers observe writes from the writer."""
+        await pooled_db.execute(
+            "INSERT INTO users (user_id, first_name) VALUES (?, ?)", (1, "Ann")
+        )
+        rows = await pooled_db.fetch_all("SELECT user_id FROM users")
+        assert [row["user_id"] for row in rows] == [1]
+
+    @pytest.mark.asyncio
+    async def test_readers_are_read_only(self, pooled_db):
+        """Test that pooled connections reject writes."""
+        async with pooled_db._reader() as reader:
+            with pytest.raises(Exception):
+                await reader.execute("INSERT INTO users (user_id) VALUES (1)")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_use_pool(self, pooled_db):
+        """Test that concurrent reads are spread across the pool."""
+        await asyncio.gather(
+            *(pooled_db.fetch_all("SELECT * FROM users") for _ in range(10))
+        )
+        stats = pooled_db.pool_stats()
+        assert stats["read_acquires"] == 10
+        assert stats["readers_idle"] == 2
+
+    @pytest.mark.asyncio
+    async def test_acquire_timeout(self, tmp_path):
+        """Test that waiting on an exhausted pool times out."""
+        database = Database(
+            str(tmp_path / "timeout.db"), read_pool_size=1, acquire_timeout=0.05
+        )
+        await database.initialize()
+        async with database._reader():
+            with pytest.raises(TimeoutError):
+                await database.fetch_one("SELECT 1")
+        assert database.pool_stats()["read_timeouts"] == 1
+        await database.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_connect_opens_once(self, tmp_path):
+        """Test that racing first callers share one writer and read pool."""
+        database = Database(
+            str(tmp_path / "race.db"), read_pool_size=2, group_commit=True
+        )
+        connections = await asyncio.gather(
+            *(database.get_connection() for _ in range(3)),
+            database.initialize(),
+            database.fetch_one("SELECT 1"),
+        )
+        assert len({id(conn) for conn in connections[:3]}) == 1
+        assert len(database._readers) == 2
+        await database.execute("INSERT INTO users (user_id) VALUES (1)")
+        await database.disconnect()
+
+    def test_memory_database_disables_pool(self):
+        """Test that in-memory databases fall back to one connection."""
+        database = Database(":memory:", read_pool_size=4)
+        assert database.pool_enabled is False
+
+
+class TestPragmaProfiles:
+    """Test cases for PRAGMA profile selection."""
+
+    @pytest.mark.asyncio
+    async def test_throughput_profile_enables_wal(self, tmp_path):
+        """Test that the throughput profile switches to WAL and NORMAL sync."""
+        database = Database(str(tmp_path / "wal.db"), pragma_profile="throughput")
+        conn = await database.connect()
+        row = await (await conn.execute("PRAGMA journal_mode")).fetchone()
+        assert row[0] == "wal"
+        row = await (await conn.execute("PRAGMA synchronous")).fetchone()
+        assert row[0] == 1  # NORMAL
+        await database.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_legacy_profile_keeps_rollback_journal(self, tmp_path):
+        """Test that the legacy profile leaves the journal mode alone."""
+        database = Database(str(tmp_path / "legacy.db"), pragma_profile="legacy")
+        conn = await database.connect()
+        row = await (await conn.execute("PRAGMA journal_mode")).fetchone()
+        assert row[0] == "delete"
+        await database.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_profile_applies_to_readers(self, tmp_path):
+        """Test that pooled readers also receive the profile settings."""
+        database = Database(
+            str(tmp_path / "readers.db"), read_pool_size=1, pragma_profile="durable"
+        )
+        await database.initialize()
+        row = await database.fetch_one("PRAGMA synchronous")
+        assert row[0] == 2  # FULL
+        await database.disconnect()
+
+    def test_unknown_profile(self):
+        """Test that an unknown profile name is rejected."""
+        with pytest.raises(ValueError):
+            Database(":memory:", pragma_profile="turbo")
+
+
+class TestGroupCommit:
+    """Test cases for group-commit write batching."""
+
+    @pytest_asyncio.fixture
+    async def group_db(self, tmp_path):
+        """Provide an initialized database with group commit enabled."""
+        database = Database(
+            str(tmp_path / "group.db"),
+            group_commit=True,
+            group_commit_window=0.01,
+            group_commit_max_batch=8,
+        )
+        await database.initialize()
+        yield database
+        await database.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_share_commits(self, group_db):
+        """Test that concurrent writes are batched and each gets its cursor."""
+        cursors = await asyncio.gather(
+            *(
+                group_db.execute(
+                    "INSERT INTO users (user_id, first_name) VALUES (?, ?)",
+                    (user_id, f"User {user_id}"),
+                )
+                for user_id in range(1, 21)
+            )
+        )
+        assert [cursor.lastrowid for cursor in cursors] == list(range(1, 21))
+
+        row = await group_db.fetch_one("SELECT COUNT(*) AS count FROM users")
+        assert row["count"] == 20
+
+        stats = group_db.group_commit_stats()
+        assert stats["writes"] == 20
+        assert stats["batches"] < 20
+        assert stats["batch_size_max"] <= 8
+
+    @pytest.mark.asyncio
+    async def test_failed_write_does_not_abort_batch(self, group_db):
+        """Test that one failing statement only fails its own caller."""
+        await group_db.execute("INSERT INTO users (user_id) VALUES (1)")
+        results = await asyncio.gather(
+            group_db.execute("INSERT INTO users (user_id) VALUES (1)"),
+            group_db.execute("INSERT INTO users (user_id) VALUES (2)"),
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], Exception)
+        assert results[1].rowcount == 1
+
+        rows = await group_db.fetch_all("SELECT user_id FROM users ORDER BY user_id")
+        assert [row["user_id"] for row in rows] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_disconnect_drains_queue(self, tmp_path):
+        """Test that queued writes land before the connection closes."""
+        path = str(tmp_path / "drain.db")
+        database = Database(path, group_commit=True, group_commit_window=0.05)
+        await database.initialize()
+        pending = asyncio.ensure_future(
+            database.execute("INSERT INTO users (user_id) VALUES (7)")
+        )
+        await asyncio.sleep(0.01)  # queued, but still inside the batch window
+        await database.disconnect()
+        assert (await pending).rowcount == 1
+
+        reopened = Database(path)
+        row = await reopened.fetch_one("SELECT user_id FROM users")
+        assert row["user_id"] == 7
+        await reopened.disconnect()
+
+
+class TestQueryStats:
+    """Test cases for statement instrumentation and the slow-query log."""
+
+    @pytest_asyncio.fixture
+    async def stats_db(self, tmp_path):
+        """Provide an initialized database with the slow-query log off."""
+        database = Database(str(tmp_path / "stats.db"), slow_query_threshold=0)
+        await database.initialize()
+        yield database
+        await database.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_statements_grouped_by_template(self, stats_db):
+        """Test that calls differing only in parameters share one entry."""
+        for user_id in (1, 2, 3):
+            await stats_db.execute(
+                "INSERT INTO users (user_id, first_name) VALUES (?, 'U')", (user_id,)
+            )
+        await stats_db.fetch_all(
+            "SELECT user_id FROM users WHERE user_id IN (?, ?)", (1, 2)
+        )
+        await stats_db.fetch_all("SELECT user_id FROM users WHERE user_id IN (?)", (3,))
+
+        top = {entry["query"]: entry for entry in stats_db.stats()["top"]}
+        insert = top["INSERT INTO users (user_id, first_name) VALUES (?, 'U')"]
+        assert insert["count"] == 3
+        assert insert["rows"] == 3
+        assert insert["commit_time"] > 0
+        assert sum(insert["histogram"].values()) == 3
+
+        select = top["SELECT user_id FROM users WHERE user_id IN (...)"]
+        assert select["count"] == 2
+        assert select["rows"] == 3
+
+    @pytest.mark.asyncio
+    async def test_top_n_and_errors(self, stats_db):
+        """Test that failures are counted and top-N is limited."""
+        with pytest.raises(Exception):
+            await stats_db.execute("INSERT INTO missing_table VALUES (1)")
+
+        snapshot = stats_db.stats(top_n=1)
+        assert len(snapshot["top"]) == 1
+        failed = [
+            entry
+            for entry in stats_db.stats(top_n=100)["top"]
+            if entry["query"] == "INSERT INTO missing_table VALUES (1)"
+        ]
+        assert failed[0]["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_query_logged_with_plan(self, stats_db, caplog):
+        """Test that statements over the threshold are logged with their plan."""
+        stats_db.slow_query_threshold = 1e-9
+        with caplog.at_level("WARNING", logger="database.db"):
+            await stats_db.fetch_all("SELECT * FROM tasks WHERE user_id = ?", (1,))
+
+        assert stats_db.stats()["slow_queries"] == 1
+        assert "idx_tasks_user_due" in caplog.text
+
+
+class TestTransaction:
+    """Test cases for the unit-of-work transaction context manager."""
+
+    @pytest.mark.asyncio
+    async def test_statements_share_one_commit(self, pooled_db):
+        """Test that writes commit together and reads see uncommitted rows."""
+        async with pooled_db.transaction():
+            for user_id in (1, 2):
+                await pooled_db.execute(
+                    "INSERT INTO users (user_id) VALUES (?)", (user_id,)
+                )
+            await pooled_db.execute_batch(
+                [("UPDATE users SET first_name = 'U' WHERE user_id = ?", (1,))]
+            )
+            row = await pooled_db.fetch_one("SELECT COUNT(*) FROM users")
+            assert row[0] == 2
+
+        row = await pooled_db.fetch_one("SELECT COUNT(*) FROM users")
+        assert row[0] == 2
+        stats = pooled_db.transaction_stats()
+        assert stats["commits"] == 1
+        assert stats["lock_wait_total"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_error_rolls_back(self, pooled_db):
+        """Test that an exception undoes every write in the block."""
+        with pytest.raises(ValueError):
+            async with pooled_db.transaction():
+                await pooled_db.execute("INSERT INTO users (user_id) VALUES (1)")
+                raise ValueError("boom")
+
+        assert await pooled_db.fetch_one("SELECT user_id FROM users") is None
+        assert pooled_db.transaction_stats()["rollbacks"] == 1
+        assert not pooled_db.in_transaction
+
+    @pytest.mark.asyncio
+    async def test_nested_block_is_a_savepoint(self, pooled_db):
+        """Test that a failed inner block only rolls back its own writes."""
+        ended = []
+        async with pooled_db.transaction():
+            await pooled_db.execute("INSERT INTO users (user_id) VALUES (1)")
+            pooled_db.after_transaction(ended.append, "done")
+            with pytest.raises(ValueError):
+                async with pooled_db.transaction():
+                    await pooled_db.execute("INSERT INTO users (user_id) VALUES (2)")
+                    raise ValueError("boom")
+            assert ended == []
+
+        rows = await pooled_db.fetch_all("SELECT user_id FROM users")
+        assert [row["user_id"] for row in rows] == [1]
+        assert ended == ["done"]
+        assert pooled_db.transaction_stats()["savepoints"] == 1
+
+    @pytest.mark.asyncio
+    async def test_writer_only_operations_are_rejected(self, pooled_db):
+        """Test that operations needing their own commit fail fast inside."""
+        async with pooled_db.transaction():
+            with pytest.raises(RuntimeError):
+                await pooled_db.incremental_vacuum()
+
+    @pytest.mark.asyncio
+    async def test_child_tasks_do_not_join(self, pooled_db):
+        """Test that tasks started inside a block write after it commits."""
+        child = None
+        async with pooled_db.transaction():
+            await pooled_db.execute("INSERT INTO users (user_id) VALUES (1)")
+            child = asyncio.create_task(
+                pooled_db.execute("INSERT INTO users (user_id) VALUES (2)")
+            )
+            await asyncio.sleep(0.01)
+            assert not child.done()  # Waiting for the writer, not joined
+            row = await pooled_db.fetch_one("SELECT COUNT(*) FROM users")
+            assert row[0] == 1
+
+        await child
+        row = await pooled_db.fetch_one("SELECT COUNT(*) FROM users")
+        assert row[0] == 2
+        assert pooled_db.transaction_stats()["commits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_group_commit_writes_join_transaction(self, tmp_path):
+        """Test that queued group commit is bypassed inside a transaction."""
+        database = Database(str(tmp_path / "group.db"), group_commit=True)
+        await database.initialize()
+        with pytest.raises(ValueError):
+            async with database.transaction():
+                await database.execute("INSERT INTO users (user_id) VALUES (1)")
+                raise ValueError("boom")
+
+        assert await database.fetch_one("SELECT user_id FROM users") is None
+        await database.disconnect()
@@ -0,0 +1,170 @@
+"""
+Unit tests for schema migrations in StudyBuddy Telegram Bot.
+
+Tests cover version tracking, the up-to-date fast path, batched online
+updates and index switching.
+"""
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+
+from database.migrations import (
+    MIGRATIONS,
+    Migration,
+    convert_to_incremental_vacuum,
+    get_schema_version,
+    latest_version,
+    migrate,
+    switch_indexes,
+    update_in_batches,
+)
+
+
+@pytest_asyncio.fixture
+async def conn(tmp_path):
+    """Provide a raw connection to an empty database file."""
+    connection = await aiosqlite.connect(str(tmp_path / "migrations.db"))
+    yield connection
+    await connection.close()
+
+
+async def index_names(conn, table):
+    """Return the names of explicit indexes on a table."""
+    cursor = await conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? "
+        "AND name NOT LIKE 'sqlite_autoindex%'",
+        (table,),
+    )
+    return {row[0] for row in await cursor.fetchall()}
+
+
+class TestMigrate:
+    """Test cases for the migration runner."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_database_reaches_latest_version(self, conn):
+        """Test that all migrations apply to an empty database."""
+        applied = await migrate(conn)
+        assert applied == len(MIGRATIONS)
+        assert await get_schema_version(conn) == latest_version()
+
+    @pytest.mark.asyncio
+    async def test_current_schema_skips_ddl(self, conn):
+        """Test that a second run applies nothing."""
+        await migrate(conn)
+        assert await migrate(conn) == 0
+
+    @pytest.mark.asyncio
+    async def test_only_newer_migrations_apply(self, conn):
+        """Test that migrations above the current version are applied in order."""
+        migrations = [
+            Migration(1, "create", ["CREATE TABLE t (a INTEGER)"]),
+            Migration(2, "add column", ["ALTER TABLE t ADD COLUMN b TEXT"]),
+        ]
+        assert await migrate(conn, migrations[:1]) == 1
+        assert await migrate(conn, migrations) == 1
+        assert await get_schema_version(conn) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_migration_rolls_back(self, conn):
+        """Test that a failing migration leaves no partial changes."""
+        migrations = [
+            Migration(1, "broken", ["CREATE TABLE t (a INTEGER)", "NOT SQL"]),
+        ]
+        with pytest.raises(Exception):
+            await migrate(conn, migrations)
+        assert await get_schema_version(conn) == 0
+        cursor = await conn.execute("SELECT name FROM sqlite_master WHERE name = 't'")
+        assert await cursor.fetchone() is None
+
+    @pytest.mark.asyncio
+    async def test_newer_database_is_rejected(self, conn):
+        """Test that running old code on a newer schema fails loudly."""
+        await migrate(conn, [Migration(5, "future", ["CREATE TABLE t (a)"])])
+        with pytest.raises(RuntimeError):
+            await migrate(conn, [Migration(1, "old", ["CREATE TABLE u (a)"])])
+
+    @pytest.mark.asyncio
+    async def test_unordered_versions_are_rejected(self, conn):
+        """Test that migration versions must be strictly increasing."""
+        migrations = [
+            Migration(2, "second", ["CREATE TABLE t (a)"]),
+            Migration(1, "first", ["CREATE TABLE u (a)"]),
+        ]
+        with pytest.raises(ValueError):
+            await migrate(conn, migrations)
+
+    @pytest.mark.asyncio
+    async def test_due_dates_become_epoch_days(self, conn):
+        """Test that ISO text due dates are rewritten as integer day numbers."""
+        await migrate(conn, MIGRATIONS[:4])
+        await conn.execute("INSERT INTO users (user_id) VALUES (1)")
+        await conn.execute(
+            "INSERT INTO tasks (user_id, task_type, title, due_date) "
+            "VALUES (1, 'exam', 'T', '1970-01-11')"
+        )
+        await conn.commit()
+
+        await migrate(conn)
+        cursor = await conn.execute("SELECT due_date, typeof(due_date) FROM tasks")
+        assert tuple(await cursor.fetchone()) == (10, "integer")
+
+    @pytest.mark.asyncio
+    async def test_existing_data_skips_startup_vacuum(self, conn):
+        """Test that only empty databases are vacuumed during migration."""
+        await migrate(conn, MIGRATIONS[:3])
+        await conn.execute("INSERT INTO users (user_id) VALUES (1)")
+        await conn.commit()
+
+        await migrate(conn)
+        cursor = await conn.execute("PRAGMA auto_vacuum")
+        assert (await cursor.fetchone())[0] == 0
+
+        # The offline tool converts it
+        assert await convert_to_incremental_vacuum(conn)
+        cursor = await conn.execute("PRAGMA auto_vacuum")
+        assert (await cursor.fetchone())[0] == 2
+        assert not await convert_to_incremental_vacuum(conn)
+
+    @pytest.mark.asyncio
+    async def test_fresh_database_uses_incremental_vacuum(self, conn):
+        """Test that a new database gets incremental auto-vacuum at once."""
+        await migrate(conn)
+        cursor = await conn.execute("PRAGMA auto_vacuum")
+        assert (await cursor.fetchone())[0] == 2
+
+    def test_migration_requires_one_body(self):
+        """Test that a migration needs exactly one of statements or apply."""
+        with pytest.raises(ValueError):
+            Migration(1, "empty")
+
+
+class TestOnlineHelpers:
+    """Test cases for batched updates and index switching."""
+
+    @pytest.mark.asyncio
+    async def test_update_in_batches(self, conn):
+        """Test that every matching row is rewritten across several batches."""
+        await conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v INTEGER)")
+        await conn.executemany(
+            "INSERT INTO t (id, v) VALUES (?, ?)", [(i, 0) for i in range(1, 26)]
+        )
+        await conn.commit()
+
+        updated = await update_in_batches(conn, "t", "v = 1", "v = 0", batch_size=10)
+        assert updated == 25
+        cursor = await conn.execute("SELECT COUNT(*) FROM t WHERE v = 1")
+        assert (await cursor.fetchone())[0] == 25
+
+    @pytest.mark.asyncio
+    async def test_switch_indexes(self, conn):
+        """Test that new indexes replace old ones."""
+        await conn.execute("CREATE TABLE t (a INTEGER, b INTEGER)")
+        await conn.execute("CREATE INDEX idx_t_a ON t(a)")
+        await conn.commit()
+
+        await switch_indexes(
+            conn, ["CREATE INDEX IF NOT EXISTS idx_t_a_b ON t(a, b)"], ["idx_t_a"]
+        )
+        assert await index_names(conn, "t") == {"idx_t_a_b"}
@@ -0,0 +1,456 @@
+"""
+Unit tests for database models in StudyBuddy Telegram Bot.
+
+Tests run the User and Task models against a temporary SQLite database.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+import database.models as models
+from database.activity import ActivityBuffer
+from database.cache import TaskCache
+from database.db import Database
+from database.records import TaskRecord, from_epoch_day, to_epoch_day
+from database.models import Outbox, Task, User
+from services.archive import ArchiveService
+
+
+@pytest_asyncio.fixture
+async def temp_db(tmp_path, monkeypatch):
+    """Point the models at a fresh temporary database."""
+    database = Database(str(tmp_path / "models.db"))
+    await database.initialize()
+
+    monkeypatch.setattr("database.models.db", database)
+    monkeypatch.setattr("database.activity.db", database)
+    monkeypatch.setattr(
+        "database.models.activity_buffer",
+        ActivityBuffer(flush_interval=60, max_users=3),
+    )
+    monkeypatch.setattr(
+        "database.models.task_cache", TaskCache(max_tasks=10, max_tasks_per_user=4)
+    )
+
+    yield database
+    await database.disconnect()
+
+
+class TestUserActivity:
+    """Test cases for write-behind last_active updates."""
+
+    @pytest.mark.asyncio
+    async def test_first_sighting_inserts_user(self, temp_db):
+        """Test that a new user is inserted synchronously."""
+        await User.create_or_update(1, "ann", "Ann")
+        user = await User.get(1)
+        assert user["first_name"] == "Ann"
+
+    @pytest.mark.asyncio
+    async def test_repeat_activity_is_buffered(self, temp_db):
+        """Test that repeat activity is deferred until flush."""
+        await User.create_or_update(1, "ann", "Ann")
+        await temp_db.execute(
+            "UPDATE users SET last_active = '2000-01-01 00:00:00' WHERE user_id = 1"
+        )
+
+        await User.create_or_update(1)
+        user = await User.get(1)
+        assert user["last_active"] == "2000-01-01 00:00:00"
+        assert models.activity_buffer.pending_count == 1
+
+        assert await models.activity_buffer.flush() == 1
+        user = await User.get(1)
+        assert user["last_active"] > "2000-01-01 00:00:00"
+
+    @pytest.mark.asyncio
+    async def test_buffer_flushes_when_full(self, temp_db):
+        """Test that reaching max_users triggers a batched flush."""
+        for user_id in range(1, 4):
+            await User.create_or_update(user_id, first_name=f"User {user_id}")
+        for user_id in range(1, 4):
+            await User.create_or_update(user_id)
+
+        assert models.activity_buffer.pending_count == 0
+        assert models.activity_buffer.flushed_total == 3
+
+
+class TestTaskCreateMany:
+    """Test cases for bulk task creation."""
+
+    @pytest.mark.asyncio
+    async def test_create_many(self, temp_db):
+        """Test that all tasks are inserted together."""
+        await User.create_or_update(1, first_name="Ann")
+        await Task.get_user_tasks(1)  # warm the cache
+
+        due = date.today() + timedelta(days=3)
+        created = await Task.create_many(
+            1, [("exam", "Physics", due), ("assignment", "Essay", due)]
+        )
+        assert created == 2
+        tasks = await Task.get_user_tasks(1)
+        assert [task.title for task in tasks] == ["Physics", "Essay"]
+
+    @pytest.mark.asyncio
+    async def test_create_many_empty(self, temp_db):
+        """Test that an empty import is a no-op."""
+        assert await Task.create_many(1, []) == 0
+
+
+class TestTaskPagination:
+    """Test cases for keyset pagination of a user's tasks."""
+
+    @pytest_asyncio.fixture
+    async def tasks(self, temp_db):
+        """Create five upcoming tasks, two sharing a due date."""
+        await User.create_or_update(1, first_name="Ann")
+        today = date.today()
+        days = [1, 2, 2, 3, 4]
+        return [
+            await Task.create(1, "assignment", f"Task {i}", today + timedelta(days=d))
+            for i, d in enumerate(days)
+        ]
+
+    @staticmethod
+    def cursor(task):
+        """Build a keyset cursor from a task dictionary."""
+        return task["due_date"], task["id"]
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_all_tasks_in_order(self, tasks):
+        """Test that walking forward visits every task exactly once."""
+        seen = []
+        page = await Task.get_user_tasks(1, limit=2)
+        while page:
+            seen.extend(task["id"] for task in page)
+            page = await Task.get_user_tasks(1, limit=2, after=self.cursor(page[-1]))
+        assert seen == tasks
+
+    @pytest.mark.asyncio
+    async def test_before_cursor_returns_previous_page(self, tasks):
+        """Test that a before cursor returns the preceding tasks ascending."""
+        first = await Task.get_user_tasks(1, limit=2)
+        second = await Task.get_user_tasks(1, limit=2, after=self.cursor(first[-1]))
+        back = await Task.get_user_tasks(1, limit=2, before=self.cursor(second[0]))
+        assert [task["id"] for task in back] == [task["id"] for task in first]
+
+    @pytest.mark.asyncio
+    async def test_no_limit_returns_everything(self, tasks):
+        """Test that omitting the limit keeps the unpaginated behaviour."""
+        assert len(await Task.get_user_tasks(1)) == len(tasks)
+
+    @pytest.mark.asyncio
+    async def test_upcoming_window_uses_utc_days(self, temp_db, monkeypatch):
+        """Test that both ends of the upcoming window come from the UTC date."""
+
+        class LateEvening(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return cls(2030, 1, 1, 23, 30, tzinfo=tz)
+
+        monkeypatch.setattr("database.records.datetime", LateEvening)
+        for day in (1, 8, 9):
+            await Task.create(1, "exam", f"Day {day}", date(2030, 1, day))
+
+        upcoming = await Task.get_upcoming_tasks(1, days=7)
+        assert [task.title for task in upcoming] == ["Day 1", "Day 8"]
+
+
+class TestTaskCache:
+    """Test cases for the per-user upcoming task cache."""
+
+    @pytest_asyncio.fixture
+    async def user(self, temp_db):
+        """Create a user with two upcoming tasks."""
+        await User.create_or_update(1, first_name="Ann")
+        due = date.today() + timedelta(days=2)
+        await Task.create(1, "exam", "Physics", due)
+        await Task.create(1, "assignment", "Essay", due)
+        return 1
+
+    @pytest.mark.asyncio
+    async def test_second_read_is_a_hit(self, user):
+        """Test that repeat list reads are served from the cache."""
+        first = await Task.get_user_tasks(user)
+        second = await Task.get_user_tasks(user)
+        assert first == second
+        stats = models.task_cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_pages_match_database(self, user):
+        """Test that pagination over a cached list matches the SQL path."""
+        await Task.get_user_tasks(user)
+        cached = await Task.get_user_tasks(user, limit=1)
+        cursor = (cached[0]["due_date"], cached[0]["id"])
+        assert await Task.get_user_tasks(user, limit=1, after=cursor) == (
+            await Task._query_user_tasks(user, False, 1, cursor, None)
+        )
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate(self, user):
+        """Test that every write hook drops the cached list."""
+        tasks = await Task.get_user_tasks(user)
+
+        await Task.update(tasks[0]["id"], title="Physics Final")
+        assert (await Task.get_user_tasks(user))[0]["title"] == "Physics Final"
+
+        await Task.mark_as_reminded(tasks[0]["id"])
+        assert (await Task.get_user_tasks(user))[0]["reminded"] == 1
+
+        await Task.delete_user_task(user, tasks[0]["id"])
+        assert len(await Task.get_user_tasks(user)) == 1
+
+        await Task.create(user, "exam", "Chemistry", date.today())
+        assert len(await Task.get_user_tasks(user)) == 2
+
+        assert models.task_cache.stats()["invalidations"] == 4
+
+    @pytest.mark.asyncio
+    async def test_oversized_lists_are_not_cached(self, user):
+        """Test that users above the per-user cap bypass the cache."""
+        due = date.today() + timedelta(days=5)
+        for i in range(3):
+            await Task.create(user, "exam", f"Extra {i}", due)
+
+        assert len(await Task.get_user_tasks(user)) == 5
+        assert models.task_cache.is_oversized(user)
+        assert models.task_cache.stats()["tasks"] == 0
+
+    def test_lru_eviction_respects_budget(self):
+        """Test that the least recently used lists are evicted first."""
+        cache = TaskCache(max_tasks=3)
+
+        def task(task_id):
+            return TaskRecord(task_id, 1, "exam", "Exam", date(2030, 1, 1), 0)
+
+        cache.put(1, [task(1), task(2)], 0)
+        cache.put(2, [task(3)], 0)
+        cache.get(1)
+        cache.put(3, [task(4)], 0)
+
+        assert cache.get(2) is None
+        assert cache.get(1) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_stale_generation_is_not_cached(self):
+        """Test that a list read before a write is discarded."""
+        cache = TaskCache()
+        generation = cache.generation(1)
+        cache.invalidate_user(1)
+        cache.put(1, [], generation)
+        assert cache.get(1) is None
+
+
+class TestSingleStatementWrites:
+    """Test cases for writes that check and modify in one statement."""
+
+    @pytest.mark.asyncio
+    async def test_upsert_touches_existing_user(self, temp_db):
+        """Test that a user unknown to this process is touched, not duplicated."""
+        await User.create_or_update(1, "ann", "Ann")
+        await temp_db.execute(
+            "UPDATE users SET last_active = '2000-01-01 00:00:00' WHERE user_id = 1"
+        )
+        models.activity_buffer.forget(1)
+
+        await User.create_or_update(1, "ann2", "Other")
+        user = await User.get(1)
+        assert user.first_name == "Ann"
+        assert user.last_active > "2000-01-01 00:00:00"
+
+    @pytest.mark.asyncio
+    async def test_delete_user_task_checks_owner(self, temp_db):
+        """Test that another user's task is left untouched."""
+        await User.create_or_update(1, first_name="Ann")
+        task_id = await Task.create(1, "exam", "Physics", date(2030, 1, 1))
+
+        assert not await Task.delete_user_task(2, task_id)
+        assert await Task.get_by_id(task_id) is not None
+        assert await Task.delete_user_task(1, task_id)
+        assert not await Task.delete(task_id)
+
+    @pytest.mark.asyncio
+    async def test_update_reports_missing_task(self, temp_db):
+        """Test that update returns False only when no task matched."""
+        await User.create_or_update(1, first_name="Ann")
+        task_id = await Task.create(1, "exam", "Physics", date(2030, 1, 1))
+
+        assert await Task.update(task_id, title="Chemistry")
+        assert (await Task.get_by_id(task_id)).title == "Chemistry"
+        assert await Task.update(task_id)
+        assert not await Task.update(task_id + 1, title="Nope")
+        assert not await Task.update(task_id + 1)
+
+
+class TestUnitOfWork:
+    """Test cases for model calls grouped in one transaction."""
+
+    @pytest.mark.asyncio
+    async def test_flow_commits_once(self, temp_db):
+        """Test that register, create and count share one transaction."""
+        due = date.today() + timedelta(days=3)
+        async with temp_db.transaction():
+            await User.create_or_update(1, first_name="Ann")
+            await Task.create(1, "exam", "Physics", due)
+            assert await Task.count_user_tasks(1) == 1
+
+        assert temp_db.transaction_stats()["commits"] == 1
+        assert [task.title for task in await Task.get_user_tasks(1)] == ["Physics"]
+
+    @pytest.mark.asyncio
+    async def test_rollback_leaves_no_cached_rows(self, temp_db):
+        """Test that rolled-back tasks never reach the task cache."""
+        await User.create_or_update(1, first_name="Ann")
+        assert await Task.get_user_tasks(1) == []
+
+        with pytest.raises(ValueError):
+            async with temp_db.transaction():
+                await Task.create(1, "exam", "Physics", date.today())
+                assert len(await Task.get_user_tasks(1)) == 1
+                raise ValueError("boom")
+
+        assert await Task.get_user_tasks(1) == []
+
+
+class TestMarkManyAsReminded:
+    """Test cases for batched reminder acknowledgements."""
+
+    @pytest.mark.asyncio
+    async def test_marks_in_chunks(self, temp_db, monkeypatch):
+        """Test that IDs are chunked and already-marked tasks are not returned."""
+        monkeypatch.setattr("database.models.MAX_IN_PARAMS", 2)
+        await User.create_or_update(1, first_name="Ann")
+        due = date.today() + timedelta(days=1)
+        task_ids = [await Task.create(1, "exam", f"T{i}", due) for i in range(5)]
+        await Task.mark_as_reminded(task_ids[0])
+
+        assert await Task.mark_many_as_reminded(task_ids) == set(task_ids[1:])
+        tasks = [await Task.get_by_id(task_id) for task_id in task_ids]
+        assert all(task.reminded for task in tasks)
+        assert await Task.mark_many_as_reminded(task_ids) == set()
+
+    @pytest.mark.asyncio
+    async def test_claims_in_chunks(self, temp_db, monkeypatch):
+        """Test that IDs are chunked and already-marked tasks are not claimed."""
+        monkeypatch.setattr("database.models.MAX_IN_PARAMS", 2)
+        await User.create_or_update(1, first_name="Ann")
+        due = date.today() + timedelta(days=1)
+        task_ids = [await Task.create(1, "exam", f"T{i}", due) for i in range(5)]
+        await Task.mark_as_reminded(task_ids[0])
+
+        assert len(await Outbox.enqueue([(1, task_ids[1:], "Digest")])) == 1
+        tasks = [await Task.get_by_id(task_id) for task_id in task_ids]
+        assert all(task.reminded for task in tasks)
+        assert await Outbox.enqueue([(1, task_ids[1:], "Digest")]) == []
+
+
+class TestArchive:
+    """Test cases for archiving past tasks."""
+
+    @pytest_asyncio.fixture
+    async def tasks(self, temp_db):
+        """Create two long-past tasks, one recent past task and one upcoming."""
+        await User.create_or_update(1, first_name="Ann")
+        today = date.today()
+        await temp_db.execute_many(
+            "INSERT INTO tasks (user_id, task_type, title, due_date) "
+            "VALUES (1, 'exam', ?, ?)",
+            [
+                ("Old 1", to_epoch_day(today - timedelta(days=90))),
+                ("Old 2", to_epoch_day(today - timedelta(days=60))),
+                ("Recent", to_epoch_day(today - timedelta(days=2))),
+                ("Upcoming", to_epoch_day(today + timedelta(days=2))),
+            ],
+        )
+
+    @pytest.mark.asyncio
+    async def test_archive_moves_old_tasks_in_batches(self, temp_db, tasks):
+        """Test that only tasks before the cutoff are moved."""
+        moved = await Task.archive_past_tasks(
+            date.today() - timedelta(days=30), batch_size=1
+        )
+        assert moved == 2
+
+        live = await temp_db.fetch_all("SELECT title FROM tasks ORDER BY id")
+        assert [row["title"] for row in live] == ["Recent", "Upcoming"]
+        archived = await temp_db.fetch_one("SELECT COUNT(*) FROM tasks_archive")
+        assert archived[0] == 2
+
+    @pytest.mark.asyncio
+    async def test_include_past_reads_archive(self, temp_db, tasks):
+        """Test that include_past merges archived tasks in due-date order."""
+        await Task.archive_past_tasks(date.today() - timedelta(days=30))
+
+        titles = [t.title for t in await Task.get_user_tasks(1, include_past=True)]
+        assert titles == ["Old 1", "Old 2", "Recent", "Upcoming"]
+
+        upcoming = [t.title for t in await Task.get_user_tasks(1)]
+        assert upcoming == ["Upcoming"]
+
+    @pytest.mark.asyncio
+    async def test_incremental_vacuum_reclaims_space(self, temp_db):
+        """Test that space freed by deletes is returned to the filesystem."""
+        await temp_db.execute_many(
+            "INSERT INTO tasks (user_id, task_type, title, due_date) "
+            "VALUES (1, 'exam', ?, 10957)",
+            [("x" * 200,) for _ in range(2000)],
+        )
+        await temp_db.execute("DELETE FROM tasks")
+        assert await temp_db.incremental_vacuum() > 0
+
+    @pytest.mark.asyncio
+    async def test_one_instance_archives_per_interval(
+        self, temp_db, tasks, monkeypatch
+    ):
+        """Test that instances sharing the database archive only once."""
+        monkeypatch.setattr("services.archive.db", temp_db)
+        first, second = ArchiveService(), ArchiveService()
+
+        assert (await first.run_scheduled())["rows_moved"] == 2
+        assert await second.run_scheduled() is None
+        assert await first.run_scheduled() is not None  # The holder renews
+
+
+class TestRecords:
+    """Test cases for slotted task and user records."""
+
+    @pytest.mark.asyncio
+    async def test_task_record_from_database(self, temp_db):
+        """Test that reads return records with a parsed due date."""
+        await User.create_or_update(1, first_name="Ann")
+        due = date.today() + timedelta(days=1)
+        task_id = await Task.create(1, "exam", "Physics", due)
+
+        task = await Task.get_by_id(task_id)
+        assert isinstance(task, TaskRecord)
+        assert task.due_date == due
+        assert task["title"] == "Physics"
+        assert task.get("created_at") is None
+
+    def test_record_mapping_access(self):
+        """Test dictionary-style access on records."""
+        task = TaskRecord(1, 2, "assignment", "Essay", date(2030, 1, 1), 0)
+        assert task["user_id"] == 2
+        assert task.to_dict()["due_date"] == date(2030, 1, 1)
+        with pytest.raises(KeyError):
+            task["missing"]
+        assert not hasattr(task, "__dict__")
+
+    def test_records_compare_by_value(self):
+        """Test that equal records compare equal but cannot be hashed."""
+        first = TaskRecord(1, 2, "assignment", "Essay", date(2030, 1, 1), 0)
+        second = TaskRecord(1, 2, "assignment", "Essay", date(2030, 1, 1), 0)
+        assert first == second
+        with pytest.raises(TypeError):
+            hash(first)
+
+    def test_epoch_day_round_trip(self):
+        """Test conversion between dates and stored day numbers."""
+        assert to_epoch_day(date(1970, 1, 1)) == 0
+        assert to_epoch_day(date(2030, 1, 1)) == 21915
+        assert from_epoch_day(21915) == date(2030, 1, 1)
@@ -0,0 +1,240 @@
+"""
+Query-plan regression tests for StudyBuddy database models.
+
+Every public model method is run against a recording database, and each
+distinct statement it issues is checked with EXPLAIN QUERY PLAN. A query
+fails if it scans a table or a whole index (covering or not) without being
+listed in ALLOWED_FULL_SCANS, or sorts through a temporary B-tree.
+"""
+
+import inspect
+import time
+from datetime import date, timedelta
+
+import pytest
+import pytest_asyncio
+
+from database.activity import ActivityBuffer
+from database.cache import TaskCache
+from database.db import Database
+from database.models import Lease, Outbox, Task, User
+from database.reminder_queue import ReminderQueue
+
+# Queries that are full scans by design, mapped to the reason
+ALLOWED_FULL_SCANS = {
+    (
+        "SELECT user_id, username, first_name, last_active, is_active, timezone, "
+        "reminder_hour FROM users ORDER BY user_id"
+    ): "User.get_all is an intentional whole-table read",
+    "SELECT status, COUNT(*) AS count FROM outbox GROUP BY status": (
+        "Outbox.count_by_status counts every row, via the status index"
+    ),
+}
+
+
+class RecordingDatabase(Database):
+    """Database that remembers every statement it runs."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.recorded = {}
+
+    def _record(self, query, parameters):
+        self.recorded.setdefault(" ".join(query.split()), tuple(parameters))
+
+    async def execute(self, query, parameters=()):
+        self._record(query, parameters)
+        return await super().execute(query, parameters)
+
+    async def execute_many(self, query, parameters_list):
+        if parameters_list:
+            self._record(query, parameters_list[0])
+        return await super().execute_many(query, parameters_list)
+
+    async def execute_returning(self, query, parameters=(), row_factory=None):
+        self._record(query, parameters)
+        return await super().execute_returning(query, parameters, row_factory)
+
+    async def fetch_one(self, query, parameters=(), row_factory=None):
+        self._record(query, parameters)
+        return await super().fetch_one(query, parameters, row_factory)
+
+    async def fetch_all(self, query, parameters=(), row_factory=None):
+        self._record(query, parameters)
+        return await super().fetch_all(query, parameters, row_factory)
+
+
+async def exercise_models():
+    """
+    Call every public model method at least once.
+
+    Returns:
+        Set of ``Class.method`` names that were called.
+    """
+    called = set()
+    today = date.today()
+
+    await User.create_or_update(1, "ann", "Ann")
+    await User.create_or_update(1)
+    called.add("User.create_or_update")
+    await User.get(1)
+    called.add("User.get")
+    await User.get_all()
+    called.add("User.get_all")
+    await User.deactivate(1)
+    called.add("User.deactivate")
+    await User.reactivate(1)
+    called.add("User.reactivate")
+    await User.set_reminder_settings(1, tz_name="Asia/Tashkent", reminder_hour=18)
+    await User.set_reminder_settings(1)
+    called.add("User.set_reminder_settings")
+
+    task_id = await Task.create(1, "exam", "Physics", today + timedelta(days=1))
+    other_id = await Task.create(1, "assignment", "Essay", today + timedelta(days=3))
+    called.add("Task.create")
+    await Task.create_many(1, [("exam", "Chemistry", today + timedelta(days=4))])
+    called.add("Task.create_many")
+    await Task.get_reminder_schedule(today, today + timedelta(days=30))
+    called.add("Task.get_reminder_schedule")
+    await Task.get_by_id(task_id)
+    called.add("Task.get_by_id")
+    await Task.get_user_tasks(1)
+    await Task.get_user_tasks(1, include_past=True)
+    page = await Task.get_user_tasks(1, limit=1)
+    cursor = (page[-1].due_date, page[-1].id)
+    await Task.get_user_tasks(1, limit=1, after=cursor)
+    await Task.get_user_tasks(1, limit=1, before=cursor)
+    await Task.get_user_tasks(1, include_past=True, limit=1, after=cursor)
+    called.add("Task.get_user_tasks")
+    await Task.get_upcoming_tasks(1)
+    called.add("Task.get_upcoming_tasks")
+    await Task.count_user_tasks(1)
+    called.add("Task.count_user_tasks")
+    await Task.get_tasks_needing_reminder()
+    called.add("Task.get_tasks_needing_reminder")
+    await Task.update(task_id, title="Physics Final")
+    await Task.update(task_id, task_type="exam", due_date=today + timedelta(days=2))
+    called.add("Task.update")
+    await Task.mark_as_reminded(task_id)
+    called.add("Task.mark_as_reminded")
+    await Task.mark_many_as_reminded([task_id, other_id])
+    called.add("Task.mark_many_as_reminded")
+    # The first message loses task_id (already reminded) and releases fresh_id
+    fresh_id = await Task.create(1, "exam", "Biology", today + timedelta(days=2))
+    await Outbox.enqueue([(1, [fresh_id, task_id], "Reminder"), (1, [], "Note")])
+    called.add("Outbox.enqueue")
+    due = await Outbox.claim_due("a", time.time(), 10, 60)
+    called.add("Outbox.claim_due")
+    await Outbox.next_attempt_time()
+    called.add("Outbox.next_attempt_time")
+    await Outbox.record_failure(due[0].id, "a", 1, time.time(), "timeout")
+    called.add("Outbox.record_failure")
+    await Outbox.count_by_status()
+    called.add("Outbox.count_by_status")
+    await Outbox.delete_sent([due[0].id])
+    called.add("Outbox.delete_sent")
+    holder = Lease.new_holder_id()
+    called.add("Lease.new_holder_id")
+    await Lease.acquire("reminders", holder, 30)
+    called.add("Lease.acquire")
+    await Lease.get_holder("reminders")
+    called.add("Lease.get_holder")
+    await Lease.release("reminders", holder)
+    called.add("Lease.release")
+    await Task.delete_user_task(1, other_id)
+    called.add("Task.delete_user_task")
+    await Task.delete(task_id)
+    called.add("Task.delete")
+    await Task.archive_past_tasks(today + timedelta(days=30), batch_size=1)
+    called.add("Task.archive_past_tasks")
+
+    return called
+
+
+def public_model_methods():
+    """Return ``Class.method`` names of all public model methods."""
+    return {
+        f"{model.__name__}.{name}"
+        for model in (User, Task, Outbox, Lease)
+        for name, _ in inspect.getmembers(model, inspect.isfunction)
+        if not name.startswith("_")
+    }
+
+
+@pytest_asyncio.fixture
+async def recorded(tmp_path, monkeypatch):
+    """Run all model methods and return (database, called methods)."""
+    database = RecordingDatabase(str(tmp_path / "plans.db"))
+    await database.initialize()
+    buffer = ActivityBuffer(flush_interval=60, max_users=1)
+
+    monkeypatch.setattr("database.models.db", database)
+    monkeypatch.setattr("database.activity.db", database)
+    monkeypatch.setattr("database.models.activity_buffer", buffer)
+    # Disable the task cache so every call reaches the database
+    monkeypatch.setattr("database.models.task_cache", TaskCache(ttl_seconds=0))
+    # Load a reminder horizon so writes take the queue-maintenance paths
+    reminder_queue = ReminderQueue(horizon_days=30)
+    reminder_queue.load([], *reminder_queue.horizon(date.today()))
+    monkeypatch.setattr("database.models.reminder_queue", reminder_queue)
+
+    # Start recording only after migrations have run
+    database.recorded.clear()
+    called = await exercise_models()
+    yield database, called
+    await database.disconnect()
+
+
+async def query_plan(database, query, parameters):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement."""
+    rows = await database.fetch_all(f"EXPLAIN QUERY PLAN {query}", parameters)
+    return [row["detail"] for row in rows]
+
+
+class TestQueryPlans:
+    """Query-plan checks for every statement in database.models."""
+
+    @pytest.mark.asyncio
+    async def test_every_model_method_is_exercised(self, recorded):
+        """Test that new model methods get added to exercise_models."""
+        _, called = recorded
+        assert public_model_methods() <= called
+
+    @pytest.mark.asyncio
+    async def test_no_full_scans_or_temp_sorts(self, recorded):
+        """Test that no statement scans a table or sorts with a temp B-tree."""
+        database, _ = recorded
+        statements = dict(database.recorded)
+        assert statements
+
+        failures = []
+        for query, parameters in statements.items():
+            plan = await query_plan(database, query, parameters)
+            for detail in plan:
+                is_scan = detail.startswith("SCAN ")
+                if is_scan and query not in ALLOWED_FULL_SCANS:
+                    failures.append(f"{query}\n    -> {detail}")
+                if "USE TEMP B-TREE" in detail:
+                    failures.append(f"{query}\n    -> {detail}")
+
+        assert not failures, "Query plan regressions:\n" + "\n".join(failures)
+
+    @pytest.mark.asyncio
+    async def test_reminder_scan_uses_partial_index(self, recorded):
+        """Test that the reminder scans read the partial unreminded index."""
+        database, _ = recorded
+        queries = [q for q in database.recorded if "WHERE t.reminded = 0" in q]
+        assert len(queries) == 2  # Reminder window and reminder queue load
+        for query in queries:
+            plan = await query_plan(database, query, database.recorded[query])
+            assert any("idx_tasks_unreminded_due" in detail for detail in plan)
+
+    @pytest.mark.asyncio
+    async def test_user_list_uses_composite_index(self, recorded):
+        """Test that the per-user list reads the (user_id, due_date) index."""
+        database, _ = recorded
+        query = next(
+            q for q in database.recorded if "due_date >= ? ORDER BY due_date" in q
+        )
+        plan = await query_plan(database, query, database.recorded[query])
+        assert any("idx_tasks_user_due" in detail for detail in plan)
@@ -0,0 +1,84 @@
+"""
+Unit tests for outgoing message rate limiting in StudyBuddy Telegram Bot.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.rate_limit import ChatRateLimiter, TokenBucket
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Test cases for the token bucket."""
+
+    def test_burst_then_paced(self):
+        """Test that a full bucket allows a burst and then spaces callers."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, capacity=2, clock=clock)
+
+        waits = [bucket.reserve() for _ in range(4)]
+
+        assert waits == pytest.approx([0.0, 0.0, 0.1, 0.2])
+
+    def test_refills_over_time(self):
+        """Test that tokens come back at the configured rate."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, capacity=1, clock=clock)
+        bucket.reserve()
+        assert not bucket.idle
+
+        clock.now = 0.1
+        assert bucket.idle
+        assert bucket.reserve() == 0.0
+
+
+class TestChatRateLimiter:
+    """Test cases for combined global and per-chat limits."""
+
+    @pytest.mark.asyncio
+    async def test_same_chat_is_spaced_out(self):
+        """Test that messages to one chat wait for the per-chat rate."""
+        limiter = ChatRateLimiter(global_rate=1000, per_chat_rate=20)
+
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.acquire(1) for _ in range(3)))
+        elapsed = time.monotonic() - started
+
+        assert elapsed >= 0.09
+        assert limiter.get_stats()["acquired"] == 3
+        assert limiter.get_stats()["wait_max"] >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_different_chats_share_global_rate(self):
+        """Test that distinct chats only wait on the global bucket."""
+        limiter = ChatRateLimiter(global_rate=1000, per_chat_rate=1)
+
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.acquire(chat_id) for chat_id in range(50)))
+
+        assert time.monotonic() - started < 0.5
+        assert limiter.get_stats()["chats"] == 50
+
+    @pytest.mark.asyncio
+    async def test_idle_chat_buckets_are_dropped(self):
+        """Test that the per-chat table stays bounded."""
+        limiter = ChatRateLimiter(global_rate=1000, per_chat_rate=1000, max_chats=2)
+        for chat_id in range(2):
+            await limiter.acquire(chat_id)
+        await asyncio.sleep(0.01)
+
+        await limiter.acquire(99)
+
+        assert limiter.get_stats()["chats"] == 1
@@ -0,0 +1,636 @@
+"""
+Unit tests for event-driven reminders in StudyBuddy Telegram Bot.
+
+Tests cover the in-memory reminder queue and the reminder service's timer
+against a temporary SQLite database with a frozen clock.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
+
+from database.activity import ActivityBuffer
+from database.cache import TaskCache
+from database.db import Database
+from database.models import Lease, Outbox, Task, User
+from database.reminder_queue import ReminderQueue, is_reminder_open, reminder_time
+from services.rate_limit import ChatRateLimiter
+from services.reminder import ReminderService, is_chat_unreachable
+from utils.formatters import (
+    MAX_DIGEST_TASKS,
+    MAX_MESSAGE_LENGTH,
+    format_reminder_digest,
+)
+
+UTC = timezone.utc
+
+
+class FrozenDatetime(datetime):
+    """datetime whose now() sits just after tomorrow's reminders opened."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2030, 1, 1, 23, 30, tzinfo=tz)
+
+
+class FakeBot:
+    """Bot that records sent messages and how many were in flight at once."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sent = []
+        self.delivered = asyncio.Event()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send_message(self, chat_id, text):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        self.sent.append((chat_id, text))
+        self.delivered.set()
+
+
+@pytest_asyncio.fixture
+async def queue(tmp_path, monkeypatch):
+    """Point the models at a temporary database and a fresh reminder queue."""
+    database = Database(str(tmp_path / "reminders.db"))
+    await database.initialize()
+    reminder_queue = ReminderQueue()
+
+    monkeypatch.setattr("database.models.db", database)
+    monkeypatch.setattr("database.activity.db", database)
+    monkeypatch.setattr(
+        "database.models.activity_buffer", ActivityBuffer(flush_interval=60)
+    )
+    monkeypatch.setattr("database.models.task_cache", TaskCache(ttl_seconds=0))
+    monkeypatch.setattr("database.models.reminder_queue", reminder_queue)
+    monkeypatch.setattr("services.reminder.reminder_queue", reminder_queue)
+    monkeypatch.setattr("database.models.datetime", FrozenDatetime)
+    monkeypatch.setattr("services.reminder.datetime", FrozenDatetime)
+
+    await User.create_or_update(1, first_name="Ann")
+    yield reminder_queue
+    await database.disconnect()
+
+
+class TestReminderQueue:
+    """Test cases for the reminder heap."""
+
+    def test_reminder_opens_evening_before(self):
+        """Test that a reminder is due at 23:00 the day before."""
+        assert reminder_time(date(2030, 1, 2)) == datetime(2030, 1, 1, 23, tzinfo=UTC)
+
+    def test_reminder_time_follows_user_settings(self):
+        """Test that timezone and hour move the reminder to the user's evening."""
+        due = date(2030, 7, 2)
+        # 18:00 in Tashkent (UTC+5) and 08:00 in New York (UTC-4 in summer)
+        assert reminder_time(due, "Asia/Tashkent", 18) == datetime(
+            2030, 7, 1, 13, tzinfo=UTC
+        )
+        assert reminder_time(due, "America/New_York", 8) == datetime(
+            2030, 7, 1, 12, tzinfo=UTC
+        )
+
+    def test_window_closes_when_due_date_starts(self):
+        """Test that a reminder stays open until local midnight."""
+        due = date(2030, 7, 2)
+        tashkent_midnight = datetime(2030, 7, 1, 19, tzinfo=UTC)
+        for now, is_open in [
+            (datetime(2030, 7, 1, 12, 59, tzinfo=UTC), False),
+            (datetime(2030, 7, 1, 13, 0, tzinfo=UTC), True),
+            (tashkent_midnight - timedelta(seconds=1), True),
+            (tashkent_midnight, False),
+        ]:
+            assert is_reminder_open(due, "Asia/Tashkent", 18, now) is is_open
+
+    def test_pop_due_in_time_order(self):
+        """Test that due reminders come out earliest first."""
+        queue = ReminderQueue()
+        queue.load(
+            [(1, date(2030, 1, 3), None, None), (2, date(2030, 1, 2), None, None)],
+            date(2030, 1, 2),
+            date(2030, 1, 4),
+        )
+
+        assert queue.pop_due(datetime(2030, 1, 1, 22, tzinfo=UTC)) == []
+        assert queue.pop_due(datetime(2030, 1, 2, 23, tzinfo=UTC)) == [2, 1]
+        assert queue.next_time() is None
+
+    def test_moved_and_discarded_entries_are_skipped(self):
+        """Test that rescheduled or removed tasks do not fire at the old time."""
+        queue = ReminderQueue()
+        queue.load(
+            [(1, date(2030, 1, 2), None, None), (2, date(2030, 1, 2), None, None)],
+            date(2030, 1, 2),
+            date(2030, 1, 4),
+        )
+
+        queue.schedule(1, date(2030, 1, 3))
+        queue.discard(2)
+
+        assert queue.next_time() == datetime(2030, 1, 2, 23, tzinfo=UTC)
+        assert queue.pop_due(datetime(2030, 1, 2, 0, tzinfo=UTC)) == []
+        assert len(queue) == 1
+
+    def test_tasks_outside_horizon_are_not_held(self):
+        """Test that tasks beyond the loaded range wait for the next load."""
+        queue = ReminderQueue()
+        queue.load([], date(2030, 1, 2), date(2030, 1, 4))
+
+        queue.schedule(1, date(2030, 2, 1))
+        queue.schedule(2, date(2030, 1, 1))
+
+        assert len(queue) == 0
+
+
+class TestReminderTimer:
+    """Test cases for the reminder service's timer."""
+
+    @pytest.mark.asyncio
+    async def test_new_task_wakes_timer(self, queue):
+        """Test that a task created inside its window is reminded at once."""
+        bot = FakeBot()
+        service = ReminderService(bot)
+        timer = asyncio.create_task(service._run_timer())
+        sender = asyncio.create_task(service._run_sender())
+        try:
+            await asyncio.sleep(0.05)
+            assert queue.loaded_until == date(2030, 1, 5)
+            assert bot.sent == []
+
+            await Task.create(1, "exam", "Later", date(2030, 1, 3))
+            task_id = await Task.create(1, "exam", "Physics", date(2030, 1, 2))
+            await asyncio.wait_for(bot.delivered.wait(), 1)
+        finally:
+            timer.cancel()
+            sender.cancel()
+
+        assert [chat_id for chat_id, _ in bot.sent] == [1]
+        assert "Physics" in bot.sent[0][1]
+        assert (await Task.get_by_id(task_id)).reminded
+        assert service.wakeups == 1
+        assert service.get_status()["next_reminder"] == datetime(
+            2030, 1, 2, 23, tzinfo=UTC
+        )
+
+    @pytest.mark.asyncio
+    async def test_reconcile_loads_existing_tasks(self, queue):
+        """Test that reconciliation queues tasks written behind the model."""
+        task_id = await Task.create(1, "exam", "Physics", date(2030, 1, 3))
+        assert len(queue) == 0  # Not loaded yet
+        service = ReminderService(FakeBot())
+
+        await service.reconcile()
+        assert len(queue) == 1
+
+        await Task.delete(task_id)
+        assert len(queue) == 0
+
+    @pytest.mark.asyncio
+    async def test_writes_queue_reminders_without_reading_user(
+        self, queue, monkeypatch
+    ):
+        """Test that owner settings come back with the write, not a User.get."""
+        await User.set_reminder_settings(1, tz_name="Asia/Tokyo", reminder_hour=20)
+        await ReminderService(FakeBot()).reconcile()
+
+        async def no_reads(user_id):
+            raise AssertionError("User.get called on a task write")
+
+        monkeypatch.setattr(User, "get", no_reads)
+        task_id = await Task.create(1, "exam", "Physics", date(2030, 1, 4))
+        assert queue.next_time() == reminder_time(date(2030, 1, 4), "Asia/Tokyo", 20)
+
+        await Task.update(task_id, due_date=date(2030, 1, 3))
+        assert queue.next_time() == reminder_time(date(2030, 1, 3), "Asia/Tokyo", 20)
+
+
+class TestReminderFanOut:
+    """Test cases for concurrent, rate-limited reminder sending."""
+
+    @pytest.mark.asyncio
+    async def test_sends_concurrently_within_limits(self, queue):
+        """Test that reminders go out in parallel, bounded by concurrency."""
+        for user_id in range(2, 22):
+            await User.create_or_update(user_id, first_name="U")
+            await Task.create(user_id, "exam", f"Task {user_id}", date(2030, 1, 2))
+        bot = FakeBot(latency=0.02)
+        service = ReminderService(bot)
+        service.concurrency = 5
+        service.rate_limiter = ChatRateLimiter(global_rate=1000, per_chat_rate=1)
+
+        await service.check_and_send_reminders()
+        await service.drain_outbox()
+
+        assert len(bot.sent) == 20
+        assert bot.max_in_flight == 5
+        stats = service.get_send_stats()
+        assert stats["sent"] == 20
+        assert stats["queue_depth_max"] == 20
+        assert stats["queue_depth"] == 0
+        assert stats["limiter"]["acquired"] == 20
+        assert await Task.get_tasks_needing_reminder() == []
+
+    @pytest.mark.asyncio
+    async def test_same_user_is_paced(self, queue):
+        """Test that several reminders to one chat respect the per-chat rate."""
+        for title in ("A", "B", "C"):
+            await Task.create(1, "exam", title, date(2030, 1, 2))
+        service = ReminderService(FakeBot())
+        service.digest = False
+        service.rate_limiter = ChatRateLimiter(global_rate=1000, per_chat_rate=20)
+
+        await service.check_and_send_reminders()
+        await service.drain_outbox()
+
+        stats = service.get_send_stats()
+        assert stats["sent"] == 3
+        assert stats["limiter"]["wait_total"] >= 0.14  # 0.05s + 0.1s
+
+    @pytest.mark.asyncio
+    async def test_tasks_are_marked_in_one_batch(self, queue, monkeypatch):
+        """Test that queueing a run marks its tasks with one batched update."""
+        for title in ("A", "B", "C"):
+            await Task.create(1, "exam", title, date(2030, 1, 2))
+        calls = []
+        original = Task.mark_many_as_reminded
+
+        async def recording(task_ids):
+            calls.append(list(task_ids))
+            return await original(task_ids)
+
+        monkeypatch.setattr(Task, "mark_many_as_reminded", recording)
+        service = ReminderService(FakeBot())
+        service.digest = False
+
+        await service.check_and_send_reminders()
+
+        assert [len(ids) for ids in calls] == [3]
+        assert await Task.get_tasks_needing_reminder() == []
+        assert (await Outbox.count_by_status())["pending"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_ack_is_not_resent(self, queue, monkeypatch):
+        """Test that a delivered row whose ack failed is not sent again."""
+        await Task.create(1, "exam", "Physics", date(2030, 1, 2))
+        original = Outbox.delete_sent
+
+        async def failing(outbox_ids):
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(Outbox, "delete_sent", failing)
+        bot = FakeBot()
+        service = ReminderService(bot)
+
+        await service.check_and_send_reminders()
+        await service.drain_outbox()
+        await service.drain_outbox()
+        assert len(bot.sent) == 1
+        assert service.acks.pending_count == 1
+
+        monkeypatch.setattr(Outbox, "delete_sent", original)
+        await service.acks.stop()
+        assert service.acks.pending_count == 0
+        assert await Outbox.count_by_status() == {"pending": 0, "dead": 0}
+
+
+class FlakyBot(FakeBot):
+    """Bot whose sends raise the queued errors before succeeding."""
+
+    def __init__(self, errors):
+        super().__init__()
+        self.errors = list(errors)
+        self.attempts = 0
+
+    async def send_message(self, chat_id, text):
+        self.attempts += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        await super().send_message(chat_id, text)
+
+
+class TestReminderOutbox:
+    """Test cases for outbox retries, backoff and dead-lettering."""
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_is_retried_after_backoff(self, queue):
+        """Test that a failed send is rescheduled instead of retried at once."""
+        await Task.create(1, "exam", "Physics", date(2030, 1, 2))
+        bot = FlakyBot([RuntimeError("timeout")])
+        service = ReminderService(bot)
+        service.retry_base = 0.05
+
+        await service.check_and_send_reminders()
+        assert await service.drain_outbox() == 1
+        assert bot.sent == []
+        # Not due again until the backoff has passed
+        assert await service.drain_outbox() == 0
+
+        await asyncio.sleep(0.07)
+        assert await service.drain_outbox() == 1
+        assert len(bot.sent) == 1
+        stats = service.get_send_stats()
+        assert (stats["sent"], stats["retried"], stats["dead"]) == (1, 1, 0)
+
+    @pytest.mark.asyncio
+    async def test_dead_letter_after_max_attempts(self, queue):
+        """Test that a row is dead-lettered once it runs out of attempts."""
+        await Task.create(1, "exam", "Physics", date(2030, 1, 2))
+        bot = FlakyBot([RuntimeError("timeout")] * 3)
+        service = ReminderService(bot)
+        service.retry_base = service.retry_max = 0.01
+        service.max_attempts = 2
+
+        await service.check_and_send_reminders()
+        await service.drain_outbox()
+        await asyncio.sleep(0.02)
+        await service.drain_outbox()
+        await asyncio.sleep(0.02)
+
+        assert await service.drain_outbox() == 0
+        assert bot.attempts == 2
+        assert await Outbox.count_by_status() == {"pending": 0, "dead": 1}
+
+    @pytest.mark.asyncio
+    async def test_permanent_error_is_dead_lettered_at_once(self, queue):
+        """Test that a blocked bot is not retried."""
+        await Task.create(1, "exam", "Physics", date(2030, 1, 2))
+        blocked = TelegramForbiddenError(method=None, message="bot was blocked")
+        service = ReminderService(FlakyBot([blocked]))
+
+        await service.check_and_send_reminders()
+        await service.drain_outbox()
+
+        assert await Outbox.count_by_status() == {"pending": 0, "dead": 1}
+        assert service.get_send_stats()["dead"] == 1
+
+    @pytest.mark.asyncio
+    async def test_flood_control_does_not_use_attempts(self, queue):
+        """Test that retry-after waits never dead-letter a message."""
+        await Task.create(1, "exam", "Physics", date(2030, 1, 2))
+        flood = TelegramRetryAfter(method=None, message="flood", retry_after=0)
+        bot = FlakyBot([flood, flood])
+        service = ReminderService(bot)
+        service.max_attempts = 1
+
+        await service.check_and_send_reminders()
+        for _ in range(3):
+            await service.drain_outbox()
+
+        assert len(bot.sent) == 1
+        assert service.get_send_stats()["dead"] == 0
+
+    @pytest.mark.asyncio
+    async def test_deleted_task_withdraws_queued_digest(self, queue):
+        """Test that deleting a task drops its queued digest and requeues the rest."""
+        first = await Task.create(1, "exam", "Physics", date(2030, 1, 2))
+        await Task.create(1, "exam", "Biology", date(2030, 1, 2))
+        bot = FakeBot()
+        service = ReminderService(bot)
+        service.digest = True
+
+        await service.check_and_send_reminders()
+        assert await Task.delete_user_task(1, first)
+        assert await Outbox.count_by_status() == {"pending": 0, "dead": 0}
+
+        await service.check_and_send_reminders()
+        await service.drain_outbox()
+        (sent,) = bot.sent
+        assert "Biology" in sent[1] and "Physics" not in sent[1]
+
+    @pytest.mark.asyncio
+    async def test_moved_task_withdraws_queued_reminder(self, queue):
+        """Test that a new due date drops the reminder queued for the old one."""
+        task_id = await Task.create(1, "exam", "Physics", date(2030, 1, 2))
+        service = ReminderService(FakeBot())
+
+        await service.check_and_send_reminders()
+        assert await Task.update(task_id, due_date=date(2030, 1, 5))
+
+        assert await Outbox.count_by_status() == {"pending": 0, "dead": 0}
+        assert not (await Task.get_by_id(task_id)).reminded
+
+
+class TestBlockedUsers:
+    """Test cases for deactivating users who blocked the bot."""
+
+    @pytest.mark.asyncio
+    async def test_blocked_user_drops_out_of_scans(self, queue):
+        """Test that a Forbidden error deactivates the user until /start."""
+        await Task.create(1, "exam", "Physics", date(2030, 1, 2))
+        blocked = TelegramForbiddenError(method=None, message="bot was blocked")
+        service = ReminderService(FlakyBot([blocked]))
+
+        await service.check_and_send_reminders()
+        await service.drain_outbox()
+        assert (await User.get(1)).is_active == 0
+
+        # Tasks added before the block was noticed are no longer scanned
+        late_id = await Task.create(1, "exam", "Chemistry", date(2030, 1, 2))
+        window = (date(2030, 1, 1), date(2030, 1, 4))
+        assert await Task.get_tasks_needing_reminder() == []
+        assert await Task.get_reminder_schedule(*window) == []
+        queue.load([], *queue.horizon(date(2030, 1, 1)))
+        assert queue.next_time() is None
+
+        assert await User.reactivate(1)
+        assert queue.next_time() is not None
+        assert not await User.reactivate(1)
+        tasks = await Task.get_tasks_needing_reminder()
+        assert [task.id for task in tasks] == [late_id]
+
+    def test_unreachable_chat_errors(self):
+        """Test which Telegram errors mean the chat is gone."""
+        assert is_chat_unreachable(
+            TelegramForbiddenError(method=None, message="user is deactivated")
+        )
+        assert is_chat_unreachable(
+            TelegramBadRequest(method=None, message="Bad Request: chat not found")
+        )
+        assert not is_chat_unreachable(
+            TelegramBadRequest(method=None, message="message is too long")
+        )
+        assert not is_chat_unreachable(RuntimeError("timeout"))
+
+
+class TestReminderTimezones:
+    """Test cases for per-user timezones and reminder hours."""
+
+    @pytest.mark.asyncio
+    async def test_scan_follows_each_users_window(self, queue):
+        """Test that each user is reminded in their own local window."""
+        await User.create_or_update(2, first_name="Bo")
+        await User.create_or_update(3, first_name="Cy")
+        await User.set_reminder_settings(2, "America/New_York", 18)
+        await User.set_reminder_settings(3, "Asia/Tashkent", 8)
+        for user_id in (1, 2, 3):
+            await Task.create(user_id, "exam", f"U{user_id}", date(2030, 1, 2))
+
+        # 23:30 UTC: 23:00 UTC and 18:00 New York are open; Tashkent's
+        # window closed at its midnight (19:00 UTC)
+        tasks = await Task.get_tasks_needing_reminder()
+        assert sorted(task.user_id for task in tasks) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_histogram_buckets_by_utc_hour(self, queue):
+        """Test that queued reminders are bucketed at each user's send hour."""
+        await User.create_or_update(2, first_name="Bo")
+        await User.set_reminder_settings(2, "Asia/Tashkent", 18)
+        await Task.create(1, "exam", "A", date(2030, 1, 3))
+        await Task.create(2, "exam", "B", date(2030, 1, 3))
+        await Task.create(2, "exam", "C", date(2030, 1, 4))
+        service = ReminderService(FakeBot())
+
+        await service.reconcile()
+        queued = service.get_reminder_histogram()["queued"]
+        assert (queued[23], queued[13], sum(queued)) == (1, 2, 3)
+
+        # Changing the hour moves reminders that are already queued
+        await User.set_reminder_settings(1, reminder_hour=20)
+        queued = service.get_reminder_histogram()["queued"]
+        assert (queued[20], queued[23]) == (1, 0)
+
+
+class TestReminderLeadership:
+    """Test cases for running several reminder service instances."""
+
+    @pytest.mark.asyncio
+    async def test_lease_is_exclusive_until_it_expires(self, queue):
+        """Test that a lease has one holder until it lapses or is released."""
+        assert await Lease.acquire("reminders", "a", 0.05)
+        assert not await Lease.acquire("reminders", "b", 0.05)
+        assert await Lease.acquire("reminders", "a", 0.05)  # Renewal
+
+        await asyncio.sleep(0.07)
+        assert await Lease.acquire("reminders", "b", 0.05)
+        assert not await Lease.acquire("reminders", "a", 0.05)
+        assert await Lease.get_holder("reminders") == "b"
+
+        assert not await Lease.release("reminders", "a")
+        assert await Lease.release("reminders", "b")
+        assert await Lease.get_holder("reminders") is None
+
+    @pytest.mark.asyncio
+    async def test_standby_skips_scan_until_takeover(self, queue):
+        """Test that only the leader scans, and a standby takes over on expiry."""
+        await Task.create(1, "exam", "Physics", date(2030, 1, 2))
+        leader_bot, standby_bot = FakeBot(), FakeBot()
+        leader = ReminderService(leader_bot)
+        standby = ReminderService(standby_bot)
+        leader.lease_seconds = standby.lease_seconds = 0.05
+
+        await leader.check_and_send_reminders()
+        await standby.check_and_send_reminders()
+        await standby.drain_outbox()
+        await leader.drain_outbox()
+        assert (len(leader_bot.sent), len(standby_bot.sent)) == (1, 0)
+        assert (leader.is_leader, standby.is_leader) == (True, False)
+
+        # The leader stops renewing: the standby takes over once it lapses
+        await asyncio.sleep(0.07)
+        await Task.create(1, "exam", "Chemistry", date(2030, 1, 2))
+        await standby.check_and_send_reminders()
+        await standby.drain_outbox()
+        assert [text for _, text in standby_bot.sent if "Chemistry" in text]
+        assert not await leader._hold_lease()
+        assert leader.get_status()["is_leader"] is False
+        assert leader.leader_changes == 2
+
+    @pytest.mark.asyncio
+    async def test_overlapping_leaders_send_each_reminder_once(self, queue):
+        """Test that task and outbox claims stop two leaders double-sending."""
+        for user_id in range(2, 12):
+            await User.create_or_update(user_id, first_name="U")
+            await Task.create(user_id, "exam", f"Task {user_id}", date(2030, 1, 2))
+        bots = [FakeBot(latency=0.01), FakeBot(latency=0.01)]
+        services = [ReminderService(bot) for bot in bots]
+        for service in services:
+            # Both believe they lead, as around a lease handover
+            service.is_leader = True
+            service.rate_limiter = ChatRateLimiter(global_rate=1000, per_chat_rate=1)
+
+        await asyncio.gather(*(s._queue_due_reminders() for s in services))
+        assert (await Outbox.count_by_status())["pending"] == 10
+        # Tasks the other instance queued are not counted twice
+        assert sum(s.send_metrics["tasks_reminded"] for s in services) == 10
+        await asyncio.gather(*(s.drain_outbox() for s in services))
+        await asyncio.gather(*(s.acks.flush() for s in services))
+
+        sent = sorted(chat_id for bot in bots for chat_id, _ in bot.sent)
+        assert sent == list(range(2, 12))
+        assert await Outbox.count_by_status() == {"pending": 0, "dead": 0}
+
+    @pytest.mark.asyncio
+    async def test_enqueue_drops_messages_claimed_elsewhere(self, queue):
+        """Test that a message is written only if all its tasks were claimed."""
+        first = await Task.create(1, "exam", "Physics", date(2030, 1, 2))
+        second = await Task.create(1, "exam", "Essay", date(2030, 1, 2))
+
+        assert await Outbox.enqueue([(1, [first], "A")]) == [(1, [first], "A")]
+        assert await Outbox.enqueue([(1, [first], "A")]) == []
+        # Partly claimed: the unclaimed task is released for the next scan
+        assert await Outbox.enqueue([(1, [first, second], "A+B")]) == []
+        tasks = await Task.get_tasks_needing_reminder()
+        assert [task.id for task in tasks] == [second]
+        assert (await Outbox.count_by_status())["pending"] == 1
+
+
+class TestReminderDigest:
+    """Test cases for per-user reminder digests."""
+
+    @pytest.mark.asyncio
+    async def test_one_message_per_user(self, queue):
+        """Test that a user's due tasks arrive as one combined message."""
+        await User.create_or_update(2, first_name="Bob")
+        for title in ("Physics", "Essay", "Lab report"):
+            await Task.create(1, "exam", title, date(2030, 1, 2))
+        await Task.create(2, "assignment", "Reading", date(2030, 1, 2))
+        bot = FakeBot()
+        service = ReminderService(bot)
+
+        await service.check_and_send_reminders()
+        await service.drain_outbox()
+
+        assert sorted(chat_id for chat_id, _ in bot.sent) == [1, 2]
+        digest = next(text for chat_id, text in bot.sent if chat_id == 1)
+        assert "3 tasks due tomorrow" in digest
+        assert all(title in digest for title in ("Physics", "Essay", "Lab report"))
+        stats = service.get_send_stats()
+        assert (stats["sent"], stats["tasks_reminded"]) == (2, 4)
+        assert await Task.get_tasks_needing_reminder() == []
+
+    def test_long_digest_is_truncated(self):
+        """Test that a digest lists at most MAX_DIGEST_TASKS tasks."""
+        tasks = [
+            {"task_type": "exam", "title": f"Task {i}", "due_date": date(2030, 1, 2)}
+            for i in range(MAX_DIGEST_TASKS + 5)
+        ]
+
+        digest = format_reminder_digest(tasks)
+
+        assert f"Task {MAX_DIGEST_TASKS - 1}" in digest
+        assert f"Task {MAX_DIGEST_TASKS}\n" not in digest
+        assert "and 5 more" in digest
+
+    def test_long_titles_keep_digest_within_limit(self):
+        """Test that long titles cut the digest at the message budget."""
+        tasks = [
+            {"task_type": "exam", "title": "x" * 200, "due_date": date(2030, 1, 2)}
+            for _ in range(MAX_DIGEST_TASKS)
+        ]
+
+        digest = format_reminder_digest(tasks)
+
+        assert len(digest) <= MAX_MESSAGE_LENGTH
+        shown = digest.count("x" * 200)
+        assert 0 < shown < MAX_DIGEST_TASKS
+        assert f"and {MAX_DIGEST_TASKS - shown} more" in digest
@@ -0,0 +1,203 @@
+"""
+Unit tests for sharding in StudyBuddy Telegram Bot.
+
+Tests run the models against two temporary shard files.
+"""
+
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+import database.models as models
+from database.activity import ActivityBuffer
+from database.cache import TaskCache
+from database.db import Database
+from database.models import Outbox, Task, User
+from database.reshard import reshard
+from database.sharding import (
+    TASK_ID_SHARD_BITS,
+    create_shard_router,
+    shard_index_for_task,
+    shard_index_for_user,
+    shard_paths,
+)
+
+
+class FrozenDatetime(datetime):
+    """datetime whose now() sits just before a reminder window opens."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2030, 1, 1, 23, 30, tzinfo=tz)
+
+
+def users_on_shard(index: int, shard_count: int = 2, count: int = 2) -> list:
+    """Find user IDs that hash to a given shard."""
+    found = []
+    user_id = 1
+    while len(found) < count:
+        if shard_index_for_user(user_id, shard_count) == index:
+            found.append(user_id)
+        user_id += 1
+    return found
+
+
+@pytest_asyncio.fixture
+async def router(tmp_path, monkeypatch):
+    """Point the models at two temporary shards."""
+    shard_router = create_shard_router(str(tmp_path / "bot.db"), 2)
+    await shard_router.initialize()
+
+    monkeypatch.setattr("database.models.shard_router", shard_router)
+    monkeypatch.setattr("database.activity.shard_router", shard_router)
+    monkeypatch.setattr(
+        "database.models.activity_buffer", ActivityBuffer(flush_interval=60)
+    )
+    monkeypatch.setattr("database.models.task_cache", TaskCache(ttl_seconds=0))
+
+    yield shard_router
+    await shard_router.disconnect()
+
+
+class TestShardMapping:
+    """Test cases for shard placement helpers."""
+
+    def test_shard_zero_keeps_base_path(self):
+        """Test that enabling sharding leaves existing data in shard 0."""
+        assert shard_paths("data/bot.db", 3) == [
+            "data/bot.db",
+            "data/bot_shard1.db",
+            "data/bot_shard2.db",
+        ]
+
+    def test_user_placement_is_stable(self):
+        """Test that a user always maps to the same shard."""
+        assert shard_index_for_user(42, 4) == shard_index_for_user(42, 4)
+        assert shard_index_for_user(42, 1) == 0
+
+    def test_task_id_encodes_shard(self):
+        """Test that the shard index is read back from a task ID."""
+        assert shard_index_for_task(17) == 0
+        assert shard_index_for_task((3 << TASK_ID_SHARD_BITS) + 17) == 3
+
+
+class TestShardedModels:
+    """Test cases for models routed across shards."""
+
+    @pytest.mark.asyncio
+    async def test_tasks_live_on_owner_shard(self, router):
+        """Test that tasks are stored and found on their owner's shard."""
+        (user_a,) = users_on_shard(0, count=1)
+        (user_b,) = users_on_shard(1, count=1)
+        due = datetime.now().date() + timedelta(days=3)
+        for user_id in (user_a, user_b):
+            await User.create_or_update(user_id, first_name="U")
+
+        task_a = await Task.create(user_a, "exam", "A", due)
+        task_b = await Task.create(user_b, "exam", "B", due)
+
+        assert shard_index_for_task(task_a) == 0
+        assert shard_index_for_task(task_b) == 1
+        assert (await Task.get_by_id(task_b)).title == "B"
+        assert (
+            await router.shards[0].fetch_one(
+                "SELECT id FROM tasks WHERE id = ?", (task_b,)
+            )
+            is None
+        )
+
+        assert await Task.delete_user_task(user_b, task_b)
+        assert await Task.get_by_id(task_b) is None
+
+    @pytest.mark.asyncio
+    async def test_global_scans_merge_shards_in_order(self, router, monkeypatch):
+        """Test that reminder and user scans merge results from every shard."""
+        monkeypatch.setattr("database.models.datetime", FrozenDatetime)
+        user_ids = users_on_shard(1) + users_on_shard(0)
+        for offset, user_id in enumerate(user_ids):
+            await User.create_or_update(user_id, first_name="U")
+            await Task.create(user_id, "exam", f"T{offset}", date(2030, 1, 2))
+        await Task.create(user_ids[0], "exam", "Later", date(2030, 1, 3))
+
+        reminders = await Task.get_tasks_needing_reminder()
+        # Shard 0 task IDs sort before shard 1's for the same due date
+        assert [task.title for task in reminders] == ["T2", "T3", "T0", "T1"]
+
+        users = await User.get_all()
+        assert [user.user_id for user in users] == sorted(user_ids)
+
+    @pytest.mark.asyncio
+    async def test_outbox_rows_route_by_id(self, router):
+        """Test that outbox rows live on the user's shard and merge by due time."""
+        user_ids = users_on_shard(1, count=1) + users_on_shard(0, count=1)
+        assert len(await Outbox.enqueue([(u, [], f"M{u}") for u in user_ids])) == 2
+
+        due = await Outbox.claim_due("a", time.time(), 10, 60)
+        assert sorted(row.user_id for row in due) == sorted(user_ids)
+        for row in due:
+            assert shard_index_for_task(row.id) == shard_index_for_user(row.user_id, 2)
+        assert await Outbox.claim_due("b", time.time(), 10, 60) == []
+
+        await Outbox.record_failure(due[0].id, "a", 1, time.time() + 60, "timeout")
+        assert await Outbox.next_attempt_time() > time.time() + 50
+        assert await Outbox.delete_sent([row.id for row in due]) == 2
+        assert await Outbox.count_by_status() == {"pending": 0, "dead": 0}
+
+    @pytest.mark.asyncio
+    async def test_activity_flush_reaches_every_shard(self, router):
+        """Test that buffered activity is written to each user's shard."""
+        user_ids = users_on_shard(0, count=1) + users_on_shard(1, count=1)
+        for user_id in user_ids:
+            await User.create_or_update(user_id, first_name="U")
+            await router.for_user(user_id).execute(
+                "UPDATE users SET last_active = '2000-01-01 00:00:00'"
+            )
+            await User.create_or_update(user_id)
+
+        assert await models.activity_buffer.flush() == 2
+        for user_id in user_ids:
+            user = await User.get(user_id)
+            assert user.last_active != "2000-01-01 00:00:00"
+
+
+class TestReshard:
+    """Test cases for the offline reshard tool."""
+
+    @pytest.mark.asyncio
+    async def test_split_and_merge_back(self, tmp_path):
+        """Test that users move to their new shard with their tasks."""
+        base_path = str(tmp_path / "bot.db")
+        database = Database(base_path)
+        await database.initialize()
+        user_ids = users_on_shard(0) + users_on_shard(1)
+        for user_id in user_ids:
+            await database.execute(
+                "INSERT INTO users (user_id, first_name) VALUES (?, 'U')", (user_id,)
+            )
+            await database.execute(
+                "INSERT INTO tasks (user_id, task_type, title, due_date) "
+                "VALUES (?, 'exam', 'T', 21915)",
+                (user_id,),
+            )
+        await database.disconnect()
+
+        assert await reshard(base_path, 1, 2) == {"users_moved": 2, "tasks_moved": 2}
+        # Re-running finds nothing left to move
+        assert await reshard(base_path, 1, 2) == {"users_moved": 0, "tasks_moved": 0}
+
+        shard_router = create_shard_router(base_path, 2)
+        for user_id in user_ids:
+            shard = shard_router.for_user(user_id)
+            row = await shard.fetch_one(
+                "SELECT id FROM tasks WHERE user_id = ?", (user_id,)
+            )
+            assert shard_router.for_task(row["id"]) is shard
+        await shard_router.disconnect()
+
+        assert await reshard(base_path, 2, 1) == {"users_moved": 2, "tasks_moved": 2}
+        database = Database(base_path)
+        row = await database.fetch_one("SELECT COUNT(*) AS count FROM tasks")
+        await database.disconnect()
+        assert row["count"] == 4
@@ -8,13 +8,18 @@ from datetime import date, timedelta
 
 import pytest
 
+from utils.formatters import MAX_MESSAGE_LENGTH, format_bulk_import_summary
 from utils.validators import (
+    parse_bulk_tasks,
     sanitize_input,
+    validate_bulk_task_line,
     validate_confirmation,
     validate_date,
+    validate_reminder_hour,
     validate_task_number,
     validate_task_title,
     validate_task_type,
+    validate_timezone,
 )
 
 
@@ -280,6 +285,38 @@ class TestValidateTaskNumber:
         assert number == 3
 
 
+class TestReminderSettings:
+    """Test cases for timezone and reminder hour validation."""
+
+    def test_valid_timezone(self):
+        """Test a valid IANA timezone name."""
+        is_valid, tz_name, error = validate_timezone("  Asia/Tashkent ")
+        assert is_valid is True
+        assert tz_name == "Asia/Tashkent"
+        assert error is None
+
+    def test_unknown_timezone(self):
+        """Test an unknown or malformed timezone name."""
+        for text in ("Mars/Olympus", "../etc/passwd", ""):
+            is_valid, tz_name, error = validate_timezone(text)
+            assert is_valid is False
+            assert tz_name is None
+            assert "❌" in error
+
+    def test_valid_hours(self):
+        """Test hours as plain numbers and as HH:00."""
+        assert validate_reminder_hour("0") == (True, 0, None)
+        assert validate_reminder_hour("18:00") == (True, 18, None)
+        assert validate_reminder_hour(" 23 ") == (True, 23, None)
+
+    def test_invalid_hours(self):
+        """Test out-of-range and non-numeric hours."""
+        for text in ("24", "-1", "evening", "18:30"):
+            is_valid, hour, error = validate_reminder_hour(text)
+            assert is_valid is False
+            assert hour is None
+
+
 class TestValidateConfirmation:
     """Test cases for confirmation validation."""
 
@@ -340,6 +377,79 @@ class TestValidateConfirmation:
         assert confirmed is True
 
 
+class TestBulkTaskImport:
+    """Test cases for bulk task line parsing."""
+
+    @staticmethod
+    def future(days=10):
+        """Return a valid future date string in DD/MM/YYYY format."""
+        return (date.today() + timedelta(days=days)).strftime("%d/%m/%Y")
+
+    def test_valid_line(self):
+        """Test a well-formed import line."""
+        is_valid, task, error = validate_bulk_task_line(
+            f"  Math   Homework ; {self.future()} ; hw "
+        )
+        assert is_valid is True
+        assert task == (
+            "Math Homework",
+            date.today() + timedelta(days=10),
+            "assignment",
+        )
+        assert error is None
+
+    def test_wrong_field_count(self):
+        """Test a line without three fields."""
+        is_valid, task, error = validate_bulk_task_line("Math Homework")
+        assert is_valid is False
+        assert task is None
+        assert "3 fields" in error
+
+    def test_invalid_type(self):
+        """Test a line with an unknown task type."""
+        is_valid, task, error = validate_bulk_task_line(
+            f"Math Homework; {self.future()}; party"
+        )
+        assert is_valid is False
+        assert "task type" in error
+
+    def test_mixed_import(self):
+        """Test that valid lines are kept and invalid ones reported by number."""
+        text = "\n".join(
+            [
+                f"Essay; {self.future(3)}; assignment",
+                "",
+                "Broken line",
+                f"Physics Final; {self.future(5)}; exam",
+                "Chemistry; 99/99/2025; exam",
+            ]
+        )
+        tasks, errors = parse_bulk_tasks(text)
+        assert [task[0] for task in tasks] == ["Essay", "Physics Final"]
+        assert [line for line, _ in errors] == [3, 5]
+
+    def test_max_tasks(self):
+        """Test that imports beyond the line limit are cut off."""
+        text = "\n".join(f"Task {i}; {self.future()}; exam" for i in range(5))
+        tasks, errors = parse_bulk_tasks(text, max_tasks=3)
+        assert len(tasks) == 3
+        assert errors == [(4, "❌ Too many lines (max 3 per import).")]
+
+    def test_long_import_summary_fits_one_message(self):
+        """Test that a summary of long titles is cut to one Telegram message."""
+        due = date.today() + timedelta(days=10)
+        tasks = [(f"{i:03d} " + "x" * 196, due, "exam") for i in range(100)]
+        errors = [(i, "❌ Too many lines (max 100 per import).") for i in range(50)]
+
+        summary = format_bulk_import_summary(tasks, errors)
+
+        assert len(summary) <= MAX_MESSAGE_LENGTH
+        assert summary.startswith("✅ Added 100 task(s)!")
+        assert "000 xxx" in summary
+        assert "more" in summary.split("⚠️")[0]
+        assert "⚠️ Skipped 50 line(s):" in summary
+
+
 class TestSanitizeInput:
     """Test cases for input sanitization."""
 
@@ -5,9 +5,11 @@ This package provides validation and formatting utilities.
 """
 
 from utils.formatters import (
+    format_bulk_import_summary,
     format_date,
     format_deletion_confirmation,
     format_relative_time,
+    format_reminder_digest,
     format_reminder_message,
     format_task_confirmation,
     format_task_details,
@@ -17,12 +19,16 @@ from utils.formatters import (
     get_task_icon,
 )
 from utils.validators import (
+    parse_bulk_tasks,
     sanitize_input,
+    validate_bulk_task_line,
     validate_confirmation,
     validate_date,
+    validate_reminder_hour,
     validate_task_number,
     validate_task_title,
     validate_task_type,
+    validate_timezone,
 )
 
 __all__ = [
@@ -34,6 +40,8 @@ __all__ = [
     "format_task_list",
     "format_task_summary",
     "format_reminder_message",
+    "format_reminder_digest",
+    "format_bulk_import_summary",
     "format_deletion_confirmation",
     "format_task_selection_list",
     "get_task_icon",
@@ -43,5 +51,9 @@ __all__ = [
     "validate_task_number",
     "validate_task_title",
     "validate_task_type",
+    "validate_timezone",
+    "validate_reminder_hour",
+    "validate_bulk_task_line",
+    "parse_bulk_tasks",
     "sanitize_input",
 ]
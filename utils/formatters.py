@@ -7,10 +7,56 @@ in a user-friendly way.
 
 import logging
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# A TaskRecord from database.models, or a plain task dictionary. Both
+# support task["field"] access.
+TaskLike = Any
+
+# Character budget for one reply, under Telegram's 4096-character message
+# limit with room for headers and "…and N more" footers
+MAX_MESSAGE_LENGTH = 3800
+
+
+def lines_within(lines: List[str], budget: int) -> List[str]:
+    """
+    Take the leading lines that fit in a character budget.
+
+    Args:
+        lines: Candidate lines, joined with newlines when sent.
+        budget: Characters available.
+
+    Returns:
+        The longest prefix of lines whose joined length fits the budget.
+    """
+    used = 0
+    for count, line in enumerate(lines):
+        used += len(line) + 1
+        if used > budget:
+            return lines[:count]
+    return lines
+
+
+def get_due_date(task: TaskLike) -> date:
+    """
+    Get a task's due date as a date object.
+
+    Task records already carry a parsed date; ISO strings from plain
+    dictionaries are parsed here.
+
+    Args:
+        task: Task record or dictionary.
+
+    Returns:
+        Due date.
+    """
+    due_date = task["due_date"]
+    if isinstance(due_date, str):
+        return date.fromisoformat(due_date)
+    return due_date
+
 
 def format_date(task_date: date) -> str:
     """
@@ -76,12 +122,12 @@ def get_task_icon(task_type: str) -> str:
         return "📌"
 
 
-def format_task_summary(task: Dict[str, Any]) -> str:
+def format_task_summary(task: TaskLike) -> str:
     """
     Format a single task as a summary line.
 
     Args:
-        task: Task dictionary from database.
+        task: Task record from database.
 
     Returns:
         Formatted task summary string.
@@ -89,11 +135,7 @@ def format_task_summary(task: Dict[str, Any]) -> str:
     icon = get_task_icon(task["task_type"])
     title = task["title"]
 
-    # Parse due_date (it's stored as ISO string in SQLite)
-    if isinstance(task["due_date"], str):
-        task_date = date.fromisoformat(task["due_date"])
-    else:
-        task_date = task["due_date"]
+    task_date = get_due_date(task)
 
     relative = format_relative_time(task_date)
     date_str = format_date(task_date)
@@ -101,12 +143,16 @@ def format_task_summary(task: Dict[str, Any]) -> str:
     return f"{icon} {title}\n   Due: {date_str} ({relative})"
 
 
-def format_task_list(tasks: List[Dict[str, Any]]) -> str:
+def format_task_list(
+    tasks: List[TaskLike], start: int = 1, page: Optional[int] = None
+) -> str:
     """
     Format a list of tasks for display.
 
     Args:
-        tasks: List of task dictionaries.
+        tasks: List of task records.
+        start: Number of the first task (continues numbering across pages).
+        page: Page number to show in the footer (None for a single page).
 
     Returns:
         Formatted task list string.
@@ -116,19 +162,22 @@ def format_task_list(tasks: List[Dict[str, Any]]) -> str:
 
     message_parts = ["📋 Your Upcoming Tasks:\n"]
 
-    for index, task in enumerate(tasks, start=1):
+    for index, task in enumerate(tasks, start=start):
         task_summary = format_task_summary(task)
         message_parts.append(f"\n{index}. {task_summary}")
 
+    if page is not None:
+        message_parts.append(f"\n📄 Page {page}")
+
     return "\n".join(message_parts)
 
 
-def format_task_details(task: Dict[str, Any]) -> str:
+def format_task_details(task: TaskLike) -> str:
     """
     Format complete task details for confirmation or deletion.
 
     Args:
-        task: Task dictionary from database.
+        task: Task record from database.
 
     Returns:
         Formatted task details string.
@@ -136,11 +185,7 @@ def format_task_details(task: Dict[str, Any]) -> str:
     icon = get_task_icon(task["task_type"])
     title = task["title"]
 
-    # Parse due_date
-    if isinstance(task["due_date"], str):
-        task_date = date.fromisoformat(task["due_date"])
-    else:
-        task_date = task["due_date"]
+    task_date = get_due_date(task)
 
     date_str = format_date(task_date)
     task_type_display = task["task_type"].capitalize()
@@ -148,12 +193,12 @@ def format_task_details(task: Dict[str, Any]) -> str:
     return f"{icon} {title}\n📅 Due: {date_str}\n📚 Type: {task_type_display}"
 
 
-def format_reminder_message(task: Dict[str, Any]) -> str:
+def format_reminder_message(task: TaskLike) -> str:
     """
     Format a reminder message for a task.
 
     Args:
-        task: Task dictionary from database.
+        task: Task record from database.
 
     Returns:
         Formatted reminder message.
@@ -161,11 +206,7 @@ def format_reminder_message(task: Dict[str, Any]) -> str:
     icon = get_task_icon(task["task_type"])
     title = task["title"]
 
-    # Parse due_date
-    if isinstance(task["due_date"], str):
-        task_date = date.fromisoformat(task["due_date"])
-    else:
-        task_date = task["due_date"]
+    task_date = get_due_date(task)
 
     date_str = format_date(task_date)
     day_name = task_date.strftime("%A")  # e.g., "Monday"
@@ -178,6 +219,53 @@ def format_reminder_message(task: Dict[str, Any]) -> str:
     )
 
 
+# Most tasks listed in one reminder digest; long titles may cut it shorter,
+# since the digest must also fit in MAX_MESSAGE_LENGTH
+MAX_DIGEST_TASKS = 25
+
+
+def format_reminder_digest(tasks: List[TaskLike]) -> str:
+    """
+    Format one reminder message covering several of a user's tasks.
+
+    Args:
+        tasks: The user's task records that are due for a reminder.
+
+    Returns:
+        Formatted digest message (a single task gets the regular reminder).
+    """
+    if len(tasks) == 1:
+        return format_reminder_message(tasks[0])
+
+    message_parts = [f"⏰ REMINDER\n\nYou have {len(tasks)} tasks due tomorrow:"]
+    # Header, footer and the "…and N more" line
+    used = len(message_parts[0]) + 60
+
+    shown = 0
+    current_date = None
+    for task in tasks[:MAX_DIGEST_TASKS]:
+        task_date = get_due_date(task)
+        lines = []
+        if task_date != current_date:
+            day_name = task_date.strftime("%A")
+            lines.append(f"\n📅 {day_name} ({format_date(task_date)})")
+        icon = get_task_icon(task["task_type"])
+        lines.append(f"{icon} {task['title']}")
+
+        used += sum(len(line) + 1 for line in lines)
+        if used > MAX_MESSAGE_LENGTH:
+            break
+        message_parts.extend(lines)
+        current_date = task_date
+        shown += 1
+
+    if len(tasks) > shown:
+        message_parts.append(f"…and {len(tasks) - shown} more")
+
+    message_parts.append("\nDon't forget! 📚")
+    return "\n".join(message_parts)
+
+
 def format_task_confirmation(task_type: str, title: str, due_date: date) -> str:
     """
     Format task creation confirmation message.
@@ -205,12 +293,57 @@ def format_task_confirmation(task_type: str, title: str, due_date: date) -> str:
     )
 
 
-def format_deletion_confirmation(task: Dict[str, Any]) -> str:
+def format_bulk_import_summary(
+    tasks: List[Tuple[str, date, str]], errors: List[Tuple[int, str]]
+) -> str:
+    """
+    Format the summary reply for a bulk task import.
+
+    Args:
+        tasks: Created (title, due_date, task_type) tuples.
+        errors: Rejected (line_number, error_message) tuples.
+
+    Returns:
+        Formatted summary message.
+    """
+    task_lines = [
+        f"{get_task_icon(task_type)} {title} ({due_date.strftime('%b %d')})"
+        for title, due_date, task_type in tasks
+    ]
+    error_lines = [
+        f"Line {line_number}: {error_message}" for line_number, error_message in errors
+    ]
+
+    # Keep the reply within one message: errors get up to a third of it,
+    # with room left for the headers and "…and N more" lines
+    budget = MAX_MESSAGE_LENGTH - 120
+    error_budget = min(sum(len(line) + 1 for line in error_lines), budget // 3)
+    shown_tasks = lines_within(task_lines, budget - error_budget)
+    budget -= sum(len(line) + 1 for line in shown_tasks)
+    shown_errors = lines_within(error_lines, budget)
+
+    if tasks:
+        message_parts = [f"✅ Added {len(tasks)} task(s)!\n", *shown_tasks]
+        if len(tasks) > len(shown_tasks):
+            message_parts.append(f"…and {len(tasks) - len(shown_tasks)} more")
+    else:
+        message_parts = ["❌ No tasks were added."]
+
+    if errors:
+        message_parts.append(f"\n⚠️ Skipped {len(errors)} line(s):")
+        message_parts.extend(shown_errors)
+        if len(errors) > len(shown_errors):
+            message_parts.append(f"…and {len(errors) - len(shown_errors)} more")
+
+    return "\n".join(message_parts)
+
+
+def format_deletion_confirmation(task: TaskLike) -> str:
     """
     Format task deletion confirmation prompt.
 
     Args:
-        task: Task dictionary from database.
+        task: Task record from database.
 
     Returns:
         Formatted confirmation prompt.
@@ -224,12 +357,12 @@ def format_deletion_confirmation(task: Dict[str, Any]) -> str:
     )
 
 
-def format_task_selection_list(tasks: List[Dict[str, Any]]) -> str:
+def format_task_selection_list(tasks: List[TaskLike]) -> str:
     """
     Format a numbered list of tasks for selection.
 
     Args:
-        tasks: List of task dictionaries.
+        tasks: List of task records.
 
     Returns:
         Formatted selection list.
@@ -243,11 +376,7 @@ def format_task_selection_list(tasks: List[Dict[str, Any]]) -> str:
         icon = get_task_icon(task["task_type"])
         title = task["title"]
 
-        # Parse due_date
-        if isinstance(task["due_date"], str):
-            task_date = date.fromisoformat(task["due_date"])
-        else:
-            task_date = task["due_date"]
+        task_date = get_due_date(task)
 
         # Short date format for selection
         date_str = task_date.strftime("%b %d")
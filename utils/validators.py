@@ -8,7 +8,8 @@ including date formats and task titles.
 import logging
 import re
 from datetime import date, datetime
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 logger = logging.getLogger(__name__)
 
@@ -182,6 +183,61 @@ def validate_task_number(
     return True, number, None
 
 
+def validate_timezone(tz_name: str) -> Tuple[bool, Optional[str], Optional[str]]:
+    """
+    Validate an IANA timezone name.
+
+    Args:
+        tz_name: Timezone name from user (e.g., Europe/Berlin).
+
+    Returns:
+        Tuple of (is_valid, timezone_name, error_message)
+        - is_valid: True if the timezone exists
+        - timezone_name: Timezone name if valid
+        - error_message: Error message if invalid, None if valid
+    """
+    tz_name = tz_name.strip()
+
+    try:
+        ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return (
+            False,
+            None,
+            "❌ Unknown timezone. Use a name like Europe/Berlin or Asia/Tashkent.",
+        )
+
+    return True, tz_name, None
+
+
+def validate_reminder_hour(hour_str: str) -> Tuple[bool, Optional[int], Optional[str]]:
+    """
+    Validate a reminder hour.
+
+    Args:
+        hour_str: Hour string from user (0-23, optionally as HH:00).
+
+    Returns:
+        Tuple of (is_valid, hour, error_message)
+        - is_valid: True if hour is valid
+        - hour: Integer hour if valid
+        - error_message: Error message if invalid, None if valid
+    """
+    hour_str = hour_str.strip()
+    if hour_str.endswith(":00"):
+        hour_str = hour_str[:-3]
+
+    try:
+        hour = int(hour_str)
+    except ValueError:
+        return False, None, "❌ Please enter an hour from 0 to 23."
+
+    if not 0 <= hour <= 23:
+        return False, None, "❌ Reminder hour must be between 0 and 23."
+
+    return True, hour, None
+
+
 def validate_confirmation(response: str) -> Tuple[bool, bool, Optional[str]]:
     """
     Validate yes/no confirmation response.
@@ -209,6 +265,89 @@ def validate_confirmation(response: str) -> Tuple[bool, bool, Optional[str]]:
         )
 
 
+def validate_bulk_task_line(
+    line: str,
+) -> Tuple[bool, Optional[Tuple[str, date, str]], Optional[str]]:
+    """
+    Validate one line of a bulk task import.
+
+    Expected format: ``title; DD/MM/YYYY; type``
+
+    Args:
+        line: Single input line.
+
+    Returns:
+        Tuple of (is_valid, task, error_message)
+        - is_valid: True if every field is valid
+        - task: (title, due_date, task_type) if valid, None otherwise
+        - error_message: Error message if invalid, None if valid
+    """
+    parts = [part.strip() for part in line.split(";")]
+
+    if len(parts) != 3:
+        return (
+            False,
+            None,
+            "❌ Expected 3 fields: title; DD/MM/YYYY; type",
+        )
+
+    title_input, date_input, type_input = parts
+
+    is_valid, title, error_message = validate_task_title(title_input)
+    if not is_valid:
+        return False, None, error_message
+
+    is_valid, due_date, error_message = validate_date(date_input)
+    if not is_valid:
+        return False, None, error_message
+
+    is_valid, task_type, error_message = validate_task_type(type_input)
+    if not is_valid:
+        return False, None, "❌ Invalid task type. Use assignment or exam."
+
+    return True, (title, due_date, task_type), None
+
+
+def parse_bulk_tasks(
+    text: str, max_tasks: int = 100
+) -> Tuple[List[Tuple[str, date, str]], List[Tuple[int, str]]]:
+    """
+    Parse and validate a multi-line bulk task import in one pass.
+
+    Blank lines are skipped. Line numbers in errors are 1-based and count
+    only the import lines passed in.
+
+    Args:
+        text: Import text, one task per line.
+        max_tasks: Maximum number of task lines accepted.
+
+    Returns:
+        Tuple of (tasks, errors)
+        - tasks: List of valid (title, due_date, task_type) tuples
+        - errors: List of (line_number, error_message) tuples
+    """
+    tasks = []
+    errors = []
+
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+
+        if len(tasks) + len(errors) >= max_tasks:
+            errors.append(
+                (line_number, f"❌ Too many lines (max {max_tasks} per import).")
+            )
+            break
+
+        is_valid, task, error_message = validate_bulk_task_line(line)
+        if is_valid:
+            tasks.append(task)
+        else:
+            errors.append((line_number, error_message))
+
+    return tasks, errors
+
+
 def sanitize_input(text: str) -> str:
     """
     Sanitize user input to prevent injection attacks.